@@ -0,0 +1,153 @@
+"""
+Maintenance commands. Run from the backend directory:
+    python -m app.cli reconcile-credits
+    python -m app.cli ensure-indexes
+    python -m app.cli explain-queries
+    python -m app.cli import-companies companies.xlsx --errors rejected.csv
+    python -m app.cli text-footprint --backfill 100
+"""
+import argparse
+import asyncio
+import csv
+import sys
+
+from .database import connect_db, close_db, get_database, get_gridfs
+from .services import credit_service, index_service, onboarding_service, stats_service, text_store
+from .services.extraction_service import extraction_engine
+from .services.gst_registry import load_registry
+
+
+async def reconcile_credits(args):
+    result = await credit_service.reconcile_balances(get_database())
+    print(f"Balances corrected: {result['corrected']}, removed: {result['removed']}")
+    # Credit totals in the stats rollup are derived from the balances
+    await stats_service.rebuild_stats(get_database())
+
+
+async def ensure_indexes(args):
+    for entry in await index_service.ensure_indexes(get_database()):
+        keys = ", ".join(f"{field}:{direction}" for field, direction in entry["keys"])
+        print(f"{entry['status']:<8} {entry['collection']:<16} {keys}")
+
+
+async def explain_queries(args):
+    """Exit non-zero when any hot query scans a collection or sorts in memory, for use in CI."""
+    results = await index_service.explain_hot_queries(get_database())
+    for entry in results:
+        if "error" in entry:
+            print(f"ERROR    {entry['name']:<28} {entry['error']}")
+            continue
+        flag = "OK" if entry["ok"] else "COLLSCAN" if entry["collscan"] else "SORT"
+        print(f"{flag:<8} {entry['name']:<28} {' <- '.join(entry['stages'])}")
+    return 0 if all(entry["ok"] for entry in results) else 1
+
+
+async def import_companies(args):
+    """
+    Exit non-zero when any row was rejected; --errors writes them out as CSV and
+    --credentials the generated passwords (never printed).
+    """
+    # Rows are annotated from the registry (and checked when GST_REGISTRY_ENFORCE is set), as /auth/register does
+    await asyncio.to_thread(load_registry)
+    try:
+        report = await onboarding_service.import_companies(
+            get_database(), args.path,
+            update_existing=args.update_existing, generate_passwords=bool(args.credentials)
+        )
+    except onboarding_service.ImportFormatError as e:
+        print(f"ERROR    {e}")
+        return 2
+    print(
+        f"Rows: {report['total_rows']}, inserted: {report['inserted']}, updated: {report['updated']}, "
+        f"failed: {report['failed']} ({report['elapsed_seconds']:.1f}s)"
+    )
+    if args.credentials:
+        with open(args.credentials, "w", newline="") as out:
+            writer = csv.DictWriter(out, fieldnames=["row", "email", "password"])
+            writer.writeheader()
+            writer.writerows(report["credentials"])
+        print(f"Generated passwords for {len(report['credentials'])} account(s): {args.credentials}")
+    if args.errors:
+        with open(args.errors, "w", newline="") as out:
+            writer = csv.DictWriter(out, fieldnames=["row", "gst_number", "email", "error"])
+            writer.writeheader()
+            writer.writerows(report["errors"])
+    else:
+        for entry in report["errors"]:
+            print(f"row {entry['row']:<8} {entry['gst_number'] or '-':<16} {entry['error']}")
+    return 1 if report["failed"] else 0
+
+
+def _import_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument("path", help=".xlsx or .csv file with GSTIN and Email columns")
+    parser.add_argument("--update-existing", action="store_true", help="update the profile of already registered GSTINs")
+    parser.add_argument("--errors", metavar="CSV", help="write rejected rows to this file instead of printing them")
+    parser.add_argument(
+        "--credentials", metavar="CSV",
+        help="generate passwords for rows without one and write them to this file"
+    )
+
+
+def _mb(value: int) -> str:
+    return f"{value / (1024 * 1024):10.1f} MB"
+
+
+async def text_footprint(args):
+    if args.backfill:
+        extraction_engine.start()
+        try:
+            counts = await text_store.backfill(get_database(), get_gridfs(), limit=args.backfill)
+        finally:
+            extraction_engine.shutdown()
+        print(f"Backfilled texts: {counts['stored']} stored, {counts['skipped']} too large, {counts['failed']} failed")
+
+    report = await text_store.footprint(get_database())
+    text = report["text"]
+    print(f"PDFs              {report['pdfs']['count']:>8} {_mb(report['pdfs']['bytes'])}")
+    print(f"  with text       {report['pdfs']['count'] - report['pdfs_without_text']:>8} {_mb(report['pdf_bytes_with_text'])}")
+    print(f"Raw text          {text['documents']:>8} {_mb(text['raw_bytes'])}  ({text['pages']} pages)")
+    print(f"Compressed text   {text['documents']:>8} {_mb(text['compressed_bytes'])}  (ratio {text['compression_ratio']})")
+    for codec, entry in text["codecs"].items():
+        print(f"  {codec:<15} {entry['documents']:>8} {_mb(entry['compressed_bytes'])}")
+
+
+def _footprint_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument("--backfill", type=int, default=0, metavar="N",
+                        help="first extract and store the text of up to N stored PDFs that have none")
+
+
+# name -> (handler, help, optional function adding the command's arguments)
+COMMANDS = {
+    "reconcile-credits": (reconcile_credits, "Rebuild credit balances from the credits ledger", None),
+    "ensure-indexes": (ensure_indexes, "Create all declared MongoDB indexes", None),
+    "explain-queries": (explain_queries, "Explain the hot queries and flag collection scans", None),
+    "import-companies": (import_companies, "Register companies in bulk from an xlsx/CSV file", _import_arguments),
+    "text-footprint": (text_footprint, "Compare PDF, raw text and compressed text storage", _footprint_arguments),
+}
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m app.cli", description="GreenWash Detector maintenance commands")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    for name, (_, help_text, add_arguments) in COMMANDS.items():
+        subparser = subparsers.add_parser(name, help=help_text)
+        if add_arguments:
+            add_arguments(subparser)
+    return parser
+
+
+async def run(args):
+    await connect_db()
+    try:
+        return await COMMANDS[args.command][0](args)
+    finally:
+        await close_db()
+
+
+def main():
+    args = build_parser().parse_args()
+    sys.exit(asyncio.run(run(args)) or 0)
+
+
+if __name__ == "__main__":
+    main()
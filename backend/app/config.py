@@ -1,11 +1,115 @@
+import os
 from pydantic_settings import BaseSettings
 from functools import lru_cache
 
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
 class Settings(BaseSettings):
     openai_api_key: str = ""
     serper_api_key: str = ""
     mongodb_url: str = "mongodb://localhost:27017"
     mongodb_db_name: str = "greenwash_detector"
+    mongodb_transactions: bool = False  # requires a replica set; wraps credit ledger writes
+    
+    # Uploads are spooled to disk in chunks rather than read into memory
+    upload_max_bytes: int = 50 * 1024 * 1024
+    upload_chunk_bytes: int = 1024 * 1024
+    upload_spool_dir: str = ""  # empty = <system temp>/greenwash_uploads
+    upload_spool_max_age_seconds: int = 6 * 3600  # orphaned spool files older than this are purged at startup
+    
+    # GST registry (GSTIN -> legal name/state), parsed once into a binary cache
+    gst_registry_path: str = os.path.join(BACKEND_DIR, "GST_2026-01-04.xlsx")
+    gst_registry_cache_path: str = ""  # empty = backend/.cache/<file>.registry.json
+    # The bundled file is a small snapshot, so by default it only annotates registrations
+    # (legal name, state); set true with a complete registry to reject unlisted GSTINs
+    gst_registry_enforce: bool = False
+    
+    # Bulk company onboarding (/admin/companies/import, `python -m app.cli import-companies`)
+    onboarding_chunk_rows: int = 1000  # rows validated, deduped and written per bulk_write
+    onboarding_max_bytes: int = 100 * 1024 * 1024
+    
+    # Preview artifacts reused by /analyze?preview_token=...
+    preview_ttl_seconds: int = 30 * 60
+    preview_max_artifacts: int = 200
+    
+    # Batch analysis (/analyze/batch); each stage has its own concurrency limit
+    batch_max_files: int = 500
+    batch_max_archive_bytes: int = 1024 * 1024 * 1024
+    # All files of a batch once inflated; a small archive can expand to far more than its size
+    batch_max_total_bytes: int = 2 * 1024 * 1024 * 1024
+    batch_store_concurrency: int = 4
+    batch_extract_concurrency: int = 4
+    batch_news_concurrency: int = 8
+    batch_ai_concurrency: int = 4
+    batch_insert_size: int = 50
+    
+    # Extracted page texts, compressed and keyed by PDF content hash, so re-analysis skips parsing
+    text_store_enabled: bool = True
+    text_store_codec: str = "auto"  # auto = zstd when the zstandard package is installed, else zlib
+    
+    # Analysis cache (keyed by PDF content hash + prompt version)
+    analysis_cache_ttl_seconds: int = 7 * 24 * 3600
+    analysis_cache_lru_size: int = 256
+    
+    # Background analysis jobs
+    job_workers: int = 4
+    job_queue_size: int = 100
+    job_ttl_seconds: int = 24 * 3600
+    # Each process heartbeats; unfinished jobs of a process silent this long are failed
+    job_heartbeat_seconds: float = 15.0
+    job_owner_stale_seconds: float = 60.0
+    
+    # PDF extraction process pool
+    extraction_workers: int = 2
+    extraction_max_pages: int = 1000
+    extraction_timeout_seconds: float = 120.0
+    extraction_parallel_min_pages: int = 50
+    extraction_pages_per_task: int = 25
+    
+    # Analysis pipeline stage budgets (extraction uses extraction_timeout_seconds)
+    stage_store_timeout_seconds: float = 120.0
+    stage_news_timeout_seconds: float = 15.0
+    stage_ai_timeout_seconds: float = 600.0
+    
+    # Serper news lookups
+    serper_url: str = "https://google.serper.dev/search"
+    news_timeout_seconds: float = 8.0
+    news_deadline_seconds: float = 10.0
+    news_cache_ttl_seconds: int = 6 * 3600
+    # Results missing queries dropped by the deadline are only reused briefly
+    news_partial_cache_ttl_seconds: int = 5 * 60
+    news_cache_max_entries: int = 1024
+    
+    # OpenAI gateway
+    openai_base_url: str = ""  # empty = api.openai.com; point at a local fake for testing
+    llm_timeout_seconds: float = 120.0
+    llm_max_concurrency: int = 4
+    llm_requests_per_minute: int = 60
+    llm_burst: int = 5
+    llm_max_retries: int = 4
+    llm_backoff_base_seconds: float = 1.0
+    llm_backoff_max_seconds: float = 30.0
+    llm_breaker_threshold: int = 5
+    llm_breaker_reset_seconds: float = 60.0
+    
+    # Report context sent to the model
+    prompt_context_token_budget: int = 3000
+    prompt_context_chunk_chars: int = 1200
+    
+    # Map-reduce analysis for very large reports (opt-in per request)
+    mapreduce_pages_per_chunk: int = 10
+    mapreduce_concurrency: int = 4
+    mapreduce_map_model: str = "gpt-4o-mini"
+    # Findings above this estimate are merged in groups (with the map model) before the final call
+    mapreduce_reduce_token_budget: int = 60000
+    mapreduce_merge_group_size: int = 8
+    
+    # Dashboard statistics
+    stats_cache_ttl_seconds: float = 10.0
+    
+    # Batched user id -> company metadata resolver
+    user_cache_ttl_seconds: float = 60.0
+    user_cache_max_entries: int = 10000
     
     class Config:
         env_file = ".env"
@@ -1,5 +1,6 @@
 from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase, AsyncIOMotorGridFSBucket
 from .config import get_settings
+from .services.metrics_service import MongoCommandMetrics
 
 class Database:
     client: AsyncIOMotorClient = None
@@ -10,7 +11,7 @@ db = Database()
 
 async def connect_db():
     settings = get_settings()
-    db.client = AsyncIOMotorClient(settings.mongodb_url)
+    db.client = AsyncIOMotorClient(settings.mongodb_url, event_listeners=[MongoCommandMetrics()])
     db.db = db.client[settings.mongodb_db_name]
     db.fs = AsyncIOMotorGridFSBucket(db.db)
     print(f"Connected to MongoDB: {settings.mongodb_db_name}")
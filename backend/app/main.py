@@ -1,31 +1,125 @@
-from fastapi import FastAPI, UploadFile, File, HTTPException, Depends
+from fastapi import FastAPI, UploadFile, File, HTTPException, Depends, Query, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 from contextlib import asynccontextmanager
+import asyncio
+import json
+import zipfile
 from datetime import datetime
 from bson import ObjectId
+from bson.errors import InvalidId
+from pymongo.errors import DuplicateKeyError
 from typing import List, Optional
 
 from .config import get_settings
 from .database import connect_db, close_db, get_database, get_gridfs
-from .services.pdf_service import extract_text_from_pdf, extract_company_name, extract_pdf_preview
-from .services.news_service import search_news
-from .services.ai_service import analyze_with_ai
+from .services.extraction_service import extraction_engine, ExtractionLimitError, ExtractionTimeoutError
+from .services.file_service import ensure_file_refs, release_pdf
+from .services.pipeline_service import run_analysis_pipeline, PipelineError, ANALYSIS_MODES
+from .services import (
+    stats_service, credit_service, index_service, report_service, upload_service, preview_service, batch_service,
+    scoring_service, metrics_service, onboarding_service, text_store
+)
+from .services.gst_registry import gst_registry, load_registry, resolve_company_name
+from .services.company_service import COMPANY_SORT_FIELDS, fetch_company_page, iter_companies
+from .services.pagination import encode_cursor, keyset_filter
+from .services.user_loader import user_loader
+from .services.news_service import close_http_client
+from .services.llm_gateway import llm_gateway
+from .services.job_service import job_manager, JobQueueFull
 from .services.auth_service import (
     create_user, get_user_by_email, get_user_by_gst, 
     authenticate_user, authenticate_admin, authenticate_admin_db,
     create_admin, get_admin_by_email, ADMIN_REGISTRATION_CODE
 )
 from .models import (
-    AnalysisResult, ReportResponse, 
+    AnalysisResult, ReportResponse, ReportSummary, ReportTotals,
     UserRegister, UserLogin, UserResponse, AdminLogin,
     AdminRegister, AdminResponse, CreditAssignment, CreditResponse,
-    CompanyWithCredits
+    CompanyWithCredits, JobResponse, JobAccepted, BatchResponse, BatchAccepted,
+    CompanyImportResult
 )
 
+async def _run_analysis(payload: dict, progress=None, on_section=None) -> ReportResponse:
+    """
+    Run the pipeline for a spooled upload (`path`) or a stored preview (`preview_token`).
+    The spooled file is removed afterwards; a preview is discarded once its report is saved.
+    """
+    db = get_database()
+    fs = get_gridfs()
+    path = payload.get("path")
+    token = payload.get("preview_token")
+    file_id = pages = None
+    
+    if token:
+        artifact = await preview_service.get_preview(db, token)
+        if artifact is None:
+            raise PipelineError(410, "Preview expired; upload the file again")
+        file_id, pages = artifact["file_id"], artifact.get("pages")
+        if pages is None:
+            path = (await preview_service.restore_to_spool(fs, artifact)).path
+    
+    try:
+        report = await run_analysis_pipeline(
+            db,
+            fs,
+            payload["filename"],
+            path,
+            user_id=payload["user_id"],
+            progress=progress,
+            on_section=on_section,
+            mode=payload.get("mode", "standard"),
+            content_hash=payload["content_hash"],
+            file_id=file_id,
+            pages=pages
+        )
+    except BaseException:
+        if token:
+            await preview_service.unclaim_preview(db, token)
+        raise
+    finally:
+        if path:
+            upload_service.discard_spooled(path)
+    
+    if token:
+        await preview_service.discard_preview(db, fs, token)
+    return report
+
+async def _run_analyze_job(job_id: str, payload: dict, progress):
+    """Job handler for queued /analyze uploads."""
+    report = await _run_analysis(payload, progress)
+    return {"report_id": report.id}
+
+async def _run_batch_job(job_id: str, payload: dict, progress):
+    """Job handler for /analyze/batch submissions."""
+    return await batch_service.run_batch(
+        get_database(), get_gridfs(), payload["batch_id"], payload["paths"], progress
+    )
+
+job_manager.register("analyze", _run_analyze_job)
+job_manager.register("analyze_batch", _run_batch_job)
+job_manager.add_reaper(batch_service.mark_interrupted)
+
+# Strong references to fire-and-forget tasks so they aren't garbage collected mid-run
+_background_tasks = set()
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     await connect_db()
+    upload_service.purge_spool_directory()
+    await asyncio.to_thread(load_registry)
+    extraction_engine.start()
+    await index_service.ensure_indexes(get_database())
+    await ensure_file_refs(get_database())
+    await preview_service.purge_previews(get_database(), get_gridfs())
+    await credit_service.ensure_balances(get_database())
+    await stats_service.ensure_stats(get_database())
+    await job_manager.start(get_database())
     yield
+    await job_manager.stop()
+    extraction_engine.shutdown()
+    await close_http_client()
+    await llm_gateway.close()
     await close_db()
 
 app = FastAPI(
@@ -45,6 +139,25 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
+)
+app.add_middleware(metrics_service.MetricsMiddleware)
+
+# Values that already exist elsewhere are read only when /metrics is scraped
+metrics_service.registry.gauge_from(
+    "greenwash_job_queue_depth", "Analysis jobs waiting for a worker", job_manager.queue_depth
+)
+metrics_service.registry.gauge_from(
+    "greenwash_extraction_in_flight", "PDF extraction tasks submitted to the process pool",
+    lambda: extraction_engine.metrics.in_flight_tasks
+)
+metrics_service.registry.counter_from(
+    "greenwash_extraction_timeouts_total", "PDF extractions that exceeded the time budget",
+    lambda: extraction_engine.metrics.timeouts
+)
+metrics_service.registry.gauge_from(
+    "greenwash_llm_circuit_open", "1 while the model circuit breaker rejects calls",
+    lambda: 0 if llm_gateway.breaker.state == "closed" else 1
 )
 
 @app.get("/")
@@ -53,7 +166,18 @@ async def root():
 
 @app.get("/health")
 async def health():
-    return {"status": "healthy"}
+    return {
+        "status": "healthy",
+        "extraction": extraction_engine.stats(),
+        "job_queue_depth": job_manager.queue_depth(),
+        "gst_registry_records": len(gst_registry),
+        "llm_circuit": llm_gateway.breaker.state
+    }
+
+@app.get("/metrics")
+async def metrics():
+    """Prometheus metrics: request and stage latency histograms, cache, token and Mongo counters."""
+    return Response(metrics_service.registry.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
 
 # ============ AUTH ENDPOINTS ============
 
@@ -70,6 +194,15 @@ async def register_user(user: UserRegister):
     if len(user.password) < 6:
         raise HTTPException(status_code=400, detail="Password must be at least 6 characters")
     
+    # Registry match annotates the account; with enforcement on, the GSTIN must be listed and active
+    settings = get_settings()
+    registration = gst_registry.lookup(user.gst_number)
+    if settings.gst_registry_enforce and len(gst_registry):
+        if registration is None:
+            raise HTTPException(status_code=400, detail="GST number not found in the GST registry")
+        if registration.status.lower() != "active":
+            raise HTTPException(status_code=400, detail=f"GST registration is {registration.status.lower()}")
+    
     # Check if email already exists
     existing_email = await get_user_by_email(db, user.email)
     if existing_email:
@@ -80,8 +213,16 @@ async def register_user(user: UserRegister):
     if existing_gst:
         raise HTTPException(status_code=400, detail="GST number already registered")
     
-    # Create user
-    user_doc = await create_user(db, user.model_dump())
+    # Create user (the unique indexes catch a concurrent registration that passed the checks above)
+    try:
+        user_doc = await create_user(db, {
+            **user.model_dump(),
+            "gst_legal_name": registration.legal_name if registration else None,
+            "gst_state": registration.state if registration else None,
+        })
+    except DuplicateKeyError:
+        raise HTTPException(status_code=400, detail="Email or GST number already registered")
+    await stats_service.record_company(db, user_doc)
     
     return UserResponse(
         id=str(user_doc["_id"]),
@@ -171,6 +312,15 @@ async def register_admin(admin: AdminRegister):
 
 # ============ REPORT ENDPOINTS ============
 
+async def _spool(file: UploadFile, max_bytes: Optional[int] = None) -> upload_service.SpooledUpload:
+    """Copy an upload to a temp file in chunks, enforcing the size limit."""
+    try:
+        return await upload_service.spool_upload(file, max_bytes)
+    except upload_service.UploadTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Failed to read file: {e}")
+
 @app.post("/preview")
 async def preview_pdf(file: UploadFile = File(...)):
     """
@@ -180,119 +330,381 @@ async def preview_pdf(file: UploadFile = File(...)):
     if not file.filename.lower().endswith('.pdf'):
         raise HTTPException(status_code=400, detail="Only PDF files are accepted")
     
-    # Read file
-    try:
-        file_bytes = await file.read()
-    except Exception as e:
-        raise HTTPException(status_code=400, detail=f"Failed to read file: {e}")
+    upload = await _spool(file)
     
-    # Extract preview data
+    # Extract preview data (workers open the spooled file by path)
     try:
-        preview_data = extract_pdf_preview(file_bytes)
+        preview_data = await extraction_engine.extract_preview(upload.path)
         preview_data["filename"] = file.filename
-        preview_data["file_size_mb"] = round(len(file_bytes) / (1024 * 1024), 2)
+        preview_data["file_size_mb"] = round(upload.size / (1024 * 1024), 2)
+        preview_data["company_name"] = resolve_company_name(preview_data["full_text"])
+        page_texts = [page["text"] for page in preview_data["pages"]]
+        
+        # Rule-based counts and provisional S/V scores, available before any model call
+        preview_data["provisional"] = await asyncio.to_thread(scoring_service.prescore, page_texts)
+        
+        # Keep the upload and its page texts so /analyze?preview_token=... skips
+        # re-upload, re-storage and re-extraction
+        try:
+            saved = await preview_service.save_preview(get_database(), get_gridfs(), upload, page_texts)
+            preview_data["preview_token"] = saved["token"]
+            preview_data["preview_expires_at"] = saved["expires_at"]
+        except Exception as e:
+            print(f"Failed to save preview artifact: {e}")
+            preview_data["preview_token"] = None
+    except ExtractionLimitError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except ExtractionTimeoutError as e:
+        raise HTTPException(status_code=504, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"Failed to extract PDF data: {e}")
+    finally:
+        upload.cleanup()
     
     return preview_data
 
-@app.post("/analyze", response_model=ReportResponse)
-async def analyze_report(file: UploadFile = File(...), user_id: Optional[str] = None):
-    """
-    Analyze a corporate sustainability report PDF for greenwashing.
-    Stores the file in MongoDB GridFS and saves analysis results.
-    """
-    settings = get_settings()
-    db = get_database()
-    fs = get_gridfs()
+async def _analysis_payload(
+    file: Optional[UploadFile],
+    preview_token: Optional[str],
+    user_id: Optional[str],
+    mode: str
+) -> dict:
+    """Validate an analysis request and turn its upload or preview token into a pipeline payload."""
+    if mode not in ANALYSIS_MODES:
+        raise HTTPException(status_code=400, detail=f"Unknown analysis mode: {mode}")
+    
+    if preview_token:
+        # Claimed so expiry and eviction leave it (and its PDF) alone while the analysis waits
+        artifact = await preview_service.claim_preview(get_database(), preview_token)
+        if artifact is None:
+            raise HTTPException(status_code=410, detail="Preview expired or not found; upload the file again")
+        return {"filename": artifact["filename"], "preview_token": preview_token,
+                "content_hash": artifact["content_hash"], "user_id": user_id, "mode": mode}
+    
+    if file is None:
+        raise HTTPException(status_code=400, detail="Upload a PDF file or pass a preview_token")
     
     # Validate file type
     if not file.filename.lower().endswith('.pdf'):
         raise HTTPException(status_code=400, detail="Only PDF files are accepted")
     
-    # Read file
-    try:
-        file_bytes = await file.read()
-    except Exception as e:
-        raise HTTPException(status_code=400, detail=f"Failed to read file: {e}")
+    upload = await _spool(file)
+    return {"filename": file.filename, "path": upload.path, "content_hash": upload.content_hash,
+            "user_id": user_id, "mode": mode}
+
+async def _abandon_payload(payload: dict):
+    """Undo _analysis_payload for a request that was never queued."""
+    if payload.get("path"):
+        upload_service.discard_spooled(payload["path"])
+    if payload.get("preview_token"):
+        await preview_service.unclaim_preview(get_database(), payload["preview_token"])
+
+@app.post("/analyze", response_model=JobAccepted, status_code=202)
+async def analyze_report(
+    file: Optional[UploadFile] = File(None),
+    user_id: Optional[str] = None,
+    mode: str = "standard",
+    preview_token: Optional[str] = None
+):
+    """
+    Queue a corporate sustainability report PDF for greenwashing analysis.
+    Send the file, or the `preview_token` returned by /preview to reuse that upload.
+    Returns a job id; progress is available from /jobs/{job_id} and its event stream.
+    Use mode=mapreduce for very large reports, or mode=fast for an instant rule-based
+    screening (no news search or model call).
+    """
+    # The job owns any spooled file from here and removes it when done
+    payload = await _analysis_payload(file, preview_token, user_id, mode)
     
-    # Store file in GridFS
     try:
-        file_id = await fs.upload_from_stream(
-            file.filename,
-            file_bytes,
-            metadata={"content_type": "application/pdf", "uploaded_at": datetime.utcnow()}
+        job_id = await job_manager.enqueue(
+            "analyze",
+            payload,
+            filename=payload["filename"],
+            user_id=user_id,
+            mode=mode
         )
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to store file: {e}")
+    except JobQueueFull as e:
+        await _abandon_payload(payload)
+        raise HTTPException(status_code=503, detail=str(e))
+    except Exception:
+        await _abandon_payload(payload)
+        raise
     
-    # Extract text from PDF
-    try:
-        pdf_text = extract_text_from_pdf(file_bytes)
-    except Exception as e:
-        raise HTTPException(status_code=400, detail=f"Failed to extract text from PDF: {e}")
+    return JobAccepted(
+        job_id=job_id,
+        status_url=f"/jobs/{job_id}",
+        events_url=f"/jobs/{job_id}/events"
+    )
+
+@app.post("/analyze/stream")
+async def analyze_report_stream(
+    file: Optional[UploadFile] = File(None),
+    user_id: Optional[str] = None,
+    mode: str = "standard",
+    preview_token: Optional[str] = None
+):
+    """
+    Analyze a report and stream the result as server-sent events.
+    Accepts the file or a `preview_token` from /preview, like /analyze.
+    Emits `progress` per pipeline stage, a `section` event for each part of the
+    analysis as soon as the model has produced it, then the saved `report`.
+    """
+    payload = await _analysis_payload(file, preview_token, user_id, mode)
     
-    if not pdf_text.strip():
-        raise HTTPException(status_code=400, detail="PDF appears to be empty or contains no extractable text")
+    events: asyncio.Queue = asyncio.Queue()
     
-    # Extract company name for news search
-    company_name = extract_company_name(pdf_text)
+    async def progress(stage: str, **info):
+        await events.put(("progress", {"stage": stage, **info}))
     
-    # Search for external news
-    try:
-        news_data = await search_news(company_name, settings.serper_api_key)
-    except Exception as e:
-        news_data = f"News search failed: {e}"
+    async def on_section(key: str, value):
+        await events.put(("section", {"section": key, "data": value}))
     
-    # Analyze with AI
-    if not settings.openai_api_key:
-        raise HTTPException(status_code=500, detail="OpenAI API key not configured")
+    async def run_pipeline():
+        try:
+            report = await _run_analysis(payload, progress, on_section)
+            await events.put(("report", report.model_dump(mode="json")))
+        except PipelineError as e:
+            await events.put(("error", {"status_code": e.status_code, "detail": e.detail}))
+        except Exception as e:
+            await events.put(("error", {"status_code": 500, "detail": f"Analysis failed: {e}"}))
+        finally:
+            await events.put(None)
+    
+    async def event_stream():
+        # The pipeline keeps running if the client disconnects so the report is still saved
+        task = asyncio.create_task(run_pipeline())
+        _background_tasks.add(task)
+        task.add_done_callback(_background_tasks.discard)
+        while True:
+            item = await events.get()
+            if item is None:
+                return
+            yield _sse(*item)
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@app.post("/analyze/batch", response_model=BatchAccepted, status_code=202)
+async def analyze_batch(
+    files: List[UploadFile] = File(...),
+    user_id: Optional[str] = None,
+    mode: str = "standard"
+):
+    """
+    Queue many reports for analysis at once: any mix of PDFs and zip archives of PDFs.
+    Identical files are analyzed once. Progress and per-file results are available
+    from /batches/{batch_id}.
+    """
+    settings = get_settings()
+    if mode not in ANALYSIS_MODES:
+        raise HTTPException(status_code=400, detail=f"Unknown analysis mode: {mode}")
     
+    db = get_database()
+    uploads = []
+    batch = None
     try:
-        analysis = await analyze_with_ai(pdf_text, news_data, settings.openai_api_key)
-    except ValueError as e:
-        raise HTTPException(status_code=500, detail=str(e))
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"AI analysis failed: {e}")
-    
-    # Store report document with analysis
-    report_doc = {
-        "filename": file.filename,
-        "file_id": str(file_id),
-        "uploaded_at": datetime.utcnow(),
-        "user_id": user_id,
-        "analysis": analysis.model_dump()
-    }
-    
-    result = await db.reports.insert_one(report_doc)
-    
-    return ReportResponse(
-        id=str(result.inserted_id),
-        filename=file.filename,
-        uploaded_at=report_doc["uploaded_at"],
-        user_id=user_id,
-        analysis=analysis
+        for file in files:
+            name = (file.filename or "").lower()
+            if name.endswith(".pdf"):
+                uploads.append(await _spool(file))
+            elif name.endswith(".zip"):
+                archive = await _spool(file, settings.batch_max_archive_bytes)
+                try:
+                    uploads.extend(await asyncio.to_thread(
+                        upload_service.spool_zip_members, archive.path, settings.batch_max_files - len(uploads),
+                        max_total_bytes=settings.batch_max_total_bytes - sum(upload.size for upload in uploads)
+                    ))
+                except zipfile.BadZipFile:
+                    raise HTTPException(status_code=400, detail=f"{file.filename} is not a valid zip archive")
+                except upload_service.UploadTooLargeError as e:
+                    raise HTTPException(status_code=413, detail=str(e))
+                finally:
+                    archive.cleanup()
+            else:
+                raise HTTPException(status_code=400, detail=f"{file.filename}: only PDF and zip files are accepted")
+            
+            if len(uploads) > settings.batch_max_files:
+                raise HTTPException(status_code=413, detail=f"A batch may contain at most {settings.batch_max_files} files")
+            if sum(upload.size for upload in uploads) > settings.batch_max_total_bytes:
+                raise HTTPException(
+                    status_code=413,
+                    detail=f"A batch may total at most {settings.batch_max_total_bytes / (1024 * 1024):.0f} MB of PDFs"
+                )
+        
+        if not uploads:
+            raise HTTPException(status_code=400, detail="No PDF files found in the upload")
+        
+        batch = await batch_service.create_batch(db, uploads, user_id, mode)
+        job_id = await job_manager.enqueue(
+            "analyze_batch",
+            {"batch_id": batch["_id"], "paths": [upload.path for upload in uploads]},
+            filename=f"{len(uploads)} files",
+            user_id=user_id,
+            mode=mode
+        )
+    except BaseException as e:
+        for upload in uploads:
+            upload.cleanup()
+        if batch:
+            await db[batch_service.BATCH_COLLECTION].delete_one({"_id": batch["_id"]})
+        if isinstance(e, JobQueueFull):
+            raise HTTPException(status_code=503, detail=str(e))
+        raise
+    
+    await db[batch_service.BATCH_COLLECTION].update_one({"_id": batch["_id"]}, {"$set": {"job_id": job_id}})
+    
+    return BatchAccepted(
+        batch_id=batch["_id"],
+        job_id=job_id,
+        total=batch["total"],
+        unique_files=batch["unique_files"],
+        status_url=f"/batches/{batch['_id']}",
+        events_url=f"/jobs/{job_id}/events"
+    )
+
+@app.get("/batches/{batch_id}", response_model=BatchResponse)
+async def get_batch(batch_id: str):
+    """Get a batch's status, per-file results and summary."""
+    batch = await batch_service.get_batch(get_database(), batch_id)
+    if not batch:
+        raise HTTPException(status_code=404, detail="Batch not found")
+    
+    return BatchResponse(id=batch.pop("_id"), **batch)
+
+# ============ JOB ENDPOINTS ============
+
+def _job_response(job: dict) -> JobResponse:
+    return JobResponse(
+        id=job["_id"],
+        kind=job["kind"],
+        status=job["status"],
+        stage=job.get("stage"),
+        stages=job.get("stages", []),
+        filename=job.get("filename"),
+        user_id=job.get("user_id"),
+        result=job.get("result"),
+        error=job.get("error"),
+        created_at=job["created_at"],
+        updated_at=job["updated_at"]
+    )
+
+@app.get("/jobs/{job_id}", response_model=JobResponse)
+async def get_job(job_id: str):
+    """Get the current state of a background job."""
+    job = await job_manager.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    
+    return _job_response(job)
+
+@app.get("/jobs/{job_id}/events")
+async def stream_job_events(job_id: str):
+    """Stream per-stage job progress as server-sent events."""
+    job = await job_manager.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    
+    async def event_stream():
+        queue = job_manager.subscribe(job_id)
+        try:
+            # Replay current state first so late subscribers don't miss earlier stages
+            current = await job_manager.get(job_id)
+            yield _sse("state", _job_response(current).model_dump(mode="json"))
+            if current["status"] in ("completed", "failed"):
+                return
+            
+            while True:
+                try:
+                    event = await asyncio.wait_for(queue.get(), timeout=15)
+                except asyncio.TimeoutError:
+                    # The job may be running in another worker process; fall back to Mongo
+                    current = await job_manager.get(job_id)
+                    if current is None or current["status"] in ("completed", "failed"):
+                        if current is not None:
+                            yield _sse("state", _job_response(current).model_dump(mode="json"))
+                        return
+                    yield ": keep-alive\n\n"
+                    continue
+                
+                name = event.pop("event")
+                yield _sse(name, event)
+                if name in ("completed", "failed"):
+                    return
+        finally:
+            job_manager.unsubscribe(job_id, queue)
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
     )
 
-@app.get("/reports", response_model=List[ReportResponse])
-async def get_reports(user_id: Optional[str] = None):
-    """Get all analyzed reports, optionally filtered by user."""
+def _json_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, ObjectId):
+        return str(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+async def _stream_json_array(items):
+    """Serialize an async iterator of dicts as a JSON array, one element at a time."""
+    yield "["
+    first = True
+    async for item in items:
+        yield ("" if first else ",") + json.dumps(item, default=_json_default)
+        first = False
+    yield "]"
+
+async def _stream_ndjson(items):
+    """Serialize an async iterator of dicts as newline-delimited JSON."""
+    async for item in items:
+        yield json.dumps(item, default=_json_default) + "\n"
+
+def _sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+@app.get("/reports", response_model=List[ReportSummary])
+async def get_reports(
+    response: Response,
+    user_id: Optional[str] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(default=50, ge=1, le=500)
+):
+    """
+    List report summaries (filename, date, score, traffic light), newest first.
+    Paginated by keyset; the next page's cursor is returned in the X-Next-Cursor header.
+    Fetch the full analysis with /reports/{id}.
+    """
     db = get_database()
-    reports = []
-    
-    query = {"user_id": user_id} if user_id else {}
     
-    async for doc in db.reports.find(query).sort("uploaded_at", -1):
-        reports.append(ReportResponse(
-            id=str(doc["_id"]),
-            filename=doc["filename"],
-            uploaded_at=doc["uploaded_at"],
-            user_id=doc.get("user_id"),
-            analysis=AnalysisResult(**doc["analysis"])
-        ))
+    try:
+        reports, next_cursor = await report_service.fetch_report_page(db, user_id, cursor, limit)
+    except (ValueError, TypeError, KeyError, InvalidId):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
     
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
     return reports
 
+@app.get("/reports/summary", response_model=ReportTotals)
+async def get_reports_summary(user_id: Optional[str] = None):
+    """Count and average trust score over all matching reports, for list headers that page."""
+    return await report_service.summarize_reports(get_database(), user_id)
+
+@app.get("/reports/export")
+async def export_reports(user_id: Optional[str] = None, full: bool = False):
+    """Stream every matching report as NDJSON: summaries by default, full analyses with `full=true`."""
+    db = get_database()
+    return StreamingResponse(
+        _stream_ndjson(report_service.iter_reports(db, user_id, full=full)),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": 'attachment; filename="reports.ndjson"'}
+    )
+
 @app.get("/reports/{report_id}", response_model=ReportResponse)
 async def get_report(report_id: str):
     """Get a specific report by ID."""
@@ -314,6 +726,37 @@ async def get_report(report_id: str):
         analysis=AnalysisResult(**doc["analysis"])
     )
 
+@app.get("/reports/{report_id}/pages")
+async def get_report_pages(
+    report_id: str,
+    start: int = Query(default=0, ge=0),
+    limit: int = Query(default=20, ge=1, le=200)
+):
+    """
+    Extracted text of a report's pages, from the compressed text store.
+    Only the requested pages are decompressed; 404 when the text was never stored.
+    """
+    db = get_database()
+    
+    try:
+        doc = await db.reports.find_one({"_id": ObjectId(report_id)}, {"content_hash": 1})
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid report ID")
+    
+    if not doc:
+        raise HTTPException(status_code=404, detail="Report not found")
+    
+    stored = await text_store.load_text(db, doc["content_hash"]) if doc.get("content_hash") else None
+    if stored is None:
+        raise HTTPException(status_code=404, detail="Extracted text is not stored for this report")
+    
+    return {
+        "report_id": report_id,
+        "page_count": len(stored),
+        "start": start,
+        "pages": await asyncio.to_thread(stored.pages, start, start + limit)
+    }
+
 @app.delete("/reports/{report_id}")
 async def delete_report(report_id: str):
     """Delete a report and its associated file."""
@@ -328,14 +771,12 @@ async def delete_report(report_id: str):
     if not doc:
         raise HTTPException(status_code=404, detail="Report not found")
     
-    # Delete file from GridFS
-    try:
-        await fs.delete(ObjectId(doc["file_id"]))
-    except Exception:
-        pass  # File might already be deleted
-    
     # Delete report document
     await db.reports.delete_one({"_id": ObjectId(report_id)})
+    await stats_service.record_report(db, doc, sign=-1)
+    
+    # Delete file from GridFS unless another report shares the same blob
+    await release_pdf(db, fs, doc["file_id"])
     
     return {"message": "Report deleted successfully"}
 
@@ -360,66 +801,66 @@ async def get_all_users():
     return users
 
 @app.get("/admin/companies")
-async def get_all_companies_with_data():
-    """Get all companies with their reports and credits data."""
+async def get_all_companies_with_data(
+    industry: Optional[str] = None,
+    sort_by: str = "created_at",
+    order: str = "desc",
+    cursor: Optional[str] = None,
+    limit: Optional[int] = Query(default=None, ge=1, le=1000)
+):
+    """
+    Get all companies with their reports and credits data.
+    Supports filtering by industry, sorting, and keyset pagination via `cursor`/`limit`;
+    the next page's cursor is returned in the X-Next-Cursor header.
+    """
     db = get_database()
-    companies = []
     
-    async for user in db.users.find().sort("created_at", -1):
-        user_id = str(user["_id"])
-        
-        # Get reports for this user
-        reports = []
-        total_score = 0
-        async for report in db.reports.find({"user_id": user_id}):
-            reports.append(report)
-            if report.get("analysis") and report["analysis"].get("scores"):
-                total_score += report["analysis"]["scores"].get("final_trust_score", 0)
-        
-        avg_score = total_score / len(reports) if reports else None
-        
-        # Get credits for this user and calculate balances
-        credits = []
-        credit_balances = {}
-        async for credit in db.credits.find({"user_id": user_id}).sort("assigned_at", -1):
-            ctype = credit["credit_type"]
-            trans_type = credit.get("transaction_type", "credit")
-            
-            if ctype not in credit_balances:
-                credit_balances[ctype] = 0
-            
-            if trans_type == "credit":
-                credit_balances[ctype] += credit["amount"]
-            else:
-                credit_balances[ctype] -= credit["amount"]
-            
-            credits.append({
-                "id": str(credit["_id"]),
-                "user_id": credit["user_id"],
-                "company_name": user["company_name"],
-                "credit_type": credit["credit_type"],
-                "amount": credit["amount"],
-                "reason": credit["reason"],
-                "transaction_type": trans_type,
-                "assigned_by": credit["assigned_by"],
-                "assigned_at": credit["assigned_at"],
-                "valid_until": credit.get("valid_until")
-            })
-        
-        companies.append({
-            "id": user_id,
-            "gst_number": user["gst_number"],
-            "email": user["email"],
-            "company_name": user["company_name"],
-            "industry_type": user["industry_type"],
-            "created_at": user["created_at"],
-            "total_reports": len(reports),
-            "avg_trust_score": round(avg_score, 1) if avg_score else None,
-            "credits": credits,
-            "credit_balances": credit_balances
-        })
+    if sort_by not in COMPANY_SORT_FIELDS:
+        raise HTTPException(status_code=400, detail=f"sort_by must be one of: {', '.join(COMPANY_SORT_FIELDS)}")
+    if order not in ("asc", "desc"):
+        raise HTTPException(status_code=400, detail="order must be 'asc' or 'desc'")
     
-    return companies
+    try:
+        users, next_cursor = await fetch_company_page(
+            db, industry=industry, sort_by=sort_by, descending=order == "desc",
+            cursor=cursor, limit=limit
+        )
+    except (ValueError, TypeError, KeyError, InvalidId):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    
+    headers = {"X-Next-Cursor": next_cursor} if next_cursor else {}
+    return StreamingResponse(
+        _stream_json_array(iter_companies(db, users)),
+        media_type="application/json",
+        headers=headers
+    )
+
+@app.post("/admin/companies/import", response_model=CompanyImportResult)
+async def import_companies(
+    file: UploadFile = File(...), update_existing: bool = False, generate_passwords: bool = False
+):
+    """
+    Register companies in bulk from an .xlsx or .csv file (e.g. a GST registry export).
+    Rows are validated like /auth/register; rejected rows are listed in `errors` with
+    their spreadsheet row number. With `update_existing`, already registered GSTINs
+    have their company profile updated instead of being rejected. New accounts need a
+    Password cell; with `generate_passwords`, empty ones get a random password listed
+    once in `credentials`.
+    """
+    name = (file.filename or "").lower()
+    if not name.endswith((".xlsx", ".xlsm", ".csv")):
+        raise HTTPException(status_code=400, detail="Only .xlsx and .csv files can be imported")
+    
+    upload = await _spool(file, get_settings().onboarding_max_bytes)
+    try:
+        return await onboarding_service.import_companies(
+            get_database(), upload.path, filename=name,
+            update_existing=update_existing, generate_passwords=generate_passwords
+        )
+    except onboarding_service.ImportFormatError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    finally:
+        upload.cleanup()
 
 @app.post("/admin/credits")
 async def assign_credit(credit: CreditAssignment, admin_email: str = "admin@gov.in"):
@@ -427,29 +868,13 @@ async def assign_credit(credit: CreditAssignment, admin_email: str = "admin@gov.
     db = get_database()
     
     # Verify user exists
-    try:
-        user = await db.users.find_one({"_id": ObjectId(credit.user_id)})
-    except Exception:
+    if not ObjectId.is_valid(credit.user_id):
         raise HTTPException(status_code=400, detail="Invalid user ID")
     
+    user = await user_loader.load(db, credit.user_id)
     if not user:
         raise HTTPException(status_code=404, detail="Company not found")
     
-    # For debit, check if user has enough credits of that type
-    if credit.transaction_type == "debit":
-        total_credits = 0
-        async for c in db.credits.find({"user_id": credit.user_id, "credit_type": credit.credit_type}):
-            if c.get("transaction_type", "credit") == "credit":
-                total_credits += c["amount"]
-            else:
-                total_credits -= c["amount"]
-        
-        if total_credits < credit.amount:
-            raise HTTPException(
-                status_code=400, 
-                detail=f"Insufficient {credit.credit_type} credits. Available: {total_credits}"
-            )
-    
     credit_doc = {
         "user_id": credit.user_id,
         "credit_type": credit.credit_type,
@@ -461,7 +886,12 @@ async def assign_credit(credit: CreditAssignment, admin_email: str = "admin@gov.
         "valid_until": credit.valid_until
     }
     
-    result = await db.credits.insert_one(credit_doc)
+    # Debits are checked and applied atomically against the materialized balance
+    try:
+        result = await credit_service.record_transaction(db, credit_doc)
+    except credit_service.InsufficientCreditsError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    await stats_service.record_credit(db, credit_doc)
     
     return {
         "id": str(result.inserted_id),
@@ -477,23 +907,42 @@ async def assign_credit(credit: CreditAssignment, admin_email: str = "admin@gov.
     }
 
 @app.get("/admin/credits")
-async def get_all_credits():
-    """Get all assigned credits."""
+async def get_all_credits(
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = Query(default=None, ge=1, le=1000)
+):
+    """
+    Get all assigned credits, newest first.
+    Supports keyset pagination via `cursor`/`limit`; the next page's cursor is
+    returned in the X-Next-Cursor header.
+    """
     db = get_database()
-    credits = []
     
-    async for credit in db.credits.find().sort("assigned_at", -1):
-        # Get company name
-        try:
-            user = await db.users.find_one({"_id": ObjectId(credit["user_id"])})
-            company_name = user["company_name"] if user else "Unknown"
-        except Exception:
-            company_name = "Unknown"
-        
+    try:
+        query = keyset_filter("assigned_at", True, cursor)
+    except (ValueError, TypeError, KeyError, InvalidId):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    
+    find = db.credits.find(query).sort([("assigned_at", -1), ("_id", -1)])
+    if limit:
+        find = find.limit(limit + 1)
+    docs = await find.to_list(length=None)
+    
+    if limit and len(docs) > limit:
+        docs = docs[:limit]
+        response.headers["X-Next-Cursor"] = encode_cursor(docs[-1]["assigned_at"], docs[-1]["_id"])
+    
+    # Resolve every company name on the page with a single batched lookup
+    users = await user_loader.load_many(db, [doc["user_id"] for doc in docs])
+    
+    credits = []
+    for credit in docs:
+        user = users.get(credit["user_id"])
         credits.append({
             "id": str(credit["_id"]),
             "user_id": credit["user_id"],
-            "company_name": company_name,
+            "company_name": user["company_name"] if user else "Unknown",
             "credit_type": credit["credit_type"],
             "amount": credit["amount"],
             "reason": credit["reason"],
@@ -510,13 +959,16 @@ async def revoke_credit(credit_id: str):
     db = get_database()
     
     try:
-        result = await db.credits.delete_one({"_id": ObjectId(credit_id)})
+        credit_oid = ObjectId(credit_id)
     except Exception:
         raise HTTPException(status_code=400, detail="Invalid credit ID")
     
-    if result.deleted_count == 0:
+    credit = await credit_service.revoke_transaction(db, credit_oid)
+    if credit is None:
         raise HTTPException(status_code=404, detail="Credit not found")
     
+    await stats_service.record_credit(db, credit, sign=-1)
+    
     return {"message": "Credit revoked successfully"}
 
 @app.get("/users/{user_id}/credits")
@@ -534,182 +986,57 @@ async def get_user_credits(user_id: str):
         raise HTTPException(status_code=404, detail="User not found")
     
     credits = []
-    balances = {}
-    
     async for credit in db.credits.find({"user_id": user_id}).sort("assigned_at", -1):
-        ctype = credit["credit_type"]
-        trans_type = credit.get("transaction_type", "credit")
-        
-        if ctype not in balances:
-            balances[ctype] = 0
-        
-        if trans_type == "credit":
-            balances[ctype] += credit["amount"]
-        else:
-            balances[ctype] -= credit["amount"]
-        
         credits.append({
             "id": str(credit["_id"]),
             "credit_type": credit["credit_type"],
             "amount": credit["amount"],
             "reason": credit["reason"],
-            "transaction_type": trans_type,
+            "transaction_type": credit.get("transaction_type", "credit"),
             "assigned_by": credit["assigned_by"],
             "assigned_at": credit["assigned_at"],
             "valid_until": credit.get("valid_until")
         })
     
+    balances = await credit_service.get_balances(db, user_id)
+    
     return {
         "transactions": credits,
         "balances": balances
     }
 
+@app.post("/admin/credits/reconcile")
+async def reconcile_credit_balances():
+    """Rebuild materialized credit balances from the credits ledger."""
+    result = await credit_service.reconcile_balances(get_database())
+    return {"message": "Credit balances reconciled", **result}
+
+@app.get("/admin/diagnostics/query-plans")
+async def get_query_plans():
+    """Explain the hot queries and flag any that fall back to a collection scan or in-memory sort."""
+    results = await index_service.explain_hot_queries(get_database())
+    return {
+        "ok": all(entry["ok"] for entry in results),
+        "queries": results
+    }
+
+@app.get("/admin/diagnostics/text-store")
+async def get_text_store_footprint():
+    """Storage footprint of the corpus: PDFs versus their raw and compressed extracted texts."""
+    return await text_store.footprint(get_database())
+
 @app.get("/admin/stats")
 async def get_admin_stats():
     """Get dashboard statistics for admin."""
-    db = get_database()
-    
-    # Count companies
-    total_companies = await db.users.count_documents({})
-    
-    # Count reports
-    total_reports = await db.reports.count_documents({})
-    
-    # Get reports by traffic light
-    red_count = 0
-    yellow_count = 0
-    green_count = 0
-    total_score = 0
-    score_count = 0
-    
-    async for report in db.reports.find():
-        if report.get("analysis") and report["analysis"].get("scores"):
-            scores = report["analysis"]["scores"]
-            light = scores.get("traffic_light", "").upper()
-            if light == "RED":
-                red_count += 1
-            elif light == "YELLOW":
-                yellow_count += 1
-            elif light == "GREEN":
-                green_count += 1
-            
-            if scores.get("final_trust_score"):
-                total_score += scores["final_trust_score"]
-                score_count += 1
-    
-    # Get total credits by type
-    credit_stats = {}
-    async for credit in db.credits.find():
-        ctype = credit["credit_type"]
-        trans_type = credit.get("transaction_type", "credit")
-        if ctype not in credit_stats:
-            credit_stats[ctype] = 0
-        if trans_type == "credit":
-            credit_stats[ctype] += credit["amount"]
-        else:
-            credit_stats[ctype] -= credit["amount"]
-    
-    # Get industry distribution
-    industry_counts = {}
-    async for user in db.users.find():
-        industry = user.get("industry_type", "Other")
-        if industry not in industry_counts:
-            industry_counts[industry] = 0
-        industry_counts[industry] += 1
-    
-    return {
-        "total_companies": total_companies,
-        "total_reports": total_reports,
-        "avg_trust_score": round(total_score / score_count, 1) if score_count > 0 else None,
-        "traffic_light_distribution": {
-            "red": red_count,
-            "yellow": yellow_count,
-            "green": green_count
-        },
-        "credit_totals": credit_stats,
-        "industry_distribution": industry_counts
-    }
+    return await stats_service.get_admin_stats(get_database())
+
+@app.post("/admin/stats/rebuild")
+async def rebuild_admin_stats():
+    """Recompute the statistics rollup from the reports, users and credits collections."""
+    await stats_service.rebuild_stats(get_database())
+    return {"message": "Statistics rebuilt successfully"}
 
 @app.get("/public/stats")
 async def get_public_stats():
     """Get public statistics visible to all users."""
-    db = get_database()
-    
-    # Count companies
-    total_companies = await db.users.count_documents({})
-    
-    # Count reports
-    total_reports = await db.reports.count_documents({})
-    
-    # Calculate average scores
-    total_score = 0
-    total_specificity = 0
-    total_consistency = 0
-    total_verification = 0
-    score_count = 0
-    red_count = 0
-    yellow_count = 0
-    green_count = 0
-    
-    async for report in db.reports.find():
-        if report.get("analysis") and report["analysis"].get("scores"):
-            scores = report["analysis"]["scores"]
-            if scores.get("final_trust_score"):
-                total_score += scores["final_trust_score"]
-                total_specificity += scores.get("specificity", 0)
-                total_consistency += scores.get("consistency", 0)
-                total_verification += scores.get("verification", 0)
-                score_count += 1
-            
-            light = scores.get("traffic_light", "").upper()
-            if light == "RED":
-                red_count += 1
-            elif light == "YELLOW":
-                yellow_count += 1
-            elif light == "GREEN":
-                green_count += 1
-    
-    # Get industry averages
-    industry_scores = {}
-    async for user in db.users.find():
-        user_id = str(user["_id"])
-        industry = user.get("industry_type", "Other")
-        
-        if industry not in industry_scores:
-            industry_scores[industry] = {"total": 0, "count": 0}
-        
-        async for report in db.reports.find({"user_id": user_id}):
-            if report.get("analysis") and report["analysis"].get("scores"):
-                score = report["analysis"]["scores"].get("final_trust_score", 0)
-                if score:
-                    industry_scores[industry]["total"] += score
-                    industry_scores[industry]["count"] += 1
-    
-    industry_averages = {}
-    for industry, data in industry_scores.items():
-        if data["count"] > 0:
-            industry_averages[industry] = round(data["total"] / data["count"], 1)
-    
-    # Get total credits distributed
-    total_credits = 0
-    async for credit in db.credits.find():
-        if credit.get("transaction_type", "credit") == "credit":
-            total_credits += credit["amount"]
-        else:
-            total_credits -= credit["amount"]
-    
-    return {
-        "total_companies": total_companies,
-        "total_reports": total_reports,
-        "platform_avg_trust_score": round(total_score / score_count, 1) if score_count > 0 else None,
-        "avg_specificity": round(total_specificity / score_count, 1) if score_count > 0 else None,
-        "avg_consistency": round(total_consistency / score_count, 1) if score_count > 0 else None,
-        "avg_verification": round(total_verification / score_count, 1) if score_count > 0 else None,
-        "risk_distribution": {
-            "green": green_count,
-            "yellow": yellow_count,
-            "red": red_count
-        },
-        "industry_averages": industry_averages,
-        "total_credits_distributed": round(total_credits, 1)
-    }
+    return await stats_service.get_public_stats(get_database())
@@ -124,6 +124,99 @@ class ReportResponse(BaseModel):
     user_id: Optional[str] = None
     analysis: AnalysisResult
 
+class ReportSummary(BaseModel):
+    id: str
+    filename: str
+    uploaded_at: datetime
+    user_id: Optional[str] = None
+    company_name: Optional[str] = None
+    industry_type: Optional[str] = None
+    final_trust_score: Optional[float] = None
+    traffic_light: Optional[str] = None
+
+class ReportTotals(BaseModel):
+    total_reports: int
+    avg_trust_score: Optional[float] = None  # over reports that have a score
+
+# Job Models
+class JobStage(BaseModel):
+    name: str
+    completed_at: datetime
+    cached: bool = False
+
+class JobResponse(BaseModel):
+    id: str
+    kind: str
+    status: str  # queued | running | completed | failed
+    stage: Optional[str] = None
+    stages: List[JobStage] = []
+    filename: Optional[str] = None
+    user_id: Optional[str] = None
+    result: Optional[dict] = None
+    error: Optional[str] = None
+    created_at: datetime
+    updated_at: datetime
+
+class JobAccepted(BaseModel):
+    job_id: str
+    status: str = "queued"
+    status_url: str
+    events_url: str
+
+# Batch Models
+class BatchItem(BaseModel):
+    index: int
+    filename: str
+    content_hash: str
+    status: str  # queued | completed | cached | failed
+    duplicate_of: Optional[int] = None
+    report_id: Optional[str] = None
+    error: Optional[str] = None
+
+class BatchResponse(BaseModel):
+    id: str
+    status: str  # queued | running | completed | failed
+    user_id: Optional[str] = None
+    mode: str
+    total: int
+    unique_files: int
+    counts: dict
+    summary: Optional[dict] = None
+    items: List[BatchItem] = []
+    job_id: Optional[str] = None
+    error: Optional[str] = None
+    created_at: datetime
+    updated_at: datetime
+
+class BatchAccepted(BaseModel):
+    batch_id: str
+    job_id: str
+    status: str = "queued"
+    total: int
+    unique_files: int
+    status_url: str
+    events_url: str
+
+class CompanyImportError(BaseModel):
+    row: int  # spreadsheet row number, header = 1
+    gst_number: Optional[str] = None
+    email: Optional[str] = None
+    error: str
+
+class CompanyImportCredential(BaseModel):
+    row: int
+    email: str
+    password: str  # generated at import, shown only in this response
+
+class CompanyImportResult(BaseModel):
+    total_rows: int
+    inserted: int
+    updated: int
+    failed: int
+    elapsed_seconds: float
+    errors: List[CompanyImportError] = []
+    credentials: List[CompanyImportCredential] = []
+
 # Credit Models
 class CreditAssignment(BaseModel):
     user_id: str
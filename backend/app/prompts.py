@@ -1,3 +1,10 @@
+import hashlib
+import inspect
+import json
+
+from .config import get_settings
+from .services import context_service, scoring_service
+
 MASTER_SYSTEM_PROMPT = """Role: You are a Senior ESG Forensic Auditor and Data Scientist.
 Task: Analyze a corporate sustainability report against external news data to detect "Greenwashing."
 
@@ -145,28 +152,52 @@ CRITICAL RULES:
 8. Recommendations should be specific to the company's industry"""
 
 
-def build_analysis_prompt(pdf_text: str, news_data: str) -> str:
-    """Build the complete analysis prompt with PDF and news data."""
-    # Truncate PDF text if too long (keep most relevant parts)
-    max_pdf_length = 12000
-    if len(pdf_text) > max_pdf_length:
-        # Keep beginning and end (usually contains summary and conclusions)
-        half = max_pdf_length // 2
-        pdf_text = pdf_text[:half] + "\n\n[... content truncated ...]\n\n" + pdf_text[-half:]
-    
-    return f"""Analyze the following corporate sustainability report against the external news data.
-Perform a thorough ESG forensic audit using the scoring methodology provided.
+def _news_section(news_data: str) -> str:
+    return news_data if news_data else "No external news data available. Score consistency based on internal document coherence only."
 
-=== SUSTAINABILITY REPORT CONTENT ===
-{pdf_text}
 
-=== EXTERNAL NEWS DATA ===
-{news_data if news_data else "No external news data available. Score consistency based on internal document coherence only."}
+def _signals_section(prescored: dict) -> str:
+    return f"""=== PRECOMPUTED SIGNALS (counted over the full report) ===
+{scoring_service.format_signals(prescored)}
 
-=== END OF DATA ===
+"""
 
-INSTRUCTIONS:
-1. Extract company information from the report
+
+def build_analysis_prompt(pdf_text: str, news_data: str, prescored: dict = None) -> str:
+    """
+    Build the complete analysis prompt with PDF and news data.
+    
+    With `prescored` (scoring_service.prescore) the hard-metric, vague-language and
+    certification counts are given to the model instead of being counted by it, and the
+    count fields are left out of its reply (they are filled in from the signals).
+    """
+    # Keep the most relevant sections within the token budget (metrics tables, certifications,
+    # claims the news mentions) instead of blindly keeping the head and tail
+    settings = get_settings()
+    pdf_text = context_service.select_context(
+        pdf_text,
+        news_data,
+        token_budget=settings.prompt_context_token_budget,
+        chunk_chars=settings.prompt_context_chunk_chars
+    )
+    
+    if prescored:
+        signals = _signals_section(prescored)
+        instructions = """1. Extract company information from the report
+2. Identify all major environmental commitments
+3. Cross-reference claims against news data to find contradictions
+4. Start from the provisional specificity and verification scores; adjust them only where the
+   report content clearly warrants it
+5. Calculate scores using the exact formula: T = (0.40 × S) + (0.35 × C) + (0.25 × V)
+6. Determine traffic light based on final score
+7. Write admin brief highlighting legal risks
+8. Write client feedback with improvement suggestions
+
+Do not count metrics or vague terms yourself and omit vague_language_count and
+hard_metrics_found from audit_details; the precomputed counts are used."""
+    else:
+        signals = ""
+        instructions = """1. Extract company information from the report
 2. Count hard metrics (numbers with units) and vague language instances
 3. Identify all major environmental commitments
 4. Cross-reference claims against news data to find contradictions
@@ -174,6 +205,147 @@ INSTRUCTIONS:
 6. Calculate scores using the exact formula: T = (0.40 × S) + (0.35 × C) + (0.25 × V)
 7. Determine traffic light based on final score
 8. Write admin brief highlighting legal risks
-9. Write client feedback with improvement suggestions
+9. Write client feedback with improvement suggestions"""
+    
+    return f"""Analyze the following corporate sustainability report against the external news data.
+Perform a thorough ESG forensic audit using the scoring methodology provided.
+
+{signals}=== SUSTAINABILITY REPORT CONTENT ===
+{pdf_text}
+
+=== EXTERNAL NEWS DATA ===
+{_news_section(news_data)}
+
+=== END OF DATA ===
+
+INSTRUCTIONS:
+{instructions}
+
+Return the JSON result now."""
+
+
+MAP_SYSTEM_PROMPT = """Role: You are an ESG analyst extracting facts from one section of a long corporate sustainability report.
+Task: Record only what this section states. Do not score, judge or speculate.
+
+Return ONLY a valid JSON object with this exact structure:
+
+{
+  "company_name": "Company name if this section states it, else empty string",
+  "industry_hints": ["Words indicating the industry, if any"],
+  "commitments": ["Each environmental commitment or target, quoted or closely paraphrased"],
+  "metrics": [
+    {"metric": "What is measured", "value": "Number", "unit": "Unit", "year": "Year or period if stated"}
+  ],
+  "certifications": ["Third-party certifications, standards or frameworks mentioned (ISO 14001, SBTi, CDP, GRI, ...)"],
+  "vague_language_count": <number of vague terms such as "eco-friendly", "green", "sustainable", "committed to">,
+  "hard_metrics_found": <number of specific numbers with units or deadlines>,
+  "emission_sources": ["CO2 emission sources described in this section"]
+}
+
+Use empty arrays and 0 when the section contains nothing relevant."""
+
+
+def build_map_prompt(chunk_text: str, first_page: int, last_page: int) -> str:
+    """Build the per-chunk extraction prompt for map-reduce analysis."""
+    return f"""Extract structured ESG findings from pages {first_page}-{last_page} of the report.
+
+=== REPORT SECTION ===
+{chunk_text}
+
+=== END OF SECTION ===
+
+Return the JSON findings now."""
+
+
+def build_merge_prompt(findings: list) -> str:
+    """Build the prompt combining the findings of adjacent page ranges into one findings object."""
+    findings_text = "\n\n".join(
+        f"--- Pages {item['first_page']}-{item['last_page']} ---\n{json.dumps(item['findings'], ensure_ascii=False)}"
+        for item in findings
+    )
+    return f"""Combine the structured ESG findings below, extracted from consecutive sections of one report
+(pages {findings[0]['first_page']}-{findings[-1]['last_page']}), into a single findings object with the same structure.
+Merge duplicate commitments and certifications, keep every distinct metric (the most specific when two
+describe the same figure), and sum vague_language_count and hard_metrics_found.
+
+=== FINDINGS ===
+{findings_text}
+
+=== END OF FINDINGS ===
+
+Return the JSON findings now."""
+
+
+def build_reduce_prompt(findings: list, news_data: str, opening_text: str, prescored: dict = None) -> str:
+    """Build the final analysis prompt from the per-chunk findings of a map-reduce run."""
+    findings_text = "\n\n".join(
+        f"--- Pages {item['first_page']}-{item['last_page']} ---\n{json.dumps(item['findings'], ensure_ascii=False)}"
+        for item in findings
+    )
+    if prescored:
+        signals = _signals_section(prescored)
+        counting = ("Use the precomputed signals for the counts and as the starting point for specificity and "
+                    "verification; omit vague_language_count and hard_metrics_found from audit_details.")
+    else:
+        signals = ""
+        counting = "Sum vague_language_count and hard_metrics_found across sections."
+    
+    return f"""Analyze the following corporate sustainability report against the external news data.
+The report was too long to send in full: it has been pre-processed into structured findings per page range.
+Treat the findings as the complete content of the report and perform a thorough ESG forensic audit using
+the scoring methodology provided. {counting}
+
+{signals}=== REPORT OPENING ===
+{opening_text}
+
+=== STRUCTURED FINDINGS BY PAGE RANGE ===
+{findings_text}
+
+=== EXTERNAL NEWS DATA ===
+{_news_section(news_data)}
+
+=== END OF DATA ===
 
 Return the JSON result now."""
+
+
+def _compute_prompt_version() -> str:
+    """Fingerprint the system prompt, prompt builder and context selection so cached analyses expire when they change."""
+    settings = get_settings()
+    try:
+        builder_source = (
+            inspect.getsource(build_analysis_prompt)
+            + inspect.getsource(context_service)
+            + inspect.getsource(scoring_service)
+        )
+    except (OSError, TypeError):
+        builder_source = build_analysis_prompt.__name__
+    context_config = f"{settings.prompt_context_token_budget}:{settings.prompt_context_chunk_chars}"
+    digest = hashlib.sha256((MASTER_SYSTEM_PROMPT + builder_source + context_config).encode("utf-8"))
+    return digest.hexdigest()[:16]
+
+
+PROMPT_VERSION = _compute_prompt_version()
+
+
+def _compute_map_prompt_version() -> str:
+    """Fingerprint the map prompt only; keys the per-chunk findings cache."""
+    try:
+        source = inspect.getsource(build_map_prompt)
+    except (OSError, TypeError):
+        source = build_map_prompt.__name__
+    digest = hashlib.sha256((MAP_SYSTEM_PROMPT + source).encode("utf-8"))
+    return digest.hexdigest()[:16]
+
+
+def _compute_reduce_prompt_version() -> str:
+    """Fingerprint the merge and reduce prompts, so changing them expires map-reduce analyses but not chunk findings."""
+    try:
+        source = inspect.getsource(build_merge_prompt) + inspect.getsource(build_reduce_prompt)
+    except (OSError, TypeError):
+        source = build_reduce_prompt.__name__
+    return hashlib.sha256(source.encode("utf-8")).hexdigest()[:16]
+
+
+MAP_PROMPT_VERSION = _compute_map_prompt_version()
+REDUCE_PROMPT_VERSION = _compute_reduce_prompt_version()
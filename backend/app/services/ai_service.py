@@ -1,33 +1,33 @@
 import json
 import re
-from openai import AsyncOpenAI
+from typing import Awaitable, Callable, Optional
 from ..prompts import MASTER_SYSTEM_PROMPT, build_analysis_prompt
 from ..models import AnalysisResult
+from .llm_gateway import llm_gateway
+from .metrics_service import span
+from .scoring_service import finalize_scores
+from .stream_parser import IncrementalObjectParser
 
-async def analyze_with_ai(pdf_text: str, news_data: str, api_key: str) -> AnalysisResult:
-    """
-    Send the PDF text and news data to GPT-4o for ESG forensic analysis.
-    
-    The AI calculates Trust Score using: T = (0.40 × S) + (0.35 × C) + (0.25 × V)
-    Where S=Specificity, C=Consistency, V=Verification
-    """
-    
-    client = AsyncOpenAI(api_key=api_key)
-    
-    user_prompt = build_analysis_prompt(pdf_text, news_data)
-    
-    response = await client.chat.completions.create(
-        model="gpt-4o",
-        messages=[
-            {"role": "system", "content": MASTER_SYSTEM_PROMPT},
-            {"role": "user", "content": user_prompt}
-        ],
-        temperature=0.2,
-        max_tokens=2500,
-        response_format={"type": "json_object"}
-    )
-    
-    content = response.choices[0].message.content.strip()
+SectionCallback = Callable[[str, object], Awaitable[None]]
+
+def _build_messages(pdf_text: str, news_data: str, prescored: Optional[dict] = None) -> list:
+    user_prompt = build_analysis_prompt(pdf_text, news_data, prescored)
+    return [
+        {"role": "system", "content": MASTER_SYSTEM_PROMPT},
+        {"role": "user", "content": user_prompt}
+    ]
+
+def apply_signals(audit_details: dict, prescored: Optional[dict]) -> dict:
+    """Fill in the counts the model was told not to produce from the precomputed signals."""
+    if prescored and isinstance(audit_details, dict):
+        signals = prescored["signals"]
+        audit_details["vague_language_count"] = signals["vague_language_count"]
+        audit_details["hard_metrics_found"] = signals["hard_metrics_found"]
+    return audit_details
+
+def parse_analysis_content(content: str, prescored: Optional[dict] = None) -> AnalysisResult:
+    """Parse the model's JSON reply into a validated AnalysisResult."""
+    content = content.strip()
     
     # Clean up markdown code blocks if present
     if content.startswith("```"):
@@ -41,23 +41,70 @@ async def analyze_with_ai(pdf_text: str, news_data: str, api_key: str) -> Analys
         raise ValueError(f"Failed to parse AI response as JSON: {e}\nResponse: {content[:500]}") from e
     
     # Validate and recalculate the scoring formula
-    scores = result_dict.get("scores", {})
-    s = scores.get("specificity", 0)
-    c = scores.get("consistency", 0)
-    v = scores.get("verification", 0)
+    result_dict["scores"] = finalize_scores(result_dict.get("scores", {}))
+    if prescored:
+        result_dict["audit_details"] = apply_signals(result_dict.get("audit_details", {}), prescored)
+    
+    return AnalysisResult(**result_dict)
+
+async def analyze_with_ai(
+    pdf_text: str,
+    news_data: str,
+    api_key: str,
+    prescored: Optional[dict] = None
+) -> AnalysisResult:
+    """
+    Send the PDF text and news data to GPT-4o for ESG forensic analysis.
+    
+    The AI calculates Trust Score using: T = (0.40 × S) + (0.35 × C) + (0.25 × V)
+    Where S=Specificity, C=Consistency, V=Verification
     
-    # T_score = (0.40 × S) + (0.35 × C) + (0.25 × V)
-    calculated_score = round((0.40 * s) + (0.35 * c) + (0.25 * v), 1)
-    scores["final_trust_score"] = calculated_score
+    `prescored` (scoring_service.prescore) gives the model the metric, vague-language
+    and certification counts so it does not have to count them itself.
+    """
     
-    # Traffic light based on score thresholds
-    if calculated_score < 40:
-        scores["traffic_light"] = "RED"
-    elif calculated_score < 75:
-        scores["traffic_light"] = "YELLOW"
-    else:
-        scores["traffic_light"] = "GREEN"
+    with span("analyze_with_ai"):
+        response = await llm_gateway.chat_completion(
+            api_key,
+            model="gpt-4o",
+            messages=_build_messages(pdf_text, news_data, prescored),
+            temperature=0.2,
+            max_tokens=2500,
+            response_format={"type": "json_object"}
+        )
     
-    result_dict["scores"] = scores
+    return parse_analysis_content(response.choices[0].message.content, prescored)
+
+async def stream_analysis_with_ai(
+    pdf_text: str,
+    news_data: str,
+    api_key: str,
+    on_section: Optional[SectionCallback] = None,
+    prescored: Optional[dict] = None
+) -> AnalysisResult:
+    """
+    Streaming variant of `analyze_with_ai`.
     
-    return AnalysisResult(**result_dict)
+    Each top-level section of the JSON reply (company_info, scores, audit_details, ...)
+    is passed to `on_section` as soon as it is complete; the full result is validated at the end.
+    """
+    parser = IncrementalObjectParser()
+    
+    with span("stream_analysis_with_ai"):
+        async for delta in llm_gateway.stream_chat_completion(
+            api_key,
+            model="gpt-4o",
+            messages=_build_messages(pdf_text, news_data, prescored),
+            temperature=0.2,
+            max_tokens=2500,
+            response_format={"type": "json_object"}
+        ):
+            for key, value in parser.feed(delta):
+                if key == "scores" and isinstance(value, dict):
+                    value = finalize_scores(value)
+                elif key == "audit_details":
+                    value = apply_signals(value, prescored)
+                if on_section:
+                    await on_section(key, value)
+    
+    return parse_analysis_content(parser.text, prescored)
@@ -26,6 +26,8 @@ async def create_user(db, user_data: dict) -> dict:
         "email": user_data["email"].lower(),
         "company_name": user_data["company_name"],
         "industry_type": user_data["industry_type"],
+        "gst_legal_name": user_data.get("gst_legal_name"),
+        "gst_state": user_data.get("gst_state"),
         "password_hash": hash_password(user_data["password"]),
         "role": "client",
         "created_at": datetime.utcnow(),
@@ -0,0 +1,237 @@
+import asyncio
+import uuid
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from ..config import get_settings
+from .cache_service import analysis_cache, make_cache_key
+from .file_service import release_pdf, retain_pdf, store_pdf
+from .metrics_service import span
+from .gst_registry import resolve_company_name
+from .job_service import INSTANCE_ID
+from .pipeline_service import PipelineError, build_report_doc, extract_stage, news_stage, ai_stage
+from .upload_service import SpooledUpload, discard_spooled
+from . import stats_service, text_store
+
+BATCH_COLLECTION = "batches"
+
+
+async def create_batch(db, uploads: List[SpooledUpload], user_id: Optional[str], mode: str) -> dict:
+    """
+    Record a new batch. Files with identical content are marked as duplicates of
+    the first occurrence and share its analysis.
+    """
+    items = []
+    first_by_hash: Dict[str, int] = {}
+    for index, upload in enumerate(uploads):
+        duplicate_of = first_by_hash.setdefault(upload.content_hash, index)
+        items.append({
+            "index": index,
+            "filename": upload.filename,
+            "content_hash": upload.content_hash,
+            "status": "queued",
+            "duplicate_of": duplicate_of if duplicate_of != index else None,
+            "report_id": None,
+            "error": None,
+        })
+
+    now = datetime.utcnow()
+    batch = {
+        "_id": uuid.uuid4().hex,
+        "status": "queued",
+        "user_id": user_id,
+        "mode": mode,
+        "total": len(items),
+        "unique_files": len(first_by_hash),
+        "counts": {"completed": 0, "cached": 0, "failed": 0},
+        "summary": None,
+        "items": items,
+        "job_id": None,
+        "owner": INSTANCE_ID,
+        "created_at": now,
+        "updated_at": now,
+    }
+    await db[BATCH_COLLECTION].insert_one(batch)
+    return batch
+
+
+async def get_batch(db, batch_id: str) -> Optional[dict]:
+    return await db[BATCH_COLLECTION].find_one({"_id": batch_id})
+
+
+async def _update(db, batch_id: str, fields: dict, inc: Optional[dict] = None):
+    update = {"$set": {**fields, "updated_at": datetime.utcnow()}}
+    if inc:
+        update["$inc"] = inc
+    await db[BATCH_COLLECTION].update_one({"_id": batch_id}, update)
+
+
+def _summarize(report_docs: List[dict]) -> dict:
+    scores = []
+    lights = {"red": 0, "yellow": 0, "green": 0}
+    for doc in report_docs:
+        report_scores = doc["analysis"].get("scores") or {}
+        if report_scores.get("final_trust_score") is not None:
+            scores.append(report_scores["final_trust_score"])
+        light = (report_scores.get("traffic_light") or "").lower()
+        if light in lights:
+            lights[light] += 1
+    return {
+        "avg_trust_score": round(sum(scores) / len(scores), 1) if scores else None,
+        "traffic_light_distribution": lights,
+    }
+
+
+async def run_batch(db, fs, batch_id: str, paths: List[str], progress=None) -> dict:
+    """
+    Analyze every file of a batch and save the reports.
+
+    Each unique file goes through store -> extract -> news -> AI, with a separate
+    concurrency limit per stage. Identical files are analyzed once, and news for a
+    company is looked up once per batch. Reports are written with insert_many in
+    groups of BATCH_INSERT_SIZE; spooled files are removed at the end.
+    """
+    settings = get_settings()
+    batch = await get_batch(db, batch_id)
+    mode = batch["mode"]
+    user_id = batch["user_id"]
+    items = batch["items"]
+
+    store_slots = asyncio.Semaphore(settings.batch_store_concurrency)
+    extract_slots = asyncio.Semaphore(settings.batch_extract_concurrency)
+    news_slots = asyncio.Semaphore(settings.batch_news_concurrency)
+    ai_slots = asyncio.Semaphore(settings.batch_ai_concurrency)
+
+    news_lookups: Dict[str, asyncio.Task] = {}
+
+    async def lookup_news(company_name: str) -> str:
+        task = news_lookups.get(company_name)
+        if task is None:
+            async def run():
+                async with news_slots:
+                    return await news_stage(company_name, settings, mode)
+            task = news_lookups[company_name] = asyncio.create_task(run())
+        return await task
+
+    async def analyze_unique(item: dict):
+        path = paths[item["index"]]
+        async with store_slots:
+            try:
+                with span("pipeline.store"):
+                    file_id = await store_pdf(db, fs, item["filename"], path, item["content_hash"])
+            except Exception as e:
+                raise PipelineError(500, f"Failed to store file: {e}")
+        try:
+            cache_key = make_cache_key(item["content_hash"], mode)
+            analysis = await analysis_cache.get(db, cache_key)
+            if analysis is not None:
+                return file_id, analysis, True
+
+            pages = await text_store.load_pages(db, item["content_hash"])
+            if pages is None:
+                async with extract_slots:
+                    pages = await extract_stage(path)
+                await text_store.save_pages(db, item["content_hash"], pages)
+            news_data = await lookup_news(resolve_company_name("\n".join(pages)))
+            async with ai_slots:
+                analysis = await ai_stage(db, pages, news_data, settings, mode=mode)
+            await analysis_cache.set(db, cache_key, item["content_hash"], analysis)
+            return file_id, analysis, False
+        except BaseException:
+            # No report will hold the blob
+            await release_pdf(db, fs, str(file_id))
+            raise
+
+    analyses = {
+        item["content_hash"]: asyncio.create_task(analyze_unique(item))
+        for item in items if item["duplicate_of"] is None
+    }
+
+    pending = []
+    saved_docs = []
+    flush_lock = asyncio.Lock()
+
+    async def flush():
+        async with flush_lock:
+            if not pending:
+                return
+            group = pending[:]
+            pending.clear()
+            docs = [doc for _, doc, _ in group]
+            try:
+                with span("batch.insert"):
+                    result = await db.reports.insert_many(docs)
+            except Exception as e:
+                for _, doc, _ in group:
+                    await release_pdf(db, fs, doc["file_id"])
+                fields = {}
+                for index, _, _ in group:
+                    fields[f"items.{index}.status"] = "failed"
+                    fields[f"items.{index}.error"] = f"Failed to save report: {e}"
+                await _update(db, batch_id, fields, {"counts.failed": len(group)})
+                return
+            await stats_service.record_reports(db, docs)
+            saved_docs.extend(docs)
+
+            fields = {}
+            inc = {}
+            for (index, _, cached), report_id in zip(group, result.inserted_ids):
+                status = "cached" if cached else "completed"
+                fields[f"items.{index}.status"] = status
+                fields[f"items.{index}.report_id"] = str(report_id)
+                inc[f"counts.{status}"] = inc.get(f"counts.{status}", 0) + 1
+            await _update(db, batch_id, fields, inc)
+
+    async def finish(item: dict):
+        try:
+            file_id, analysis, cached = await analyses[item["content_hash"]]
+        except Exception as e:
+            detail = e.detail if isinstance(e, PipelineError) else f"Analysis failed: {e}"
+            await _update(db, batch_id, {
+                f"items.{item['index']}.status": "failed",
+                f"items.{item['index']}.error": detail,
+            }, {"counts.failed": 1})
+            return
+
+        # Duplicates within the batch count as cached: they reuse the first copy's analysis.
+        # Each report holds its own reference on the shared blob
+        if item["duplicate_of"] is not None:
+            await retain_pdf(db, file_id)
+        cached = cached or item["duplicate_of"] is not None
+        doc = build_report_doc(item["filename"], file_id, item["content_hash"], user_id, analysis)
+        pending.append((item["index"], doc, cached))
+        if len(pending) >= settings.batch_insert_size:
+            await flush()
+
+    await _update(db, batch_id, {"status": "running"})
+    if progress:
+        await progress("analyzing", total=len(items), unique_files=len(analyses))
+    try:
+        await asyncio.gather(*(finish(item) for item in items))
+        await flush()
+    except Exception as e:
+        await _update(db, batch_id, {"status": "failed", "error": str(e)})
+        raise
+    finally:
+        for task in analyses.values():
+            task.cancel()
+        for path in paths:
+            discard_spooled(path)
+
+    summary = _summarize(saved_docs)
+    await _update(db, batch_id, {"status": "completed", "summary": summary})
+    if progress:
+        await progress("saved", reports=len(saved_docs), failed=len(items) - len(saved_docs))
+    return {"batch_id": batch_id, "reports": len(saved_docs), "failed": len(items) - len(saved_docs)}
+
+
+async def mark_interrupted(db, live_owners: List[str]):
+    """Job reaper: batches of a process that stopped heartbeating lost their spooled files."""
+    await db[BATCH_COLLECTION].update_many(
+        {"status": {"$in": ["queued", "running"]}, "owner": {"$nin": live_owners}},
+        {"$set": {
+            "status": "failed",
+            "error": "Batch interrupted: the server process running it stopped",
+            "updated_at": datetime.utcnow()
+        }}
+    )
@@ -0,0 +1,89 @@
+import hashlib
+from collections import OrderedDict
+from datetime import datetime
+from typing import Optional
+
+from ..config import get_settings
+from ..models import AnalysisResult
+from ..prompts import PROMPT_VERSION, MAP_PROMPT_VERSION, REDUCE_PROMPT_VERSION
+from .metrics_service import CACHE_LOOKUPS
+
+
+def compute_content_hash(file_bytes: bytes) -> str:
+    """Return the SHA-256 hex digest of the uploaded file."""
+    return hashlib.sha256(file_bytes).hexdigest()
+
+
+def make_cache_key(content_hash: str, mode: str = "standard") -> str:
+    """Cache key combining the file content hash with the prompt version(s) the analysis mode uses."""
+    if mode == "mapreduce":
+        map_model = get_settings().mapreduce_map_model
+        return f"{content_hash}:{PROMPT_VERSION}:{MAP_PROMPT_VERSION}:{REDUCE_PROMPT_VERSION}:{map_model}:mapreduce"
+    if mode == "fast":
+        return f"{content_hash}:{PROMPT_VERSION}:fast"
+    return f"{content_hash}:{PROMPT_VERSION}"
+
+
+class AnalysisCache:
+    """
+    Two-level cache for AI analysis results.
+    
+    An in-process LRU sits in front of the `analysis_cache` Mongo collection,
+    whose documents expire through a TTL index on `created_at`.
+    """
+    
+    collection_name = "analysis_cache"
+    
+    def __init__(self, max_size: int = 256):
+        self.max_size = max_size
+        self._lru: "OrderedDict[str, AnalysisResult]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+    
+    def _remember(self, key: str, analysis: AnalysisResult):
+        self._lru[key] = analysis
+        self._lru.move_to_end(key)
+        while len(self._lru) > self.max_size:
+            self._lru.popitem(last=False)
+    
+    async def get(self, db, key: str) -> Optional[AnalysisResult]:
+        """Look up a cached analysis, promoting Mongo hits into the LRU."""
+        if key in self._lru:
+            self._lru.move_to_end(key)
+            self.hits += 1
+            CACHE_LOOKUPS.inc("analysis", "hit_memory")
+            return self._lru[key]
+        
+        doc = await db[self.collection_name].find_one({"_id": key})
+        if not doc:
+            self.misses += 1
+            CACHE_LOOKUPS.inc("analysis", "miss")
+            return None
+        
+        analysis = AnalysisResult(**doc["analysis"])
+        self._remember(key, analysis)
+        self.hits += 1
+        CACHE_LOOKUPS.inc("analysis", "hit_mongo")
+        return analysis
+    
+    async def set(self, db, key: str, content_hash: str, analysis: AnalysisResult):
+        """Store an analysis in both cache levels."""
+        self._remember(key, analysis)
+        await db[self.collection_name].replace_one(
+            {"_id": key},
+            {
+                "_id": key,
+                "content_hash": content_hash,
+                "prompt_version": PROMPT_VERSION,
+                "analysis": analysis.model_dump(),
+                "created_at": datetime.utcnow(),
+            },
+            upsert=True
+        )
+    
+    def clear(self):
+        """Drop the in-process LRU (Mongo entries expire on their own)."""
+        self._lru.clear()
+
+
+analysis_cache = AnalysisCache(max_size=get_settings().analysis_cache_lru_size)
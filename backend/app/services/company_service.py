@@ -0,0 +1,122 @@
+from typing import AsyncIterator, List, Optional, Tuple
+
+from .credit_service import get_balances_for_users
+from .pagination import encode_cursor, keyset_filter
+from .user_loader import user_loader
+
+COMPANY_SORT_FIELDS = ("created_at", "company_name")
+
+USER_PROJECTION = {
+    "gst_number": 1, "email": 1, "company_name": 1, "industry_type": 1, "created_at": 1
+}
+
+CREDIT_PROJECTION = {
+    "user_id": 1, "credit_type": 1, "amount": 1, "reason": 1, "transaction_type": 1,
+    "assigned_by": 1, "assigned_at": 1, "valid_until": 1
+}
+
+
+async def _report_summaries(db, user_ids: List[str]) -> dict:
+    """Report count and average trust score per user, computed in one aggregation."""
+    summaries = {}
+    async for row in db.reports.aggregate([
+        {"$match": {"user_id": {"$in": user_ids}}},
+        {"$group": {
+            "_id": "$user_id",
+            "total_reports": {"$sum": 1},
+            "avg_trust_score": {"$avg": {"$ifNull": ["$analysis.scores.final_trust_score", 0]}}
+        }}
+    ]):
+        summaries[row["_id"]] = row
+    return summaries
+
+
+async def _credits_by_user(db, user_ids: List[str]) -> dict:
+    """All credit transactions for the given users, newest first, in one query."""
+    credits = {user_id: [] for user_id in user_ids}
+    async for credit in db.credits.find(
+        {"user_id": {"$in": user_ids}}, CREDIT_PROJECTION
+    ).sort("assigned_at", -1):
+        credits[credit["user_id"]].append(credit)
+    return credits
+
+
+def _build_company(user: dict, summary: Optional[dict], credit_docs: List[dict], credit_balances: dict) -> dict:
+    user_id = str(user["_id"])
+    credits = []
+    for credit in credit_docs:
+        credits.append({
+            "id": str(credit["_id"]),
+            "user_id": credit["user_id"],
+            "company_name": user["company_name"],
+            "credit_type": credit["credit_type"],
+            "amount": credit["amount"],
+            "reason": credit["reason"],
+            "transaction_type": credit.get("transaction_type", "credit"),
+            "assigned_by": credit["assigned_by"],
+            "assigned_at": credit["assigned_at"],
+            "valid_until": credit.get("valid_until")
+        })
+
+    avg_score = summary["avg_trust_score"] if summary else None
+    return {
+        "id": user_id,
+        "gst_number": user["gst_number"],
+        "email": user["email"],
+        "company_name": user["company_name"],
+        "industry_type": user["industry_type"],
+        "created_at": user["created_at"],
+        "total_reports": summary["total_reports"] if summary else 0,
+        "avg_trust_score": round(avg_score, 1) if avg_score else None,
+        "credits": credits,
+        "credit_balances": credit_balances
+    }
+
+
+async def _hydrate(db, users: List[dict]) -> List[dict]:
+    """Attach report summaries, credits and balances to a batch of users with three bulk queries."""
+    user_ids = [str(user["_id"]) for user in users]
+    summaries = await _report_summaries(db, user_ids)
+    credits = await _credits_by_user(db, user_ids)
+    balances = await get_balances_for_users(db, user_ids)
+    return [
+        _build_company(user, summaries.get(user_id), credits[user_id], balances[user_id])
+        for user, user_id in zip(users, user_ids)
+    ]
+
+
+async def fetch_company_page(
+    db,
+    industry: Optional[str] = None,
+    sort_by: str = "created_at",
+    descending: bool = True,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = None,
+) -> Tuple[List[dict], Optional[str]]:
+    """
+    Select one page of users in (sort_by, _id) keyset order.
+    Returns the users and the cursor for the next page (None on the last page).
+    """
+    query = {"industry_type": industry} if industry else {}
+    query.update(keyset_filter(sort_by, descending, cursor))
+    direction = -1 if descending else 1
+
+    find = db.users.find(query, USER_PROJECTION).sort([(sort_by, direction), ("_id", direction)])
+    if limit:
+        find = find.limit(limit + 1)
+    users = await find.to_list(length=None)
+    user_loader.prime(users)
+
+    next_cursor = None
+    if limit and len(users) > limit:
+        users = users[:limit]
+        last = users[-1]
+        next_cursor = encode_cursor(last.get(sort_by), last["_id"])
+    return users, next_cursor
+
+
+async def iter_companies(db, users: List[dict], batch_size: int = 500) -> AsyncIterator[dict]:
+    """Yield company records for `users`, hydrating them in batches."""
+    for start in range(0, len(users), batch_size):
+        for company in await _hydrate(db, users[start:start + batch_size]):
+            yield company
@@ -0,0 +1,134 @@
+import math
+import re
+from collections import Counter
+from typing import List
+
+# Terms that mark the parts of a sustainability report worth sending to the model
+ESG_KEYWORDS = [
+    "emission", "emissions", "scope", "co2", "co2e", "carbon", "ghg", "greenhouse",
+    "net", "zero", "neutral", "target", "baseline", "reduction", "reduced", "intensity",
+    "energy", "renewable", "solar", "wind", "electricity", "kwh", "mwh", "gwh",
+    "water", "withdrawal", "discharge", "effluent", "waste", "landfill", "recycled", "hazardous",
+    "tonnes", "tons", "metric", "liters", "percent",
+    "iso", "14001", "50001", "certified", "certification", "audit", "assurance", "verified",
+    "sbti", "cdp", "gri", "leed", "b-corp", "tcfd", "brsr",
+    "fine", "penalty", "violation", "pollution", "spill", "lawsuit", "compliance",
+]
+
+STOPWORDS = {
+    "the", "a", "an", "and", "or", "of", "to", "in", "on", "for", "with", "by", "at", "from",
+    "is", "are", "was", "were", "be", "been", "this", "that", "its", "it", "as", "has", "have",
+    "source", "http", "https", "www", "com",
+}
+
+TOKEN_RE = re.compile(r"[a-z0-9][a-z0-9\-]+")
+METRIC_RE = re.compile(r"\d[\d,\.]*\s*(?:%|tons?|tonnes?|kg|mt|kwh|mwh|gwh|liters?|litres?|kl|m3|tco2e?)", re.IGNORECASE)
+
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token estimate (~4 characters per token for English prose)."""
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+def tokenize(text: str) -> List[str]:
+    return [token for token in TOKEN_RE.findall(text.lower()) if token not in STOPWORDS]
+
+
+def split_into_chunks(text: str, max_chars: int = 1200) -> List[str]:
+    """Split text into section-sized chunks on line boundaries."""
+    chunks = []
+    current = []
+    size = 0
+
+    for line in text.split("\n"):
+        # Hard-wrap pathological single lines so no chunk exceeds the limit
+        while len(line) > max_chars:
+            if current:
+                chunks.append("\n".join(current))
+                current, size = [], 0
+            chunks.append(line[:max_chars])
+            line = line[max_chars:]
+
+        if size + len(line) > max_chars and current:
+            chunks.append("\n".join(current))
+            current, size = [], 0
+        current.append(line)
+        size += len(line) + 1
+
+    if current:
+        chunks.append("\n".join(current))
+
+    return [chunk for chunk in chunks if chunk.strip()]
+
+
+def bm25_scores(chunks: List[str], query_terms: List[str], k1: float = 1.5, b: float = 0.75) -> List[float]:
+    """Score each chunk against the query with Okapi BM25, treating the chunks as the corpus."""
+    tokenized = [tokenize(chunk) for chunk in chunks]
+    n = len(tokenized)
+    avg_len = sum(len(tokens) for tokens in tokenized) / n if n else 0
+    query = set(query_terms)
+
+    document_frequency = Counter()
+    for tokens in tokenized:
+        document_frequency.update(query.intersection(tokens))
+
+    scores = []
+    for tokens in tokenized:
+        counts = Counter(tokens)
+        length_norm = k1 * (1 - b + b * len(tokens) / avg_len) if avg_len else k1
+        score = 0.0
+        for term in query:
+            tf = counts.get(term)
+            if not tf:
+                continue
+            df = document_frequency[term]
+            idf = math.log(1 + (n - df + 0.5) / (df + 0.5))
+            score += idf * tf * (k1 + 1) / (tf + length_norm)
+        scores.append(score)
+    return scores
+
+
+def select_context(pdf_text: str, news_data: str, token_budget: int, chunk_chars: int = 1200) -> str:
+    """
+    Pack the most relevant parts of a report into `token_budget` tokens.
+
+    Chunks are ranked by BM25 against ESG keywords and the news snippets, with a
+    bonus for hard metrics; the opening chunk (company name, summary) is always kept.
+    Selected chunks are returned in document order with gaps marked.
+    """
+    if estimate_tokens(pdf_text) <= token_budget:
+        return pdf_text
+
+    chunks = split_into_chunks(pdf_text, chunk_chars)
+    if not chunks:
+        return pdf_text
+
+    query_terms = ESG_KEYWORDS + tokenize(news_data or "")
+    scores = bm25_scores(chunks, query_terms)
+    for index, chunk in enumerate(chunks):
+        scores[index] += 0.5 * min(len(METRIC_RE.findall(chunk)), 10)
+
+    ranked = sorted(range(1, len(chunks)), key=lambda index: scores[index], reverse=True)
+
+    selected = {0}
+    used = estimate_tokens(chunks[0])
+    for index in ranked:
+        cost = estimate_tokens(chunks[index])
+        if used + cost > token_budget:
+            continue
+        selected.add(index)
+        used += cost
+
+    parts = []
+    previous = -1
+    for index in sorted(selected):
+        if index != previous + 1:
+            parts.append("[... content omitted ...]")
+        parts.append(chunks[index])
+        previous = index
+    if previous != len(chunks) - 1:
+        parts.append("[... content omitted ...]")
+
+    return "\n\n".join(parts)
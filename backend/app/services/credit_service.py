@@ -0,0 +1,161 @@
+from contextlib import asynccontextmanager
+from datetime import datetime
+from typing import Dict, Iterable, Optional
+
+from pymongo import ReplaceOne
+
+from ..config import get_settings
+
+BALANCES_COLLECTION = "credit_balances"
+
+
+class InsufficientCreditsError(Exception):
+    """Raised when a debit would take a balance below zero."""
+
+    def __init__(self, credit_type: str, available: float):
+        super().__init__(f"Insufficient {credit_type} credits. Available: {available}")
+        self.credit_type = credit_type
+        self.available = available
+
+
+def balance_id(user_id: str, credit_type: str) -> str:
+    return f"{user_id}:{credit_type}"
+
+
+def signed_amount(credit_doc: dict) -> float:
+    if credit_doc.get("transaction_type", "credit") == "credit":
+        return credit_doc["amount"]
+    return -credit_doc["amount"]
+
+
+@asynccontextmanager
+async def _transaction(db):
+    """Yield a session inside a transaction when enabled (needs a replica set), else None."""
+    if not get_settings().mongodb_transactions:
+        yield None
+        return
+    async with await db.client.start_session() as session:
+        async with session.start_transaction():
+            yield session
+
+
+async def _inc_balance(db, user_id: str, credit_type: str, delta: float, session=None, require_funds: bool = False):
+    """Apply `delta` to a balance; with `require_funds` the update only matches if it stays >= 0."""
+    query = {"_id": balance_id(user_id, credit_type)}
+    if require_funds:
+        query["balance"] = {"$gte": -delta}
+    return await db[BALANCES_COLLECTION].update_one(
+        query,
+        {
+            "$inc": {"balance": delta},
+            "$set": {"updated_at": datetime.utcnow()},
+            "$setOnInsert": {"user_id": user_id, "credit_type": credit_type},
+        },
+        upsert=not require_funds,
+        session=session
+    )
+
+
+async def record_transaction(db, credit_doc: dict):
+    """
+    Insert a ledger entry and update the materialized balance together.
+
+    Debits are a single conditional update, so concurrent debits cannot overdraw.
+    Without transactions the balance update is compensated if the ledger insert fails.
+    """
+    user_id = credit_doc["user_id"]
+    credit_type = credit_doc["credit_type"]
+    delta = signed_amount(credit_doc)
+    is_debit = delta < 0
+
+    async with _transaction(db) as session:
+        result = await _inc_balance(db, user_id, credit_type, delta, session=session, require_funds=is_debit)
+        if is_debit and result.matched_count == 0:
+            balances = await get_balances(db, user_id, session=session)
+            raise InsufficientCreditsError(credit_type, balances.get(credit_type, 0))
+
+        try:
+            return await db.credits.insert_one(credit_doc, session=session)
+        except Exception:
+            if session is None:
+                await _inc_balance(db, user_id, credit_type, -delta)
+            raise
+
+
+async def revoke_transaction(db, credit_id) -> Optional[dict]:
+    """Delete a ledger entry and reverse its effect on the balance. Returns the deleted entry."""
+    async with _transaction(db) as session:
+        credit = await db.credits.find_one_and_delete({"_id": credit_id}, session=session)
+        if credit is None:
+            return None
+        await _inc_balance(db, credit["user_id"], credit["credit_type"], -signed_amount(credit), session=session)
+        return credit
+
+
+async def get_balances(db, user_id: str, session=None) -> Dict[str, float]:
+    """Current balance per credit type for one user."""
+    balances = {}
+    async for doc in db[BALANCES_COLLECTION].find({"user_id": user_id}, session=session):
+        balances[doc["credit_type"]] = doc["balance"]
+    return balances
+
+
+async def get_balances_for_users(db, user_ids: Iterable[str]) -> Dict[str, Dict[str, float]]:
+    """Balances for many users in one query."""
+    user_ids = list(user_ids)
+    balances = {user_id: {} for user_id in user_ids}
+    async for doc in db[BALANCES_COLLECTION].find({"user_id": {"$in": user_ids}}):
+        balances[doc["user_id"]][doc["credit_type"]] = doc["balance"]
+    return balances
+
+
+async def reconcile_balances(db) -> dict:
+    """Rebuild every balance from the ledger. Returns how many balances changed or were removed."""
+    expected = {}
+    async for row in db.credits.aggregate([
+        {"$group": {
+            "_id": {"user_id": "$user_id", "credit_type": "$credit_type"},
+            "balance": {"$sum": {"$cond": [
+                {"$eq": [{"$ifNull": ["$transaction_type", "credit"]}, "credit"]},
+                "$amount",
+                {"$multiply": ["$amount", -1]}
+            ]}}
+        }}
+    ]):
+        key = balance_id(row["_id"]["user_id"], row["_id"]["credit_type"])
+        expected[key] = {
+            "_id": key,
+            "user_id": row["_id"]["user_id"],
+            "credit_type": row["_id"]["credit_type"],
+            "balance": row["balance"],
+        }
+
+    corrected = 0
+    stale = []
+    async for doc in db[BALANCES_COLLECTION].find():
+        target = expected.get(doc["_id"])
+        if target is None:
+            stale.append(doc["_id"])
+        elif doc.get("balance") == target["balance"]:
+            expected.pop(doc["_id"])
+
+    now = datetime.utcnow()
+    if expected:
+        corrected = len(expected)
+        await db[BALANCES_COLLECTION].bulk_write([
+            ReplaceOne({"_id": key}, {**doc, "updated_at": now}, upsert=True)
+            for key, doc in expected.items()
+        ])
+    if stale:
+        await db[BALANCES_COLLECTION].delete_many({"_id": {"$in": stale}})
+
+    return {"corrected": corrected, "removed": len(stale)}
+
+
+async def ensure_balances(db):
+    """Materialize balances on first start when the ledger predates them."""
+    if await db[BALANCES_COLLECTION].count_documents({}, limit=1):
+        return
+    if await db.credits.count_documents({}, limit=1):
+        result = await reconcile_balances(db)
+        print(f"Credit balances rebuilt from ledger: {result}")
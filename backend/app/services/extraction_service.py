@@ -0,0 +1,212 @@
+import asyncio
+import multiprocessing
+import os
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import partial
+
+from ..config import get_settings
+from .pdf_service import PdfSource, extract_page_texts, count_pdf_pages, extract_pdf_preview
+from .upload_service import discard_spooled, spool_directory
+
+
+class ExtractionLimitError(ValueError):
+    """Raised when a PDF exceeds the configured page limit."""
+
+
+class ExtractionTimeoutError(TimeoutError):
+    """Raised when extraction does not finish within the configured time budget."""
+
+
+def _spool_bytes(data: bytes) -> str:
+    """Write PDF bytes to a temporary file in the upload spool; the caller discards it."""
+    fd, path = tempfile.mkstemp(suffix=".pdf", dir=spool_directory())
+    with os.fdopen(fd, "wb") as out:
+        out.write(data)
+    return path
+
+
+class ExtractionMetrics:
+    """Counters for the extraction engine, cheap enough to update on every call."""
+
+    def __init__(self):
+        self.in_flight_tasks = 0
+        self.completed = 0
+        self.failed = 0
+        self.timeouts = 0
+        self.pool_restarts = 0
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+        self.last_seconds = 0.0
+
+    def record(self, seconds: float, ok: bool = True):
+        if ok:
+            self.completed += 1
+        else:
+            self.failed += 1
+        self.total_seconds += seconds
+        self.last_seconds = seconds
+        self.max_seconds = max(self.max_seconds, seconds)
+
+    def snapshot(self, workers: int) -> dict:
+        finished = self.completed + self.failed
+        return {
+            "workers": workers,
+            "in_flight_tasks": self.in_flight_tasks,
+            "queue_depth": max(0, self.in_flight_tasks - workers),
+            "completed": self.completed,
+            "failed": self.failed,
+            "timeouts": self.timeouts,
+            "pool_restarts": self.pool_restarts,
+            "avg_latency_seconds": round(self.total_seconds / finished, 4) if finished else None,
+            "max_latency_seconds": round(self.max_seconds, 4),
+            "last_latency_seconds": round(self.last_seconds, 4),
+        }
+
+
+class ExtractionEngine:
+    """
+    Runs CPU-bound PyMuPDF work in a process pool so it never blocks the event loop.
+
+    Large documents are split into page ranges that are extracted in parallel. A
+    timed-out task cannot be cancelled inside its worker, so a timeout replaces the
+    pool and kills the old workers rather than leaving them busy for later requests.
+    """
+
+    def __init__(self):
+        self.executor: ProcessPoolExecutor = None
+        self.workers = 0
+        self.metrics = ExtractionMetrics()
+
+    def _new_executor(self) -> ProcessPoolExecutor:
+        # Not fork: by now Motor and pymongo have background threads a forked child would inherit mid-state
+        method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+        return ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context(method))
+
+    def start(self):
+        settings = get_settings()
+        if self.executor is None:
+            self.workers = settings.extraction_workers
+            self.executor = self._new_executor()
+
+    def shutdown(self):
+        if self.executor is not None:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            self.executor = None
+
+    def _restart_pool(self):
+        """Swap in a fresh pool and kill the old workers, which may still be running timed-out work."""
+        old = self.executor
+        if old is None:
+            return
+        self.executor = self._new_executor()
+        self.metrics.pool_restarts += 1
+        processes = list((getattr(old, "_processes", None) or {}).values())
+        old.shutdown(wait=False, cancel_futures=True)
+        for process in processes:
+            process.kill()
+
+    async def _submit(self, fn, *args):
+        if self.executor is None:
+            self.start()
+        loop = asyncio.get_running_loop()
+        self.metrics.in_flight_tasks += 1
+        try:
+            executor = self.executor
+            try:
+                return await loop.run_in_executor(executor, partial(fn, *args))
+            except BrokenProcessPool:
+                # Killed along with another request's timed-out task: retry once on the new pool
+                if self.executor is executor or self.executor is None:
+                    raise
+                return await loop.run_in_executor(self.executor, partial(fn, *args))
+        finally:
+            self.metrics.in_flight_tasks -= 1
+
+    async def _timed(self, coro):
+        settings = get_settings()
+        started = time.perf_counter()
+        try:
+            result = await asyncio.wait_for(coro, timeout=settings.extraction_timeout_seconds)
+        except asyncio.TimeoutError:
+            self.metrics.timeouts += 1
+            self.metrics.record(time.perf_counter() - started, ok=False)
+            self._restart_pool()
+            raise ExtractionTimeoutError(
+                f"PDF extraction exceeded {settings.extraction_timeout_seconds} seconds"
+            )
+        except Exception:
+            self.metrics.record(time.perf_counter() - started, ok=False)
+            raise
+        self.metrics.record(time.perf_counter() - started)
+        return result
+
+    async def _check_page_limit(self, source: PdfSource) -> int:
+        settings = get_settings()
+        loop = asyncio.get_running_loop()
+        page_count = await loop.run_in_executor(None, count_pdf_pages, source)
+        if page_count > settings.extraction_max_pages:
+            raise ExtractionLimitError(
+                f"PDF has {page_count} pages; the limit is {settings.extraction_max_pages}"
+            )
+        return page_count
+
+    async def extract_pages(self, source: PdfSource) -> list:
+        """
+        Extract the text of every page, fanning large documents out across workers.
+        Workers open the file themselves rather than each receiving a pickled copy of
+        the bytes: bytes sources are spooled to a temporary file once for the fan-out.
+        """
+        settings = get_settings()
+        page_count = await self._check_page_limit(source)
+
+        if page_count < settings.extraction_parallel_min_pages:
+            return await self._timed(self._submit(extract_page_texts, source))
+
+        spooled = None
+        if isinstance(source, (bytes, bytearray)):
+            spooled = source = await asyncio.to_thread(_spool_bytes, source)
+        try:
+            step = settings.extraction_pages_per_task
+            ranges = [(start, min(start + step, page_count)) for start in range(0, page_count, step)]
+            chunks = await self._timed(asyncio.gather(
+                *(self._submit(extract_page_texts, source, start, end) for start, end in ranges)
+            ))
+        finally:
+            if spooled:
+                discard_spooled(spooled)
+        return [text for chunk in chunks for text in chunk]
+
+    async def extract_head(self, source: PdfSource, pages: int = 1) -> list:
+        """
+        Text of the first `pages` pages only, for work that can start before the full
+        extraction finishes (company name lookup). Not counted in the extraction metrics.
+        """
+        settings = get_settings()
+        try:
+            return await asyncio.wait_for(
+                self._submit(extract_page_texts, source, 0, pages),
+                timeout=settings.extraction_timeout_seconds
+            )
+        except asyncio.TimeoutError:
+            self._restart_pool()
+            raise ExtractionTimeoutError(
+                f"PDF extraction exceeded {settings.extraction_timeout_seconds} seconds"
+            )
+
+    async def extract_text(self, source: PdfSource) -> str:
+        """Process-pool equivalent of `extract_text_from_pdf`."""
+        return "\n".join(await self.extract_pages(source))
+
+    async def extract_preview(self, source: PdfSource) -> dict:
+        """Process-pool equivalent of `extract_pdf_preview`."""
+        await self._check_page_limit(source)
+        return await self._timed(self._submit(extract_pdf_preview, source))
+
+    def stats(self) -> dict:
+        return self.metrics.snapshot(self.workers)
+
+
+extraction_engine = ExtractionEngine()
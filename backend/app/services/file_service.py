@@ -0,0 +1,104 @@
+from datetime import datetime
+from typing import Optional
+from bson import ObjectId
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+
+from .pdf_service import PdfSource
+from .text_store import delete_pages
+
+PREVIEW_COLLECTION = "preview_artifacts"
+
+# Collections whose documents reference a GridFS blob through `file_id`
+FILE_REFERENCES = ("reports", PREVIEW_COLLECTION)
+
+# Every report and preview holding a blob counts once in its `metadata.refs`. The count
+# changes only through $inc and a blob is deleted only while it is 0, so a concurrent
+# store_pdf either revives the blob before the delete or uploads a fresh one after it.
+
+
+async def find_pdf_by_hash(db, content_hash: str) -> Optional[ObjectId]:
+    """Return the GridFS id of a previously stored file with the same content hash."""
+    existing = await db["fs.files"].find_one({"metadata.sha256": content_hash}, {"_id": 1})
+    return existing["_id"] if existing else None
+
+
+async def retain_pdf(db, file_id) -> bool:
+    """Take one more reference on a stored PDF; False if it no longer exists."""
+    result = await db["fs.files"].update_one({"_id": ObjectId(file_id)}, {"$inc": {"metadata.refs": 1}})
+    return result.matched_count == 1
+
+
+async def store_pdf(db, fs, filename: str, source: PdfSource, content_hash: str) -> ObjectId:
+    """
+    Store a PDF in GridFS, reusing an existing blob when the same content was uploaded before.
+    A file path is streamed to GridFS chunk by chunk rather than read into memory.
+    The caller holds one reference on the returned blob and hands it to a report or
+    preview, or gives it back with release_pdf.
+    """
+    while True:
+        existing = await db["fs.files"].find_one_and_update(
+            {"metadata.sha256": content_hash}, {"$inc": {"metadata.refs": 1}}, projection={"_id": 1}
+        )
+        if existing is not None:
+            return existing["_id"]
+
+        file_id = ObjectId()
+        metadata = {
+            "content_type": "application/pdf",
+            "uploaded_at": datetime.utcnow(),
+            "sha256": content_hash,
+            "refs": 1,
+        }
+        try:
+            if isinstance(source, str):
+                with open(source, "rb") as stream:
+                    await fs.upload_from_stream_with_id(file_id, filename, stream, metadata=metadata)
+            else:
+                await fs.upload_from_stream_with_id(file_id, filename, source, metadata=metadata)
+            return file_id
+        except DuplicateKeyError:
+            # An identical upload finished first (unique sha256 index): drop our chunks, share theirs
+            await db["fs.chunks"].delete_many({"files_id": file_id})
+
+
+async def release_pdf(db, fs, file_id: str):
+    """Drop one reference to a stored PDF, deleting it (and its extracted text) at zero."""
+    file_doc = await db["fs.files"].find_one_and_update(
+        {"_id": ObjectId(file_id)},
+        {"$inc": {"metadata.refs": -1}},
+        projection={"metadata": 1},
+        return_document=ReturnDocument.AFTER
+    )
+    metadata = (file_doc or {}).get("metadata") or {}
+    if file_doc is None or metadata.get("refs", 0) > 0:
+        return
+
+    # Conditional on the count still being 0: a store_pdf may have revived the blob meanwhile
+    deleted = await db["fs.files"].delete_one({"_id": file_doc["_id"], "metadata.refs": {"$lte": 0}})
+    if not deleted.deleted_count:
+        return
+    await db["fs.chunks"].delete_many({"files_id": file_doc["_id"]})
+
+    # The extracted text goes with the PDF
+    content_hash = metadata.get("sha256")
+    if content_hash:
+        await delete_pages(db, content_hash)
+
+
+async def ensure_file_refs(db) -> int:
+    """
+    Startup: give blobs stored before reference counting their count, from the
+    reports and previews pointing at them. Returns how many blobs were counted.
+    """
+    counted = 0
+    async for file_doc in db["fs.files"].find({"metadata.refs": {"$exists": False}}, {"_id": 1}):
+        refs = 0
+        for collection in FILE_REFERENCES:
+            refs += await db[collection].count_documents({"file_id": str(file_doc["_id"])})
+        result = await db["fs.files"].update_one(
+            {"_id": file_doc["_id"], "metadata.refs": {"$exists": False}},
+            {"$set": {"metadata.refs": refs}}
+        )
+        counted += result.modified_count
+    return counted
@@ -0,0 +1,233 @@
+import hashlib
+import json
+import os
+import re
+import stat
+import tempfile
+from typing import Dict, List, NamedTuple, Optional
+
+from openpyxl import load_workbook
+
+from ..config import BACKEND_DIR, get_settings
+from .pdf_service import extract_company_name
+
+# Bump when the cached layout changes so old cache files are rebuilt
+CACHE_FORMAT_VERSION = 2
+
+GSTIN_RE = re.compile(r"\b\d{2}[A-Z]{5}\d{4}[A-Z][1-9A-Z]Z[0-9A-Z]\b")
+
+# First two digits of a GSTIN
+STATE_CODES = {
+    "01": "Jammu and Kashmir", "02": "Himachal Pradesh", "03": "Punjab", "04": "Chandigarh",
+    "05": "Uttarakhand", "06": "Haryana", "07": "Delhi", "08": "Rajasthan", "09": "Uttar Pradesh",
+    "10": "Bihar", "11": "Sikkim", "12": "Arunachal Pradesh", "13": "Nagaland", "14": "Manipur",
+    "15": "Mizoram", "16": "Tripura", "17": "Meghalaya", "18": "Assam", "19": "West Bengal",
+    "20": "Jharkhand", "21": "Odisha", "22": "Chhattisgarh", "23": "Madhya Pradesh", "24": "Gujarat",
+    "25": "Daman and Diu", "26": "Dadra and Nagar Haveli and Daman and Diu", "27": "Maharashtra",
+    "28": "Andhra Pradesh (old)", "29": "Karnataka", "30": "Goa", "31": "Lakshadweep", "32": "Kerala",
+    "33": "Tamil Nadu", "34": "Puducherry", "35": "Andaman and Nicobar Islands", "36": "Telangana",
+    "37": "Andhra Pradesh", "38": "Ladakh", "97": "Other Territory",
+}
+
+# Spreadsheet header -> record field; other columns (contact details, PAN, turnover) are not kept
+COLUMNS = {
+    "GSTIN": "gstin",
+    "Legal Name": "legal_name",
+    "Trade Name": "trade_name",
+    "Status": "status",
+    "District": "district",
+    "Business Nature": "business_nature",
+    "Business Constitution": "constitution",
+}
+
+
+class GstRecord(NamedTuple):
+    gstin: str
+    legal_name: str
+    trade_name: str
+    state: str
+    status: str
+    district: str
+    business_nature: str
+    constitution: str
+
+
+def normalize_gstin(value: str) -> str:
+    return (value or "").strip().upper()
+
+
+def _file_sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as source:
+        while chunk := source.read(1024 * 1024):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def parse_spreadsheet(path: str) -> List[GstRecord]:
+    """Read the registry spreadsheet row by row (openpyxl read-only mode keeps memory flat)."""
+    workbook = load_workbook(path, read_only=True, data_only=True)
+    try:
+        rows = workbook.active.iter_rows(values_only=True)
+        header = [str(cell).strip() if cell is not None else "" for cell in next(rows, ())]
+        positions = {field: header.index(column) for column, field in COLUMNS.items() if column in header}
+        if "gstin" not in positions:
+            raise ValueError(f"{path} has no GSTIN column")
+
+        records = []
+        for row in rows:
+            values = {
+                field: str(row[index]).strip() if index < len(row) and row[index] is not None else ""
+                for field, index in positions.items()
+            }
+            gstin = normalize_gstin(values["gstin"])
+            if not gstin:
+                continue
+            records.append(GstRecord(
+                gstin=gstin,
+                legal_name=values.get("legal_name", ""),
+                trade_name=values.get("trade_name", ""),
+                state=STATE_CODES.get(gstin[:2], ""),
+                status=values.get("status", ""),
+                district=values.get("district", ""),
+                business_nature=values.get("business_nature", ""),
+                constitution=values.get("constitution", ""),
+            ))
+        return records
+    finally:
+        workbook.close()
+
+
+def _default_cache_path(source_path: str) -> str:
+    # Private to the backend, not the shared temp directory where anyone can plant files
+    directory = os.path.join(BACKEND_DIR, ".cache")
+    os.makedirs(directory, mode=0o700, exist_ok=True)
+    return os.path.join(directory, os.path.basename(source_path) + ".registry.json")
+
+
+def _trusted(cache_path: str) -> bool:
+    """Only read a cache owned by this user and writable by nobody else."""
+    info = os.stat(cache_path)
+    if hasattr(os, "getuid") and info.st_uid != os.getuid():
+        return False
+    return not info.st_mode & (stat.S_IWGRP | stat.S_IWOTH)
+
+
+def _read_cache(cache_path: str) -> Optional[dict]:
+    """The cached payload, or None when missing, untrusted, unreadable or of another version."""
+    try:
+        if not _trusted(cache_path):
+            print(f"Ignoring GST registry cache {cache_path}: not owned by this user or writable by others")
+            return None
+        with open(cache_path, encoding="utf-8") as cache:
+            payload = json.load(cache)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(payload, dict) or payload.get("version") != CACHE_FORMAT_VERSION:
+        return None
+    # JSON has no tuples; rows come back as lists
+    payload["rows"] = [tuple(row) for row in payload.get("rows", [])]
+    return payload
+
+
+def _write_cache(cache_path: str, payload: dict):
+    directory = os.path.dirname(cache_path) or "."
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as out:
+            json.dump(payload, out, separators=(",", ":"))
+        os.replace(tmp_path, cache_path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+def load_records(source_path: str, cache_path: str) -> tuple:
+    """
+    Registry rows as plain tuples, from the JSON cache when it matches the spreadsheet.
+
+    The cache is trusted when the spreadsheet's size and mtime are unchanged; if only the
+    mtime moved, the content hash decides. Returns (rows, "cache" | "rebuilt").
+    """
+    source_stat = os.stat(source_path)
+    cached = _read_cache(cache_path)
+    if cached and cached["size"] == source_stat.st_size and cached["mtime_ns"] == source_stat.st_mtime_ns:
+        return cached["rows"], "cache"
+
+    sha256 = _file_sha256(source_path)
+    if cached and cached["sha256"] == sha256:
+        rows = cached["rows"]
+        origin = "cache"
+    else:
+        rows = [tuple(record) for record in parse_spreadsheet(source_path)]
+        origin = "rebuilt"
+
+    try:
+        _write_cache(cache_path, {
+            "version": CACHE_FORMAT_VERSION,
+            "size": source_stat.st_size,
+            "mtime_ns": source_stat.st_mtime_ns,
+            "sha256": sha256,
+            "rows": rows,
+        })
+    except OSError as e:
+        print(f"Could not write GST registry cache {cache_path}: {e}")
+    return rows, origin
+
+
+class GstRegistry:
+    """
+    In-memory GSTIN registry: a dict from GSTIN to record for O(1) lookups, loaded
+    once at startup from the bundled spreadsheet via its JSON cache.
+    """
+
+    def __init__(self):
+        self._records: Dict[str, GstRecord] = {}
+        self.loaded = False
+        self.origin: Optional[str] = None
+
+    def load(self, source_path: Optional[str] = None, cache_path: Optional[str] = None) -> int:
+        """Load (or reload) the registry. Returns the number of records."""
+        settings = get_settings()
+        source_path = source_path or settings.gst_registry_path
+        cache_path = cache_path or settings.gst_registry_cache_path or _default_cache_path(source_path)
+        rows, self.origin = load_records(source_path, cache_path)
+        self._records = {row[0]: GstRecord(*row) for row in rows}
+        self.loaded = True
+        return len(self._records)
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def lookup(self, gstin: str) -> Optional[GstRecord]:
+        return self._records.get(normalize_gstin(gstin))
+
+    def company_name_from_text(self, text: str) -> Optional[str]:
+        """Trade (or legal) name of the first registered GSTIN quoted in `text`, if any."""
+        for match in GSTIN_RE.finditer(text):
+            record = self._records.get(match.group())
+            if record:
+                return record.trade_name or record.legal_name
+        return None
+
+
+gst_registry = GstRegistry()
+
+
+def resolve_company_name(text: str) -> str:
+    """Registered name for a GSTIN quoted in the text, else the first-lines heuristic."""
+    return gst_registry.company_name_from_text(text) or extract_company_name(text)
+
+
+def load_registry() -> int:
+    """Startup hook: load the registry, reporting rather than raising if the spreadsheet is unusable."""
+    try:
+        count = gst_registry.load()
+    except Exception as e:
+        print(f"GST registry not loaded: {e}")
+        return 0
+    print(f"GST registry: {count} records ({gst_registry.origin})")
+    return count
@@ -0,0 +1,194 @@
+from typing import List, Optional
+
+from pymongo import ASCENDING, DESCENDING
+from pymongo.errors import OperationFailure
+
+from ..config import get_settings
+from .batch_service import BATCH_COLLECTION
+from .cache_service import AnalysisCache
+from .credit_service import BALANCES_COLLECTION
+from .file_service import PREVIEW_COLLECTION
+from .job_service import JobManager
+from .mapreduce_service import FINDINGS_COLLECTION
+
+# Server error codes for an existing index with the same name/keys but different options
+INDEX_CONFLICT_CODES = (85, 86)
+
+
+def declared_indexes() -> List[dict]:
+    """Every index the application relies on, as (collection, keys, options)."""
+    settings = get_settings()
+    return [
+        # Accounts: login and registration lookups, uniqueness enforced by the server
+        {"collection": "users", "keys": [("email", ASCENDING)], "options": {"unique": True}},
+        {"collection": "users", "keys": [("gst_number", ASCENDING)], "options": {"unique": True}},
+        {"collection": "users", "keys": [("created_at", DESCENDING), ("_id", DESCENDING)], "options": {}},
+        {"collection": "users", "keys": [("company_name", ASCENDING), ("_id", ASCENDING)], "options": {}},
+        {"collection": "users", "keys": [("industry_type", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)], "options": {}},
+        {"collection": "admins", "keys": [("email", ASCENDING)], "options": {"unique": True}},
+
+        # Reports: per-user history, global history and GridFS reference checks
+        # _id included: report pages sort on (uploaded_at, _id), and without it every page is an in-memory sort
+        {"collection": "reports", "keys": [("user_id", ASCENDING), ("uploaded_at", DESCENDING), ("_id", DESCENDING)], "options": {}},
+        {"collection": "reports", "keys": [("uploaded_at", DESCENDING), ("_id", DESCENDING)], "options": {}},
+        {"collection": "reports", "keys": [("file_id", ASCENDING)], "options": {}},
+
+        # Credits ledger and materialized balances
+        {"collection": "credits", "keys": [("user_id", ASCENDING), ("credit_type", ASCENDING), ("assigned_at", DESCENDING)], "options": {}},
+        {"collection": "credits", "keys": [("user_id", ASCENDING), ("assigned_at", DESCENDING)], "options": {}},
+        {"collection": "credits", "keys": [("assigned_at", DESCENDING), ("_id", DESCENDING)], "options": {}},
+        {"collection": BALANCES_COLLECTION, "keys": [("user_id", ASCENDING)], "options": {}},
+
+        # GridFS content-hash dedupe; unique so concurrent identical uploads keep one blob
+        {"collection": "fs.files", "keys": [("metadata.sha256", ASCENDING)],
+         "options": {"unique": True, "partialFilterExpression": {"metadata.sha256": {"$exists": True}}}},
+
+        # Preview artifacts: expiry/eviction sweeps and blob reference checks
+        {"collection": PREVIEW_COLLECTION, "keys": [("expires_at", ASCENDING)], "options": {}},
+        {"collection": PREVIEW_COLLECTION, "keys": [("last_used_at", ASCENDING)], "options": {}},
+        {"collection": PREVIEW_COLLECTION, "keys": [("file_id", ASCENDING)], "options": {}},
+
+        # Expiring caches and job records
+        {"collection": AnalysisCache.collection_name, "keys": [("created_at", ASCENDING)],
+         "options": {"expireAfterSeconds": settings.analysis_cache_ttl_seconds}},
+        {"collection": FINDINGS_COLLECTION, "keys": [("created_at", ASCENDING)],
+         "options": {"expireAfterSeconds": settings.analysis_cache_ttl_seconds}},
+        {"collection": JobManager.collection_name, "keys": [("created_at", ASCENDING)],
+         "options": {"expireAfterSeconds": settings.job_ttl_seconds}},
+        {"collection": BATCH_COLLECTION, "keys": [("created_at", ASCENDING)],
+         "options": {"expireAfterSeconds": settings.job_ttl_seconds}},
+        # Periodic reaping of unfinished work left by dead processes
+        {"collection": JobManager.collection_name, "keys": [("status", ASCENDING), ("owner", ASCENDING)], "options": {}},
+        {"collection": BATCH_COLLECTION, "keys": [("status", ASCENDING), ("owner", ASCENDING)], "options": {}},
+    ]
+
+
+async def _create_index(db, spec: dict) -> str:
+    collection = db[spec["collection"]]
+    try:
+        await collection.create_index(spec["keys"], **spec["options"])
+        return "ok"
+    except OperationFailure as e:
+        if e.code not in INDEX_CONFLICT_CODES:
+            raise
+    # Same keys with different options (e.g. a changed TTL): TTLs can be updated in place,
+    # anything else is rebuilt
+    if "expireAfterSeconds" in spec["options"]:
+        await db.command({
+            "collMod": spec["collection"],
+            "index": {"keyPattern": dict(spec["keys"]), "expireAfterSeconds": spec["options"]["expireAfterSeconds"]}
+        })
+        return "updated"
+    await collection.drop_index(spec["keys"])
+    await collection.create_index(spec["keys"], **spec["options"])
+    return "rebuilt"
+
+
+async def ensure_indexes(db) -> List[dict]:
+    """
+    Create all declared indexes. Safe to run on every start: existing indexes are left alone.
+    A failure (e.g. duplicate emails blocking a unique index) is reported and does not stop startup.
+    """
+    results = []
+    for spec in declared_indexes():
+        try:
+            status = await _create_index(db, spec)
+        except Exception as e:
+            status = "failed"
+            print(f"Failed to create index {spec['collection']} {spec['keys']}: {e}")
+        results.append({"collection": spec["collection"], "keys": spec["keys"], "status": status})
+    return results
+
+
+# ============ QUERY PLAN DIAGNOSTICS ============
+
+_SAMPLE_ID = "000000000000000000000000"
+
+
+def hot_queries() -> List[dict]:
+    """The queries the API runs on every request path, as explainable commands."""
+    return [
+        {"name": "user by email", "command": {"find": "users", "filter": {"email": "sample@example.com"}, "limit": 1}},
+        {"name": "user by GST", "command": {"find": "users", "filter": {"gst_number": "27AAAAA0000A1Z5"}, "limit": 1}},
+        {"name": "admin by email", "command": {"find": "admins", "filter": {"email": "admin@gov.in"}, "limit": 1}},
+        {"name": "companies by created_at", "command": {
+            "find": "users", "filter": {}, "sort": {"created_at": -1, "_id": -1}, "limit": 50}},
+        {"name": "companies by name", "command": {
+            "find": "users", "filter": {}, "sort": {"company_name": 1, "_id": 1}, "limit": 50}},
+        {"name": "companies by industry", "command": {
+            "find": "users", "filter": {"industry_type": "Manufacturing"}, "sort": {"created_at": -1, "_id": -1}, "limit": 50}},
+        # As report_service.fetch_report_page runs it: one page plus the row telling whether another follows
+        {"name": "reports by user", "command": {
+            "find": "reports", "filter": {"user_id": _SAMPLE_ID}, "sort": {"uploaded_at": -1, "_id": -1}, "limit": 51}},
+        {"name": "recent reports", "command": {
+            "find": "reports", "filter": {}, "sort": {"uploaded_at": -1, "_id": -1}, "limit": 50}},
+        {"name": "reports by file", "command": {"find": "reports", "filter": {"file_id": _SAMPLE_ID}, "limit": 1}},
+        {"name": "report summaries", "command": {
+            "aggregate": "reports",
+            "pipeline": [
+                {"$match": {"user_id": {"$in": [_SAMPLE_ID]}}},
+                {"$group": {"_id": "$user_id", "total_reports": {"$sum": 1}}}
+            ],
+            "cursor": {}}},
+        {"name": "credits by user", "command": {
+            "find": "credits", "filter": {"user_id": _SAMPLE_ID}, "sort": {"assigned_at": -1}}},
+        {"name": "credits by user and type", "command": {
+            "find": "credits", "filter": {"user_id": _SAMPLE_ID, "credit_type": "CO2"}, "sort": {"assigned_at": -1}}},
+        {"name": "recent credits", "command": {
+            "find": "credits", "filter": {}, "sort": {"assigned_at": -1, "_id": -1}, "limit": 50}},
+        {"name": "balances by user", "command": {"find": BALANCES_COLLECTION, "filter": {"user_id": _SAMPLE_ID}}},
+        {"name": "GridFS file by hash", "command": {
+            "find": "fs.files", "filter": {"metadata.sha256": "0" * 64}, "limit": 1}},
+    ]
+
+
+def _plan_stages(plan: Optional[dict]) -> List[str]:
+    """Flatten a (possibly nested) winning plan into its stage names, root first."""
+    stages = []
+    while plan:
+        stages.append(plan.get("stage", "?"))
+        for child in plan.get("inputStages", [])[1:]:
+            stages.extend(_plan_stages(child))
+        plan = plan.get("inputStage") or (plan.get("inputStages") or [None])[0]
+    return stages
+
+
+def _winning_plan(explain: dict) -> Optional[dict]:
+    planner = explain.get("queryPlanner")
+    if planner is None:
+        # Aggregations nest the planner output under the first $cursor stage
+        for stage in explain.get("stages", []):
+            if "$cursor" in stage:
+                planner = stage["$cursor"].get("queryPlanner")
+                break
+    if planner is None:
+        return None
+    plan = planner.get("winningPlan", {})
+    # Slot-based engine wraps the classic plan tree
+    return plan.get("queryPlan", plan)
+
+
+async def explain_hot_queries(db) -> List[dict]:
+    """
+    Explain each hot query and flag collection scans and in-memory sorts.
+    Only the query planner runs, so this is cheap against production data.
+    """
+    results = []
+    for query in hot_queries():
+        entry = {"name": query["name"], "collection": query["command"].get("find") or query["command"].get("aggregate")}
+        try:
+            explain = await db.command({"explain": query["command"], "verbosity": "queryPlanner"})
+        except Exception as e:
+            entry.update({"ok": False, "error": str(e)})
+            results.append(entry)
+            continue
+
+        stages = _plan_stages(_winning_plan(explain))
+        entry.update({
+            "stages": stages,
+            "collscan": "COLLSCAN" in stages,
+            "in_memory_sort": "SORT" in stages,
+        })
+        entry["ok"] = not entry["collscan"] and not entry["in_memory_sort"]
+        results.append(entry)
+    return results
@@ -0,0 +1,236 @@
+import asyncio
+import uuid
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from ..config import get_settings
+
+JOB_STAGES = ["stored", "extracted", "news", "ai", "saved"]
+
+JobHandler = Callable[[str, Any, Callable[..., Awaitable[None]]], Awaitable[Optional[dict]]]
+
+# Reaper: fails the unfinished work of owners missing from the live list
+Reaper = Callable[[Any, List[str]], Awaitable[None]]
+
+# This process. Jobs carry their owner's id; only the owner holds their payloads
+INSTANCE_ID = uuid.uuid4().hex
+INSTANCES_COLLECTION = "job_instances"
+
+
+class JobQueueFull(Exception):
+    """Raised when the job backend cannot accept more work."""
+
+
+class LocalJobBackend:
+    """
+    In-process job backend: a bounded asyncio queue drained by a fixed worker pool.
+
+    Payloads stay in memory, so queued jobs do not survive a restart.
+    """
+
+    def __init__(self, run_job: Callable[[str, str, Any], Awaitable[None]], workers: int = 4, max_queue: int = 100):
+        self.run_job = run_job
+        self.workers = workers
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue)
+        self._tasks = []
+
+    async def start(self):
+        for index in range(self.workers):
+            self._tasks.append(asyncio.create_task(self._worker(index)))
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def submit(self, job_id: str, kind: str, payload: Any):
+        try:
+            self.queue.put_nowait((job_id, kind, payload))
+        except asyncio.QueueFull:
+            raise JobQueueFull("Job queue is full, try again later")
+
+    def depth(self) -> int:
+        return self.queue.qsize()
+
+    async def _worker(self, index: int):
+        while True:
+            job_id, kind, payload = await self.queue.get()
+            try:
+                await self.run_job(job_id, kind, payload)
+            except Exception as e:
+                print(f"Job worker {index} crashed on job {job_id}: {e}")
+            finally:
+                self.queue.task_done()
+
+
+class JobManager:
+    """
+    Tracks job state in the `jobs` collection and fans progress out to subscribers.
+
+    Several processes may share the collection (uvicorn workers, rolling restarts),
+    so each heartbeats in `job_instances` and only jobs whose owner stopped
+    heartbeating are failed as interrupted.
+    """
+
+    collection_name = "jobs"
+
+    def __init__(self):
+        self.db = None
+        self.backend = None
+        self._handlers: Dict[str, JobHandler] = {}
+        self._subscribers: Dict[str, set] = defaultdict(set)
+        self._reapers: List[Reaper] = [self._reap_jobs]
+        self._heartbeat_task: Optional[asyncio.Task] = None
+
+    def register(self, kind: str, handler: JobHandler):
+        """Register the coroutine that executes jobs of a given kind."""
+        self._handlers[kind] = handler
+
+    def add_reaper(self, reaper: Reaper):
+        """Register a coroutine(db, live owner ids) that fails work left by dead processes."""
+        self._reapers.append(reaper)
+
+    async def start(self, db):
+        settings = get_settings()
+        self.db = db
+
+        await self._beat()
+        await self.reap()
+
+        self.backend = LocalJobBackend(self._run, workers=settings.job_workers, max_queue=settings.job_queue_size)
+        await self.backend.start()
+        self._heartbeat_task = asyncio.create_task(self._heartbeat())
+
+    async def stop(self):
+        if self._heartbeat_task:
+            self._heartbeat_task.cancel()
+            await asyncio.gather(self._heartbeat_task, return_exceptions=True)
+            self._heartbeat_task = None
+        if self.backend:
+            await self.backend.stop()
+            self.backend = None
+        if self.db is not None:
+            # Our unfinished jobs die with us; the next reap by any process fails them
+            await self.db[INSTANCES_COLLECTION].delete_one({"_id": INSTANCE_ID})
+
+    async def _beat(self):
+        await self.db[INSTANCES_COLLECTION].update_one(
+            {"_id": INSTANCE_ID}, {"$set": {"heartbeat_at": datetime.utcnow()}}, upsert=True
+        )
+
+    async def _heartbeat(self):
+        interval = get_settings().job_heartbeat_seconds
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self._beat()
+                await self.reap()
+            except Exception as e:
+                print(f"Job heartbeat failed: {e}")
+
+    async def reap(self):
+        """Fail queued/running work whose owner has not heartbeated within job_owner_stale_seconds."""
+        cutoff = datetime.utcnow() - timedelta(seconds=get_settings().job_owner_stale_seconds)
+        instances = self.db[INSTANCES_COLLECTION]
+        await instances.delete_many({"heartbeat_at": {"$lt": cutoff}})
+        live = await instances.distinct("_id")
+        for reaper in self._reapers:
+            try:
+                await reaper(self.db, live)
+            except Exception as e:
+                print(f"Job reaper {getattr(reaper, '__name__', reaper)} failed: {e}")
+
+    async def _reap_jobs(self, db, live: List[str]):
+        # Jobs without an owner predate owner tracking and are reaped too
+        await db[self.collection_name].update_many(
+            {"status": {"$in": ["queued", "running"]}, "owner": {"$nin": live}},
+            {"$set": {
+                "status": "failed",
+                "error": "Job interrupted: the server process running it stopped",
+                "updated_at": datetime.utcnow()
+            }}
+        )
+
+    async def enqueue(self, kind: str, payload: Any, **meta) -> str:
+        """Persist a new job and hand it to the backend. Returns the job id."""
+        if kind not in self._handlers:
+            raise ValueError(f"Unknown job kind: {kind}")
+
+        job_id = uuid.uuid4().hex
+        now = datetime.utcnow()
+        job_doc = {
+            "_id": job_id,
+            "kind": kind,
+            "status": "queued",
+            "stage": None,
+            "stages": [],
+            "result": None,
+            "error": None,
+            "owner": INSTANCE_ID,
+            "created_at": now,
+            "updated_at": now,
+            **meta
+        }
+        await self.db[self.collection_name].insert_one(job_doc)
+
+        try:
+            self.backend.submit(job_id, kind, payload)
+        except JobQueueFull:
+            await self._update(job_id, {"status": "failed", "error": "Job queue is full"})
+            raise
+
+        return job_id
+
+    async def get(self, job_id: str) -> Optional[dict]:
+        return await self.db[self.collection_name].find_one({"_id": job_id})
+
+    def subscribe(self, job_id: str) -> asyncio.Queue:
+        queue: asyncio.Queue = asyncio.Queue()
+        self._subscribers[job_id].add(queue)
+        return queue
+
+    def unsubscribe(self, job_id: str, queue: asyncio.Queue):
+        subscribers = self._subscribers.get(job_id)
+        if subscribers is None:
+            return
+        subscribers.discard(queue)
+        if not subscribers:
+            del self._subscribers[job_id]
+
+    def queue_depth(self) -> int:
+        return self.backend.depth() if self.backend else 0
+
+    async def _run(self, job_id: str, kind: str, payload: Any):
+        await self._update(job_id, {"status": "running"})
+
+        async def progress(stage: str, **info):
+            entry = {"name": stage, "completed_at": datetime.utcnow(), **info}
+            await self.db[self.collection_name].update_one(
+                {"_id": job_id},
+                {"$set": {"stage": stage, "updated_at": entry["completed_at"]}, "$push": {"stages": entry}}
+            )
+            self._publish(job_id, {"event": "progress", "stage": stage, **info})
+
+        try:
+            result = await self._handlers[kind](job_id, payload, progress)
+        except Exception as e:
+            detail = getattr(e, "detail", None) or str(e)
+            await self._update(job_id, {"status": "failed", "error": detail})
+            self._publish(job_id, {"event": "failed", "error": detail})
+            return
+
+        await self._update(job_id, {"status": "completed", "result": result})
+        self._publish(job_id, {"event": "completed", "result": result})
+
+    async def _update(self, job_id: str, fields: dict):
+        fields["updated_at"] = datetime.utcnow()
+        await self.db[self.collection_name].update_one({"_id": job_id}, {"$set": fields})
+
+    def _publish(self, job_id: str, event: dict):
+        for queue in self._subscribers.get(job_id, ()):
+            queue.put_nowait(event)
+
+
+job_manager = JobManager()
@@ -0,0 +1,220 @@
+import asyncio
+import random
+import time
+from typing import AsyncIterator, Optional
+
+import openai
+from openai import AsyncOpenAI
+
+from ..config import get_settings
+from .metrics_service import LLM_RETRIES, SPAN_SECONDS, record_usage
+
+
+class LLMUnavailableError(RuntimeError):
+    """The model could not be reached: retries exhausted or the circuit breaker is open."""
+
+
+class CircuitOpenError(LLMUnavailableError):
+    """Raised without calling the API while the circuit breaker is open."""
+
+
+class TokenBucket:
+    """Token-bucket rate limiter; `acquire` waits until a token is available."""
+
+    def __init__(self, rate_per_second: float, capacity: float):
+        self.rate = rate_per_second
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated_at = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                self._refill()
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class CircuitBreaker:
+    """
+    Opens after `failure_threshold` consecutive failures and rejects calls for
+    `reset_seconds`; then lets a single trial call through (half-open).
+    """
+
+    def __init__(self, failure_threshold: int, reset_seconds: float):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self._trial_in_flight = False
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_seconds:
+            return "half_open"
+        return "open"
+
+    def before_call(self):
+        state = self.state
+        if state == "open":
+            raise CircuitOpenError("AI service temporarily unavailable (circuit open)")
+        if state == "half_open":
+            if self._trial_in_flight:
+                raise CircuitOpenError("AI service temporarily unavailable (circuit half-open)")
+            self._trial_in_flight = True
+
+    def release_trial(self):
+        """Free the half-open trial slot when the trial call ended without an outcome (cancelled)."""
+        self._trial_in_flight = False
+
+    def record_success(self):
+        self.failures = 0
+        self.opened_at = None
+        self._trial_in_flight = False
+
+    def record_failure(self):
+        self.failures += 1
+        self._trial_in_flight = False
+        if self.failures >= self.failure_threshold:
+            self.opened_at = time.monotonic()
+
+
+def _is_retryable(error: Exception) -> bool:
+    if isinstance(error, (openai.RateLimitError, openai.APIConnectionError, openai.APITimeoutError)):
+        return True
+    return isinstance(error, openai.APIStatusError) and error.status_code >= 500
+
+
+def _retry_after(error: Exception) -> Optional[float]:
+    response = getattr(error, "response", None)
+    if response is None:
+        return None
+    try:
+        return float(response.headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+
+class LLMGateway:
+    """
+    Shared entry point for chat completions.
+
+    Reuses one pooled AsyncOpenAI client and applies a concurrency cap,
+    token-bucket rate limiting, jittered retries on 429/5xx and a circuit breaker.
+    """
+
+    def __init__(self):
+        settings = get_settings()
+        self._client: Optional[AsyncOpenAI] = None
+        self._client_key: Optional[str] = None
+        self.semaphore = asyncio.Semaphore(settings.llm_max_concurrency)
+        self.bucket = TokenBucket(settings.llm_requests_per_minute / 60.0, settings.llm_burst)
+        self.breaker = CircuitBreaker(settings.llm_breaker_threshold, settings.llm_breaker_reset_seconds)
+        self.retries = 0
+
+    def client(self, api_key: str) -> AsyncOpenAI:
+        if self._client is None or self._client_key != api_key:
+            settings = get_settings()
+            self._client = AsyncOpenAI(
+                api_key=api_key,
+                base_url=settings.openai_base_url or None,
+                timeout=settings.llm_timeout_seconds,
+                max_retries=0,  # retries are handled here, with jitter and the breaker
+            )
+            self._client_key = api_key
+        return self._client
+
+    async def close(self):
+        if self._client is not None:
+            await self._client.close()
+            self._client = None
+            self._client_key = None
+
+    async def chat_completion(self, api_key: str, **kwargs):
+        """Create a chat completion with rate limiting, retries and circuit breaking."""
+        return await self._create(api_key, hold_slot=False, **kwargs)
+
+    async def stream_chat_completion(self, api_key: str, **kwargs) -> AsyncIterator[str]:
+        """
+        Stream a chat completion, yielding content deltas.
+
+        Retries only cover opening the stream; the concurrency slot is held until it is consumed.
+        """
+        stream = await self._create(
+            api_key, hold_slot=True, stream=True, stream_options={"include_usage": True}, **kwargs
+        )
+        try:
+            async for chunk in stream:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+                if getattr(chunk, "usage", None):
+                    record_usage(kwargs.get("model", ""), chunk.usage)
+        except Exception:
+            self.breaker.record_failure()
+            raise
+        finally:
+            self.semaphore.release()
+            await stream.close()
+
+    async def _create(self, api_key: str, hold_slot: bool, **kwargs):
+        settings = get_settings()
+        client = self.client(api_key)
+
+        attempt = 0
+        while True:
+            self.breaker.before_call()
+            try:
+                await self.bucket.acquire()
+                await self.semaphore.acquire()
+            except BaseException:
+                # Cancelled while queued (stage timeouts, wait_for deadlines): no slot was taken
+                self.breaker.release_trial()
+                raise
+            started = time.perf_counter()
+            try:
+                response = await client.chat.completions.create(**kwargs)
+            except asyncio.CancelledError:
+                self.semaphore.release()
+                self.breaker.release_trial()
+                raise
+            except Exception as e:
+                SPAN_SECONDS.observe(time.perf_counter() - started, "llm_request", "error")
+                self.semaphore.release()
+                if not _is_retryable(e):
+                    # Client errors (bad request, auth) say nothing about service health
+                    self.breaker.record_success()
+                    raise
+                self.breaker.record_failure()
+                if attempt >= settings.llm_max_retries:
+                    raise LLMUnavailableError(f"AI service unavailable after {attempt + 1} attempts: {e}") from e
+
+                # Full jitter, but never sooner than the server asked for
+                delay = random.uniform(0, min(settings.llm_backoff_max_seconds, settings.llm_backoff_base_seconds * 2 ** attempt))
+                delay = max(delay, _retry_after(e) or 0)
+                attempt += 1
+                self.retries += 1
+                LLM_RETRIES.inc()
+                await asyncio.sleep(delay)
+                continue
+
+            # For streams this is time to first byte; tokens arrive with the final chunk
+            SPAN_SECONDS.observe(time.perf_counter() - started, "llm_request", "ok")
+            if not kwargs.get("stream"):
+                record_usage(kwargs.get("model", ""), getattr(response, "usage", None))
+            if not hold_slot:
+                self.semaphore.release()
+            self.breaker.record_success()
+            return response
+
+
+llm_gateway = LLMGateway()
@@ -0,0 +1,188 @@
+import asyncio
+import hashlib
+import json
+from datetime import datetime
+from typing import List, Optional
+
+from ..config import get_settings
+from ..models import AnalysisResult
+from ..prompts import (
+    MASTER_SYSTEM_PROMPT, MAP_SYSTEM_PROMPT, MAP_PROMPT_VERSION,
+    build_map_prompt, build_merge_prompt, build_reduce_prompt
+)
+from .ai_service import parse_analysis_content
+from .context_service import estimate_tokens
+from .llm_gateway import llm_gateway
+
+FINDINGS_COLLECTION = "chunk_findings"
+
+# Merge rounds before falling back to trimming; each divides the findings by the group size
+MAX_MERGE_ROUNDS = 4
+
+
+def group_pages(pages: List[str], pages_per_chunk: int) -> List[dict]:
+    """
+    Group page texts into fixed page windows so unchanged pages keep the same chunk hash.
+    The hash also covers the map prompt and model, the other inputs of a chunk's findings.
+    """
+    map_model = get_settings().mapreduce_map_model
+    chunks = []
+    for start in range(0, len(pages), pages_per_chunk):
+        window = pages[start:start + pages_per_chunk]
+        text = "\n".join(window)
+        chunks.append({
+            "first_page": start + 1,
+            "last_page": start + len(window),
+            "text": text,
+            "hash": hashlib.sha256(f"{MAP_PROMPT_VERSION}:{map_model}:{text}".encode("utf-8")).hexdigest(),
+        })
+    return chunks
+
+
+async def _map_chunk(db, chunk: dict, api_key: str, semaphore: asyncio.Semaphore) -> dict:
+    """Summarize one chunk into structured findings, reusing cached findings for identical chunks."""
+    settings = get_settings()
+
+    cached = await db[FINDINGS_COLLECTION].find_one({"_id": chunk["hash"]})
+    if cached:
+        return cached["findings"]
+
+    if not chunk["text"].strip():
+        return {}
+
+    async with semaphore:
+        response = await llm_gateway.chat_completion(
+            api_key,
+            model=settings.mapreduce_map_model,
+            messages=[
+                {"role": "system", "content": MAP_SYSTEM_PROMPT},
+                {"role": "user", "content": build_map_prompt(chunk["text"], chunk["first_page"], chunk["last_page"])}
+            ],
+            temperature=0,
+            max_tokens=1200,
+            response_format={"type": "json_object"}
+        )
+
+    content = response.choices[0].message.content
+    try:
+        findings = json.loads(content)
+    except json.JSONDecodeError as e:
+        raise ValueError(
+            f"Failed to parse findings for pages {chunk['first_page']}-{chunk['last_page']}: {e}"
+        ) from e
+
+    await db[FINDINGS_COLLECTION].replace_one(
+        {"_id": chunk["hash"]},
+        {"_id": chunk["hash"], "findings": findings, "created_at": datetime.utcnow()},
+        upsert=True
+    )
+    return findings
+
+
+def _findings_tokens(findings: List[dict]) -> int:
+    return estimate_tokens(json.dumps(findings, ensure_ascii=False))
+
+
+async def _merge_group(group: List[dict], api_key: str, semaphore: asyncio.Semaphore) -> dict:
+    """Combine the findings of adjacent page ranges into one entry spanning them all."""
+    if len(group) == 1:
+        return group[0]
+    settings = get_settings()
+    async with semaphore:
+        response = await llm_gateway.chat_completion(
+            api_key,
+            model=settings.mapreduce_map_model,
+            messages=[
+                {"role": "system", "content": MAP_SYSTEM_PROMPT},
+                {"role": "user", "content": build_merge_prompt(group)}
+            ],
+            temperature=0,
+            max_tokens=1200,
+            response_format={"type": "json_object"}
+        )
+    first_page, last_page = group[0]["first_page"], group[-1]["last_page"]
+    try:
+        merged = json.loads(response.choices[0].message.content)
+    except json.JSONDecodeError as e:
+        raise ValueError(f"Failed to parse merged findings for pages {first_page}-{last_page}: {e}") from e
+    return {"first_page": first_page, "last_page": last_page, "findings": merged}
+
+
+def _trim(item: dict, max_tokens: int) -> dict:
+    """Halve the longest lists of one entry's findings until it fits `max_tokens`."""
+    findings = item["findings"]
+    if not isinstance(findings, dict):
+        return item
+    findings = dict(findings)
+    while estimate_tokens(json.dumps(findings, ensure_ascii=False)) > max_tokens:
+        lists = [key for key, value in findings.items() if isinstance(value, list) and value]
+        if not lists:
+            break
+        longest = max(lists, key=lambda key: len(findings[key]))
+        findings[longest] = findings[longest][:len(findings[longest]) // 2]
+    return {**item, "findings": findings}
+
+
+async def fit_findings(findings: List[dict], api_key: str, semaphore: asyncio.Semaphore) -> List[dict]:
+    """
+    Shrink the findings to `mapreduce_reduce_token_budget` for the final call: adjacent
+    page ranges are merged in groups, round after round, and whatever still does not
+    fit is trimmed evenly so every part of the report keeps a share of the budget.
+    """
+    settings = get_settings()
+    budget = settings.mapreduce_reduce_token_budget
+    group_size = max(2, settings.mapreduce_merge_group_size)
+    for _ in range(MAX_MERGE_ROUNDS):
+        if len(findings) <= 1 or _findings_tokens(findings) <= budget:
+            return findings
+        groups = [findings[start:start + group_size] for start in range(0, len(findings), group_size)]
+        findings = list(await asyncio.gather(*(_merge_group(group, api_key, semaphore) for group in groups)))
+    if findings and _findings_tokens(findings) > budget:
+        findings = [_trim(item, budget // len(findings)) for item in findings]
+    return findings
+
+
+async def analyze_with_map_reduce(
+    db,
+    pages: List[str],
+    news_data: str,
+    api_key: str,
+    prescored: Optional[dict] = None
+) -> AnalysisResult:
+    """
+    Analyze a very large report in two phases.
+
+    Map: page windows are summarized concurrently into structured findings
+    (commitments, metrics, certifications), cached per chunk hash so a re-upload
+    only re-processes the windows whose pages changed.
+    Reduce: the findings, merged in stages when they exceed the reduce token budget,
+    are combined into the final AnalysisResult, with the document-wide counts from
+    `prescored` instead of summed per-chunk estimates.
+    """
+    settings = get_settings()
+    chunks = group_pages(pages, settings.mapreduce_pages_per_chunk)
+    semaphore = asyncio.Semaphore(settings.mapreduce_concurrency)
+
+    results = await asyncio.gather(*(_map_chunk(db, chunk, api_key, semaphore) for chunk in chunks))
+
+    findings = [
+        {"first_page": chunk["first_page"], "last_page": chunk["last_page"], "findings": result}
+        for chunk, result in zip(chunks, results)
+        if result
+    ]
+    findings = await fit_findings(findings, api_key, semaphore)
+    opening_text = "\n".join(pages[:2])[:settings.prompt_context_chunk_chars * 2]
+
+    response = await llm_gateway.chat_completion(
+        api_key,
+        model="gpt-4o",
+        messages=[
+            {"role": "system", "content": MASTER_SYSTEM_PROMPT},
+            {"role": "user", "content": build_reduce_prompt(findings, news_data, opening_text, prescored)}
+        ],
+        temperature=0.2,
+        max_tokens=2500,
+        response_format={"type": "json_object"}
+    )
+
+    return parse_analysis_content(response.choices[0].message.content, prescored)
@@ -0,0 +1,266 @@
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, List, Tuple
+
+from pymongo import monitoring
+
+# Upper bounds in seconds; wide enough for sub-millisecond Mongo commands and minute-long model calls
+LATENCY_BUCKETS = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 0.75,
+    1.0, 1.5, 2.5, 5.0, 7.5, 10.0, 15.0, 20.0, 30.0, 45.0, 60.0, 90.0, 120.0,
+)
+
+QUANTILES = (0.5, 0.95, 0.99)
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Tuple[str, ...], values: Tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    """Monotonic counter, one series per label combination."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, help_text: str, labels: Iterable[str] = ()):
+        self.name = name
+        self.help = help_text
+        self.label_names = tuple(labels)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *label_values: str, amount: float = 1):
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def render(self) -> List[str]:
+        with self._lock:
+            values = list(self._values.items())
+        return [f"{self.name}{_labels(self.label_names, key)} {_number(value)}" for key, value in values]
+
+
+class Histogram:
+    """
+    Fixed-bucket histogram. Observing is a bisect plus two additions under a lock,
+    so it is safe from the Mongo driver's threads and cheap on hot paths.
+
+    Besides the standard buckets, `{name}_quantile` series carry p50/p95/p99 estimated
+    from the buckets, for dashboards that do not run histogram_quantile().
+    """
+
+    kind = "histogram"
+
+    def __init__(self, name: str, help_text: str, labels: Iterable[str] = (), buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.label_names = tuple(labels)
+        self.buckets = tuple(buckets)
+        # label values -> [per-bucket counts (last one is +Inf), sum, count]
+        self._series: Dict[Tuple[str, ...], list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *label_values: str):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    @contextmanager
+    def time(self, *label_values: str):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, *label_values)
+
+    def _quantile(self, counts: List[int], total: int, q: float) -> float:
+        """Linear interpolation inside the bucket holding the q-th observation."""
+        rank = q * total
+        cumulative = 0
+        for index, count in enumerate(counts):
+            if cumulative + count >= rank and count:
+                lower = self.buckets[index - 1] if index else 0.0
+                if index == len(self.buckets):
+                    return lower
+                return lower + (self.buckets[index] - lower) * (rank - cumulative) / count
+            cumulative += count
+        return 0.0
+
+    def render(self) -> List[str]:
+        with self._lock:
+            series = [(key, list(counts), total, count) for key, (counts, total, count) in self._series.items()]
+
+        lines = []
+        quantile_lines = []
+        for key, counts, total, count in series:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                le = 'le="%s"' % _number(bound)
+                lines.append(f"{self.name}_bucket{_labels(self.label_names, key, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.label_names, key)} {_number(total)}")
+            lines.append(f"{self.name}_count{_labels(self.label_names, key)} {count}")
+            for q in QUANTILES:
+                labels = _labels(self.label_names, key, 'quantile="%s"' % q)
+                value = round(self._quantile(counts, count, q), 6)
+                quantile_lines.append(f"{self.name}_quantile{labels} {_number(value)}")
+        if quantile_lines:
+            lines.append(f"# TYPE {self.name}_quantile gauge")
+            lines.extend(quantile_lines)
+        return lines
+
+
+class CallbackMetric:
+    """A value read from existing state when /metrics is scraped, so it costs nothing in between."""
+
+    def __init__(self, name: str, help_text: str, kind: str, read: Callable[[], float]):
+        self.name = name
+        self.help = help_text
+        self.kind = kind
+        self._read = read
+
+    def render(self) -> List[str]:
+        try:
+            value = self._read()
+        except Exception:
+            return []
+        return [f"{self.name} {_number(value)}"] if value is not None else []
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def gauge_from(self, name: str, help_text: str, read: Callable[[], float]):
+        return self.register(CallbackMetric(name, help_text, "gauge", read))
+
+    def counter_from(self, name: str, help_text: str, read: Callable[[], float]):
+        return self.register(CallbackMetric(name, help_text, "counter", read))
+
+    def render(self) -> str:
+        """Prometheus text exposition format (version 0.0.4)."""
+        lines = []
+        for metric in self._metrics:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+HTTP_REQUEST_SECONDS = registry.register(Histogram(
+    "greenwash_http_request_duration_seconds", "HTTP request latency by route template",
+    ("method", "route", "status")
+))
+SPAN_SECONDS = registry.register(Histogram(
+    "greenwash_span_duration_seconds", "Duration of pipeline stages and external calls",
+    ("span", "outcome")
+))
+MONGO_COMMAND_SECONDS = registry.register(Histogram(
+    "greenwash_mongo_command_duration_seconds", "MongoDB command latency reported by the driver",
+    ("command", "outcome")
+))
+CACHE_LOOKUPS = registry.register(Counter(
+    "greenwash_cache_lookups_total", "Cache lookups by cache and result", ("cache", "result")
+))
+LLM_TOKENS = registry.register(Counter(
+    "greenwash_llm_tokens_total", "Tokens reported by the model API", ("model", "kind")
+))
+LLM_RETRIES = registry.register(Counter(
+    "greenwash_llm_retries_total", "Retried model calls (429/5xx/connection errors)"
+))
+
+
+@contextmanager
+def span(name: str):
+    """Time a block under `greenwash_span_duration_seconds{span=name}`, labelled ok or error."""
+    started = time.perf_counter()
+    outcome = "error"
+    try:
+        yield
+        outcome = "ok"
+    finally:
+        SPAN_SECONDS.observe(time.perf_counter() - started, name, outcome)
+
+
+def record_usage(model: str, usage) -> None:
+    """Count prompt/completion tokens from an OpenAI `usage` object, if the response had one."""
+    if usage is None:
+        return
+    LLM_TOKENS.inc(model, "prompt", amount=getattr(usage, "prompt_tokens", 0) or 0)
+    LLM_TOKENS.inc(model, "completion", amount=getattr(usage, "completion_tokens", 0) or 0)
+
+
+class MongoCommandMetrics(monitoring.CommandListener):
+    """
+    Records every command's server round-trip time. Called on the driver's threads;
+    only the duration the driver already measured is used.
+    """
+
+    def started(self, event):
+        pass
+
+    def succeeded(self, event):
+        MONGO_COMMAND_SECONDS.observe(event.duration_micros / 1_000_000, event.command_name, "ok")
+
+    def failed(self, event):
+        MONGO_COMMAND_SECONDS.observe(event.duration_micros / 1_000_000, event.command_name, "error")
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware timing each HTTP request until its response has been sent.
+    Requests are labelled by route template (`/reports/{report_id}`), not raw path,
+    so the number of series stays bounded.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status = {"code": 500}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = scope.get("route")
+            HTTP_REQUEST_SECONDS.observe(
+                time.perf_counter() - started,
+                scope["method"],
+                getattr(route, "path", "unmatched"),
+                str(status["code"])
+            )
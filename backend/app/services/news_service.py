@@ -1,52 +1,158 @@
+import asyncio
+import time
 import httpx
-from typing import List, Dict
+from collections import OrderedDict
+from typing import List, Dict, Optional
+
+from ..config import get_settings
+from .metrics_service import CACHE_LOOKUPS, span
+
+_client: Optional[httpx.AsyncClient] = None
+
+# company key -> (expires_at, formatted news)
+_cache: "OrderedDict[str, tuple]" = OrderedDict()
+
+# company key -> in-flight lookup shared by concurrent callers
+_inflight: Dict[str, asyncio.Task] = {}
+
+def get_http_client() -> httpx.AsyncClient:
+    """Process-wide pooled client so Serper connections are kept alive between lookups."""
+    global _client
+    if _client is None or _client.is_closed:
+        settings = get_settings()
+        _client = httpx.AsyncClient(
+            timeout=settings.news_timeout_seconds,
+            limits=httpx.Limits(max_connections=20, max_keepalive_connections=10),
+        )
+    return _client
+
+async def close_http_client():
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+def clear_news_cache():
+    _cache.clear()
+
+def _cache_get(key: str) -> Optional[str]:
+    entry = _cache.get(key)
+    if entry is None:
+        return None
+    expires_at, value = entry
+    if expires_at < time.monotonic():
+        del _cache[key]
+        return None
+    _cache.move_to_end(key)
+    return value
+
+def _cache_set(key: str, value: str, ttl: float):
+    settings = get_settings()
+    _cache[key] = (time.monotonic() + ttl, value)
+    _cache.move_to_end(key)
+    while len(_cache) > settings.news_cache_max_entries:
+        _cache.popitem(last=False)
 
 async def search_news(company_name: str, api_key: str) -> str:
     """Search for environmental news about a company using Serper.dev API."""
-    
+
     if not api_key:
         return "No external news data available (API key not configured)."
-    
-    url = "https://google.serper.dev/search"
-    
+
+    key = company_name.strip().lower()
+    cached = _cache_get(key)
+    if cached is not None:
+        CACHE_LOOKUPS.inc("news", "hit")
+        return cached
+    CACHE_LOOKUPS.inc("news", "miss")
+
+    # Single-flight: concurrent analyses of the same company share one lookup
+    task = _inflight.get(key)
+    if task is None:
+        task = asyncio.create_task(_fetch_news(company_name, api_key))
+        _inflight[key] = task
+        task.add_done_callback(lambda _: _inflight.pop(key, None))
+
+    with span("search_news"):
+        formatted, ttl = await asyncio.shield(task)
+    if ttl:
+        _cache_set(key, formatted, ttl)
+    return formatted
+
+async def _run_query(client: httpx.AsyncClient, url: str, api_key: str, query: str) -> Optional[List[Dict]]:
+    """Run one Serper query. Returns None when the request failed."""
+    try:
+        response = await client.post(
+            url,
+            headers={"X-API-KEY": api_key, "Content-Type": "application/json"},
+            json={"q": query, "num": 5},
+        )
+    except Exception as e:
+        print(f"News search error: {e}")
+        return None
+
+    if response.status_code != 200:
+        print(f"News search error: HTTP {response.status_code}")
+        return None
+
+    try:
+        organic = response.json().get("organic", [])
+    except ValueError as e:
+        print(f"News search error: invalid JSON ({e})")
+        return None
+
+    return [
+        {
+            "title": item.get("title", ""),
+            "snippet": item.get("snippet", ""),
+            "link": item.get("link", ""),
+        }
+        for item in organic[:3]
+    ]
+
+async def _fetch_news(company_name: str, api_key: str) -> tuple:
+    """
+    Run all queries concurrently under one deadline. Returns (formatted, cache TTL):
+    the full TTL when every query answered, a short one when some were dropped, and
+    0 (not cached) when none were.
+    """
+    settings = get_settings()
+    client = get_http_client()
+
     queries = [
         f"{company_name} environmental violations news",
         f"{company_name} pollution fines",
         f"{company_name} sustainability controversy",
     ]
-    
+
+    tasks = [asyncio.create_task(_run_query(client, settings.serper_url, api_key, query)) for query in queries]
+    done, pending = await asyncio.wait(tasks, timeout=settings.news_deadline_seconds)
+    for task in pending:
+        task.cancel()
+    if pending:
+        print(f"News search deadline hit: {len(pending)} of {len(queries)} queries dropped")
+
+    # Keep results in query order regardless of completion order
     all_results = []
-    
-    async with httpx.AsyncClient() as client:
-        for query in queries:
-            try:
-                response = await client.post(
-                    url,
-                    headers={"X-API-KEY": api_key, "Content-Type": "application/json"},
-                    json={"q": query, "num": 5},
-                    timeout=10.0
-                )
-                
-                if response.status_code == 200:
-                    data = response.json()
-                    organic = data.get("organic", [])
-                    
-                    for item in organic[:3]:
-                        all_results.append({
-                            "title": item.get("title", ""),
-                            "snippet": item.get("snippet", ""),
-                            "link": item.get("link", ""),
-                        })
-            except Exception as e:
-                print(f"News search error: {e}")
-                continue
-    
+    succeeded = 0
+    for task in tasks:
+        if task in done and task.exception() is None and task.result() is not None:
+            succeeded += 1
+            all_results.extend(task.result())
+
+    if succeeded == len(queries):
+        ttl = settings.news_cache_ttl_seconds
+    elif succeeded and all_results:
+        ttl = settings.news_partial_cache_ttl_seconds
+    else:
+        ttl = 0
+
     if not all_results:
-        return "No relevant news articles found for this company."
-    
+        return "No relevant news articles found for this company.", ttl
+
     # Format results for the prompt
     formatted = []
     for i, result in enumerate(all_results[:10], 1):
         formatted.append(f"{i}. {result['title']}\n   {result['snippet']}\n   Source: {result['link']}")
-    
-    return "\n\n".join(formatted)
+
+    return "\n\n".join(formatted), ttl
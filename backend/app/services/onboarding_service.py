@@ -0,0 +1,312 @@
+import asyncio
+import csv
+import os
+import re
+import secrets
+import time
+from collections import Counter
+from datetime import datetime
+from itertools import islice
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from openpyxl import load_workbook
+from pymongo import InsertOne, UpdateOne
+from pymongo.errors import BulkWriteError
+
+from ..config import get_settings
+from . import stats_service
+from .auth_service import hash_password
+from .gst_registry import GSTIN_RE, gst_registry, normalize_gstin
+from .metrics_service import span
+from .user_loader import user_loader
+
+EMAIL_RE = re.compile(r"^[^@\s]+@[^@\s]+\.[^@\s]+$")
+
+# Accepted headers per field (case-insensitive), in order of preference. The first
+# non-empty one wins, so the GST registry export imports as-is: Trade Name, else
+# Legal Name, becomes the company name and Business Nature the industry.
+FIELD_COLUMNS = {
+    "gst_number": ("gst number", "gst_number", "gstin"),
+    "email": ("email", "e-mail"),
+    "company_name": ("company name", "company_name", "trade name", "legal name"),
+    "industry_type": ("industry type", "industry_type", "industry", "business nature"),
+    "password": ("password",),
+}
+
+DEFAULT_INDUSTRY = "Other"
+MIN_PASSWORD_LENGTH = 6
+
+
+class ImportFormatError(ValueError):
+    """The file is not a spreadsheet we can read, or lacks a required column."""
+
+
+def _cell(value) -> str:
+    return str(value).strip() if value is not None else ""
+
+
+def _rows_from(header, rows) -> Iterator[Tuple[int, Dict[str, str]]]:
+    names = [_cell(cell).lower() for cell in header]
+    positions = {
+        field: [names.index(column) for column in columns if column in names]
+        for field, columns in FIELD_COLUMNS.items()
+    }
+    missing = [field for field in ("gst_number", "email") if not positions[field]]
+    if missing:
+        raise ImportFormatError(f"Missing required column(s): {', '.join(missing)}")
+
+    # Row numbers match the spreadsheet, header being row 1
+    for row_number, row in enumerate(rows, start=2):
+        fields = {}
+        for field, indexes in positions.items():
+            fields[field] = next(
+                (value for value in (_cell(row[index]) for index in indexes if index < len(row)) if value), ""
+            )
+        if any(fields.values()):
+            yield row_number, fields
+
+
+def iter_rows(path: str, filename: Optional[str] = None) -> Iterator[Tuple[int, Dict[str, str]]]:
+    """
+    Stream (row number, fields) from an .xlsx (openpyxl read-only mode) or .csv file,
+    one row at a time, skipping blank rows. Blocking; read it from a thread.
+    """
+    extension = os.path.splitext((filename or path).lower())[1]
+    if extension == ".csv":
+        with open(path, newline="", encoding="utf-8-sig") as source:
+            reader = csv.reader(source)
+            try:
+                yield from _rows_from(next(reader, []), reader)
+            except UnicodeDecodeError:
+                raise ImportFormatError("CSV file is not UTF-8 encoded")
+            except csv.Error as e:
+                raise ImportFormatError(f"Malformed CSV at line {reader.line_num}: {e}")
+    elif extension in (".xlsx", ".xlsm"):
+        # A file object rather than a path, so spooled uploads need no .xlsx suffix
+        with open(path, "rb") as source:
+            try:
+                workbook = load_workbook(source, read_only=True, data_only=True)
+            except Exception as e:
+                raise ImportFormatError(f"Not a readable xlsx file: {e}")
+            try:
+                rows = workbook.active.iter_rows(values_only=True)
+                yield from _rows_from(next(rows, ()), rows)
+            finally:
+                workbook.close()
+    else:
+        raise ImportFormatError("Only .xlsx and .csv files can be imported")
+
+
+def validate_row(fields: Dict[str, str], enforce_registry: bool) -> Tuple[Optional[dict], Optional[str]]:
+    """A users document for the row, or the reason it was rejected (same rules as /auth/register)."""
+    gst_number = normalize_gstin(fields["gst_number"])
+    if not GSTIN_RE.fullmatch(gst_number):
+        return None, "Invalid GST number"
+
+    registration = gst_registry.lookup(gst_number)
+    if enforce_registry:
+        if registration is None:
+            return None, "GST number not found in the GST registry"
+        if registration.status.lower() != "active":
+            return None, f"GST registration is {registration.status.lower()}"
+
+    email = fields["email"].lower()
+    if not EMAIL_RE.match(email):
+        return None, "Invalid email address"
+
+    company_name = fields["company_name"] or (registration and (registration.trade_name or registration.legal_name))
+    if not company_name:
+        return None, "Company name is required"
+
+    password = fields["password"]
+    if password and len(password) < MIN_PASSWORD_LENGTH:
+        return None, f"Password must be at least {MIN_PASSWORD_LENGTH} characters"
+
+    return {
+        "gst_number": gst_number,
+        "email": email,
+        "company_name": company_name,
+        "industry_type": fields["industry_type"] or DEFAULT_INDUSTRY,
+        "gst_legal_name": registration.legal_name if registration else None,
+        "gst_state": registration.state if registration else None,
+        # Only updates may go without one; run_chunk rejects new accounts lacking a password
+        "password_hash": hash_password(password) if password else None,
+        "role": "client",
+        "created_at": datetime.utcnow(),
+    }, None
+
+
+def _prepare_chunk(rows: Iterator, size: int, enforce_registry: bool, generate_passwords: bool) -> List[tuple]:
+    """Read and validate the next `size` rows. Blocking (parsing and hashing); run it in a thread."""
+    prepared = []
+    for row_number, fields in islice(rows, size):
+        if generate_passwords and not fields["password"]:
+            fields["password"] = secrets.token_urlsafe(9)
+            fields["generated"] = True
+        doc, error = validate_row(fields, enforce_registry)
+        prepared.append((row_number, fields, doc, error))
+    return prepared
+
+
+class _Import:
+    """State of one import: the running report plus every email/GSTIN seen so far in the file."""
+
+    def __init__(self, db, update_existing: bool):
+        self.db = db
+        self.update_existing = update_existing
+        self.seen_emails: Dict[str, int] = {}
+        self.seen_gstins: Dict[str, int] = {}
+        self.report = {"total_rows": 0, "inserted": 0, "updated": 0, "failed": 0, "errors": [], "credentials": []}
+
+    def fail(self, row_number: int, fields: dict, error: str):
+        self.report["failed"] += 1
+        self.report["errors"].append({
+            "row": row_number,
+            "gst_number": fields.get("gst_number") or None,
+            "email": fields.get("email") or None,
+            "error": error,
+        })
+
+    async def _existing(self, candidates: List[tuple]) -> Tuple[Dict[str, dict], set]:
+        """Registered users clashing with the chunk, from one $in query over both unique keys."""
+        emails = [doc["email"] for _, _, doc in candidates]
+        gstins = [doc["gst_number"] for _, _, doc in candidates]
+        by_gstin = {}
+        taken_emails = set()
+        async for user in self.db.users.find(
+            {"$or": [{"email": {"$in": emails}}, {"gst_number": {"$in": gstins}}]},
+            {"email": 1, "gst_number": 1, "industry_type": 1}
+        ):
+            by_gstin[user["gst_number"]] = user
+            taken_emails.add(user["email"])
+        return by_gstin, taken_emails
+
+    async def run_chunk(self, prepared: List[tuple]):
+        candidates = []
+        for row_number, fields, doc, error in prepared:
+            self.report["total_rows"] += 1
+            if error:
+                self.fail(row_number, fields, error)
+                continue
+            first = self.seen_gstins.get(doc["gst_number"])
+            if first:
+                self.fail(row_number, fields, f"Duplicate GST number (first seen on row {first})")
+                continue
+            first = self.seen_emails.get(doc["email"])
+            if first:
+                self.fail(row_number, fields, f"Duplicate email (first seen on row {first})")
+                continue
+            self.seen_gstins[doc["gst_number"]] = row_number
+            self.seen_emails[doc["email"]] = row_number
+            candidates.append((row_number, fields, doc))
+        if not candidates:
+            return
+
+        by_gstin, taken_emails = await self._existing(candidates)
+        operations = []
+        # Per operation: (row number, fields, industry delta for the stats rollup, updated user _id,
+        # (old, new) industry when an update moves the company)
+        planned = []
+        for row_number, fields, doc in candidates:
+            existing = by_gstin.get(doc["gst_number"])
+            if existing:
+                if not self.update_existing:
+                    self.fail(row_number, fields, "GST number already registered")
+                    continue
+                if existing["email"] != doc["email"] and doc["email"] in taken_emails:
+                    self.fail(row_number, fields, "Email already registered to another company")
+                    continue
+                # Profile fields only; the account's email and password are left alone
+                operations.append(UpdateOne({"_id": existing["_id"]}, {"$set": {
+                    "company_name": doc["company_name"],
+                    "industry_type": doc["industry_type"],
+                    "gst_legal_name": doc["gst_legal_name"],
+                    "gst_state": doc["gst_state"],
+                }}))
+                old_industry = existing.get("industry_type", DEFAULT_INDUSTRY)
+                moved = Counter({doc["industry_type"]: 1})
+                moved[old_industry] -= 1
+                move = (old_industry, doc["industry_type"]) if old_industry != doc["industry_type"] else None
+                planned.append((row_number, fields, moved, existing["_id"], move))
+            elif doc["email"] in taken_emails:
+                self.fail(row_number, fields, "Email already registered")
+            elif doc["password_hash"] is None:
+                self.fail(row_number, fields, "Password is required for new accounts")
+            else:
+                operations.append(InsertOne(doc))
+                planned.append((row_number, fields, Counter({doc["industry_type"]: 1}), None, None))
+        if not operations:
+            return
+
+        # Unordered: one round trip per batch of writes, and a failing row does not stop the rest.
+        # The unique indexes still catch registrations that raced in after the $in query.
+        write_errors = {}
+        with span("onboarding.write"):
+            try:
+                await self.db.users.bulk_write(operations, ordered=False)
+            except BulkWriteError as e:
+                write_errors = {error["index"]: error for error in e.details.get("writeErrors", [])}
+
+        companies = Counter()
+        moves = {}
+        for index, (row_number, fields, delta, user_id, move) in enumerate(planned):
+            error = write_errors.get(index)
+            if error:
+                message = "Email or GST number already registered" if error.get("code") == 11000 else error.get("errmsg", "Write failed")
+                self.fail(row_number, fields, message)
+                continue
+            companies.update(delta)
+            if user_id is None:
+                self.report["inserted"] += 1
+                if fields.get("generated"):
+                    self.report["credentials"].append(
+                        {"row": row_number, "email": fields["email"].lower(), "password": fields["password"]}
+                    )
+            else:
+                self.report["updated"] += 1
+                user_loader.invalidate(str(user_id))
+                if move:
+                    moves[str(user_id)] = move
+        await stats_service.record_companies(self.db, companies)
+        # Their reports' scores follow the companies to the new industry
+        await stats_service.move_company_scores(self.db, moves)
+
+
+async def import_companies(
+    db,
+    path: str,
+    filename: Optional[str] = None,
+    update_existing: bool = False,
+    generate_passwords: bool = False,
+) -> dict:
+    """
+    Register every company in a spreadsheet, `onboarding_chunk_rows` rows at a time.
+
+    Each chunk is parsed and validated in a thread, checked against existing users
+    with a single query and written with one unordered bulk_write, so an import costs
+    a few round trips per thousand rows instead of three per company. With
+    `update_existing`, rows whose GSTIN is already registered update that company's
+    profile instead of failing. Every new account needs a Password cell; with
+    `generate_passwords`, empty ones get a random password, returned once in
+    `credentials` for the admin to hand over. Returns counts plus one error entry
+    per rejected row. Raises ImportFormatError for unreadable files.
+    """
+    settings = get_settings()
+    enforce_registry = settings.gst_registry_enforce and len(gst_registry) > 0
+    state = _Import(db, update_existing)
+    started = time.perf_counter()
+    rows = iter_rows(path, filename)
+    try:
+        with span("onboarding.import"):
+            while True:
+                prepared = await asyncio.to_thread(
+                    _prepare_chunk, rows, settings.onboarding_chunk_rows, enforce_registry, generate_passwords
+                )
+                if not prepared:
+                    break
+                await state.run_chunk(prepared)
+    finally:
+        rows.close()
+
+    state.report["elapsed_seconds"] = round(time.perf_counter() - started, 3)
+    return state.report
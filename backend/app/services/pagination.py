@@ -0,0 +1,35 @@
+import base64
+import json
+from datetime import datetime
+from typing import Optional, Tuple
+
+from bson import ObjectId
+
+
+def encode_cursor(sort_value, doc_id: ObjectId) -> str:
+    """Opaque keyset cursor for (sort value, _id)."""
+    if isinstance(sort_value, datetime):
+        value = {"t": "dt", "v": sort_value.isoformat()}
+    else:
+        value = {"t": "raw", "v": sort_value}
+    raw = json.dumps([value, str(doc_id)]).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii")
+
+
+def decode_cursor(cursor: str) -> Tuple[object, ObjectId]:
+    raw = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+    value, doc_id = raw
+    sort_value = datetime.fromisoformat(value["v"]) if value["t"] == "dt" else value["v"]
+    return sort_value, ObjectId(doc_id)
+
+
+def keyset_filter(field: str, descending: bool, cursor: Optional[str]) -> dict:
+    """Filter selecting documents strictly after the cursor in (field, _id) order."""
+    if not cursor:
+        return {}
+    sort_value, doc_id = decode_cursor(cursor)
+    op = "$lt" if descending else "$gt"
+    return {"$or": [
+        {field: {op: sort_value}},
+        {field: sort_value, "_id": {op: doc_id}},
+    ]}
@@ -1,20 +1,39 @@
 import fitz  # PyMuPDF
-from io import BytesIO
 import re
+from typing import Union
 
-def extract_text_from_pdf(file_bytes: bytes) -> str:
+# A PDF is passed around either as raw bytes or as the path of a spooled upload
+PdfSource = Union[bytes, str]
+
+def open_pdf(source: PdfSource):
+    """Open a PDF from bytes or from a file path (read from disk on demand, not loaded whole)."""
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return fitz.open(stream=source, filetype="pdf")
+    return fitz.open(source, filetype="pdf")
+
+def extract_text_from_pdf(source: PdfSource) -> str:
     """Extract text content from a PDF file."""
+    return "\n".join(extract_page_texts(source))
+
+def extract_page_texts(source: PdfSource, start: int = 0, end: int = None) -> list:
+    """Extract the text of pages [start, end) as a list, one entry per page."""
     text_content = []
     
-    with fitz.open(stream=file_bytes, filetype="pdf") as doc:
-        for page in doc:
-            text_content.append(page.get_text())
+    with open_pdf(source) as doc:
+        end = len(doc) if end is None else min(end, len(doc))
+        for page_num in range(start, end):
+            text_content.append(doc[page_num].get_text())
     
-    return "\n".join(text_content)
+    return text_content
+
+def count_pdf_pages(source: PdfSource) -> int:
+    """Return the number of pages without extracting any text."""
+    with open_pdf(source) as doc:
+        return len(doc)
 
 def extract_company_name(text: str) -> str:
     """Try to extract company name from the first few lines of the PDF."""
-    lines = text.strip().split('\n')[:20]
+    lines = text.strip().split('\n', 20)[:20]
     
     # Look for common patterns
     for line in lines:
@@ -27,87 +46,99 @@ def extract_company_name(text: str) -> str:
     
     return "Unknown Company"
 
-def extract_pdf_preview(file_bytes: bytes) -> dict:
-    """Extract all data from PDF for display."""
+MAX_PREVIEW_FIELDS = 50
+MAX_PREVIEW_NUMBERS = 30
+MAX_PREVIEW_YEARS = 10
+
+CERT_PATTERNS = ['ISO 14001', 'ISO 9001', 'ISO 45001', 'ISO 50001', 'B-Corp', 'SBTi', 'GRI', 'CDP', 'LEED', 'FSC', 'OHSAS']
+
+NUMERIC_RE = re.compile(r'(\d{1,3}(?:,\d{3})*(?:\.\d+)?)\s*(tons?|tonnes?|kg|MT|kWh|MWh|GWh|liters?|L|gallons?|%|million|billion|crore|lakh|Rs\.?|₹|\$|USD|INR)?', re.IGNORECASE)
+YEAR_RE = re.compile(r'\b(20[1-2]\d)\b')
+
+def _parse_field(line: str):
+    """Return a {"field", "value"} pair for "Key: Value" / "Key - Value" lines, else None."""
+    if ':' in line:
+        key, value = line.split(':', 1)
+        if len(key) < 50:
+            return {"field": key.strip(), "value": value.strip()}
+    elif ' - ' in line and len(line) < 200:
+        key, value = line.split(' - ', 1)
+        return {"field": key.strip(), "value": value.strip()}
+    return None
+
+def extract_pdf_preview(source: PdfSource) -> dict:
+    """Extract all data from PDF for display in a single pass over each page."""
     pages_data = []
-    full_text = ""
-    total_pages = 0
+    text_parts = []
+    total_words = 0
+    extracted_data = []
+    numeric_data = []
+    # Certifications still to look for; each page is lowercased once and
+    # patterns drop out as soon as they are found
+    pending_certs = [(cert, cert.lower()) for cert in CERT_PATTERNS]
+    found_certs = set()
+    years = set()
     
-    with fitz.open(stream=file_bytes, filetype="pdf") as doc:
+    with open_pdf(source) as doc:
         total_pages = len(doc)
         for page_num, page in enumerate(doc, 1):
             page_text = page.get_text()
-            full_text += page_text + "\n"
-            
-            # Extract tables if any (text blocks that look like tables)
-            blocks = page.get_text("blocks")
+            text_parts.append(page_text)
             
+            word_count = len(page_text.split())
+            total_words += word_count
             pages_data.append({
                 "page_number": page_num,
                 "text": page_text.strip(),
-                "word_count": len(page_text.split())
+                "word_count": word_count
             })
+            
+            # Key/value fields and numeric data share one walk over the lines,
+            # which stops as soon as both caps are reached
+            if len(extracted_data) < MAX_PREVIEW_FIELDS or len(numeric_data) < MAX_PREVIEW_NUMBERS:
+                for line in page_text.split('\n'):
+                    stripped = line.strip()
+                    if not stripped:
+                        continue
+                    
+                    if len(extracted_data) < MAX_PREVIEW_FIELDS:
+                        field = _parse_field(stripped)
+                        if field:
+                            extracted_data.append(field)
+                    
+                    if len(numeric_data) < MAX_PREVIEW_NUMBERS and len(line) < 300:
+                        for num, unit in NUMERIC_RE.findall(line):
+                            numeric_data.append({
+                                "value": num,
+                                "unit": unit or "",
+                                "context": stripped[:150]
+                            })
+                    
+                    if len(extracted_data) >= MAX_PREVIEW_FIELDS and len(numeric_data) >= MAX_PREVIEW_NUMBERS:
+                        break
+            
+            if pending_certs:
+                lowered = page_text.lower()
+                for cert, needle in pending_certs:
+                    if needle in lowered:
+                        found_certs.add(cert)
+                pending_certs = [(cert, needle) for cert, needle in pending_certs if cert not in found_certs]
+            
+            years.update(YEAR_RE.findall(page_text))
     
-    # Parse structured data - look for key-value pairs
-    extracted_data = []
-    lines = full_text.split('\n')
-    
-    for line in lines:
-        line = line.strip()
-        if not line:
-            continue
-        
-        # Look for patterns like "Key: Value" or "Key - Value"
-        if ':' in line:
-            parts = line.split(':', 1)
-            if len(parts) == 2 and len(parts[0]) < 50:
-                extracted_data.append({
-                    "field": parts[0].strip(),
-                    "value": parts[1].strip()
-                })
-        elif ' - ' in line and len(line) < 200:
-            parts = line.split(' - ', 1)
-            if len(parts) == 2:
-                extracted_data.append({
-                    "field": parts[0].strip(),
-                    "value": parts[1].strip()
-                })
-    
-    # Extract numeric data with context
-    numeric_data = []
-    for line in lines:
-        # Find lines with numbers
-        numbers = re.findall(r'(\d{1,3}(?:,\d{3})*(?:\.\d+)?)\s*(tons?|tonnes?|kg|MT|kWh|MWh|GWh|liters?|L|gallons?|%|million|billion|crore|lakh|Rs\.?|₹|\$|USD|INR)?', line, re.IGNORECASE)
-        if numbers and len(line) < 300:
-            for num, unit in numbers:
-                numeric_data.append({
-                    "value": num,
-                    "unit": unit or "",
-                    "context": line.strip()[:150]
-                })
-    
-    # Extract certifications
-    certifications = []
-    cert_patterns = ['ISO 14001', 'ISO 9001', 'ISO 45001', 'ISO 50001', 'B-Corp', 'SBTi', 'GRI', 'CDP', 'LEED', 'FSC', 'OHSAS']
-    for cert in cert_patterns:
-        if cert.lower() in full_text.lower():
-            certifications.append(cert)
-    
-    # Extract years
-    years = list(set(re.findall(r'\b(20[1-2]\d)\b', full_text)))
-    years.sort(reverse=True)
+    full_text = "\n".join(text_parts)
     
-    # Try to extract company name
-    company_name = extract_company_name(full_text)
+    # Keep the pattern order stable for display
+    certifications = [cert for cert in CERT_PATTERNS if cert in found_certs]
     
     return {
-        "company_name": company_name,
+        "company_name": extract_company_name(full_text),
         "total_pages": total_pages,
-        "total_words": len(full_text.split()),
+        "total_words": total_words,
         "full_text": full_text.strip(),
         "pages": pages_data,
-        "extracted_fields": extracted_data[:50],  # Limit to 50 fields
-        "numeric_data": numeric_data[:30],  # Limit to 30 numeric entries
+        "extracted_fields": extracted_data[:MAX_PREVIEW_FIELDS],
+        "numeric_data": numeric_data[:MAX_PREVIEW_NUMBERS],
         "certifications": certifications,
-        "years_mentioned": years[:10],
+        "years_mentioned": sorted(years, reverse=True)[:MAX_PREVIEW_YEARS],
     }
@@ -0,0 +1,325 @@
+import asyncio
+from datetime import datetime
+from typing import Awaitable, Callable, List, Optional
+
+from ..config import get_settings
+from ..models import AnalysisResult, ReportResponse
+from .pdf_service import PdfSource
+from .gst_registry import resolve_company_name
+from .extraction_service import extraction_engine, ExtractionLimitError, ExtractionTimeoutError
+from .news_service import search_news
+from .ai_service import analyze_with_ai, stream_analysis_with_ai, SectionCallback
+from .llm_gateway import LLMUnavailableError
+from .mapreduce_service import analyze_with_map_reduce
+from . import stats_service, scoring_service, text_store
+from .cache_service import analysis_cache, compute_content_hash, make_cache_key
+from .file_service import release_pdf, retain_pdf, store_pdf
+from .metrics_service import span
+from .stage_graph import StageGraph, StageTimeoutError
+
+ProgressCallback = Callable[..., Awaitable[None]]
+
+ANALYSIS_MODES = ("standard", "mapreduce", "fast")
+
+# Pages read for the company name when the first page alone has none
+HEAD_MAX_PAGES = 3
+
+
+class PipelineError(Exception):
+    """Analysis failure carrying the HTTP status the API should report."""
+    
+    def __init__(self, status_code: int, detail: str):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+
+
+async def _no_progress(stage: str, **info):
+    pass
+
+
+async def run_analysis_pipeline(
+    db,
+    fs,
+    filename: str,
+    source: PdfSource,
+    user_id: Optional[str] = None,
+    progress: Optional[ProgressCallback] = None,
+    on_section: Optional[SectionCallback] = None,
+    mode: str = "standard",
+    content_hash: Optional[str] = None,
+    file_id: Optional[str] = None,
+    pages: Optional[List[str]] = None,
+) -> ReportResponse:
+    """
+    Run the full analysis pipeline for an uploaded PDF.
+    
+    `source` is the PDF's bytes or the path of a spooled upload; with a path,
+    `content_hash` must be given (spool_upload computes it while copying).
+    Work already done by /preview is reused: an already stored `file_id` skips
+    storage, and extracted `pages` skip extraction (`source` may then be None).
+    Pages are also read from the text store when this PDF was extracted before,
+    and saved to it after a fresh extraction.
+    
+    The work runs as a stage graph: the GridFS store runs alongside extraction,
+    and the news search starts as soon as the first page yields a company name
+    while the rest of the document is still being parsed. Each stage has its own
+    time budget; a failed stage's dependents are never started.
+    
+    Stages reported through `progress` (stored, extracted and news may arrive in
+    any order): stored, extracted, news, ai, saved.
+    When `on_section` is given the model is streamed and each completed
+    section of the analysis is passed to it as soon as it is parsed.
+    `mode="mapreduce"` analyzes page windows separately and combines the findings;
+    `mode="fast"` skips news and the model and returns the rule-based provisional scores.
+    """
+    settings = get_settings()
+    progress = progress or _no_progress
+    
+    if content_hash is None:
+        content_hash = compute_content_hash(source)
+    cache_key = make_cache_key(content_hash, mode)
+    
+    # Re-uploads of the same report skip extraction, news search and AI analysis
+    analysis = await analysis_cache.get(db, cache_key)
+    
+    # The report's reference on its GridFS blob, given back if the report is never saved
+    held = {}
+    
+    async def store(results):
+        # Identical uploads share one GridFS blob
+        if file_id is not None:
+            if not await retain_pdf(db, file_id):
+                raise PipelineError(410, "Preview file no longer stored; upload the file again")
+            held["file_id"] = file_id
+            await progress("stored", file_id=str(file_id), reused=True)
+            return file_id
+        try:
+            with span("pipeline.store"):
+                stored_id = held["file_id"] = await store_pdf(db, fs, filename, source, content_hash)
+        except Exception as e:
+            raise PipelineError(500, f"Failed to store file: {e}")
+        await progress("stored", file_id=str(stored_id))
+        return stored_id
+    
+    graph = StageGraph()
+    graph.add("store", store, timeout=settings.stage_store_timeout_seconds)
+    if analysis is None:
+        text_stored = False
+        if pages is None:
+            pages = await text_store.load_pages(db, content_hash)
+            text_stored = pages is not None
+        _add_analysis_stages(graph, db, source, settings, progress, on_section, mode, pages)
+        if not text_stored:
+            # Runs alongside the AI stage; a failed save is only reported
+            async def save_text(results):
+                return await text_store.save_pages(db, content_hash, results["extract"])
+            graph.add("text", save_text, after=("extract",))
+    
+    try:
+        try:
+            results = await graph.run()
+        except StageTimeoutError as e:
+            raise PipelineError(504, str(e))
+        file_id = results["store"]
+        if analysis is not None:
+            for stage in ("extracted", "news", "ai"):
+                await progress(stage, cached=True)
+            await _replay_sections(analysis, on_section)
+        else:
+            analysis = results["ai"]
+            await analysis_cache.set(db, cache_key, content_hash, analysis)
+    
+        # Store report document with analysis
+        report_doc = build_report_doc(filename, file_id, content_hash, user_id, analysis)
+    
+        with span("pipeline.save"):
+            result = await db.reports.insert_one(report_doc)
+            held.clear()  # the saved report owns the reference now
+            await stats_service.record_report(db, report_doc)
+    except BaseException:
+        if "file_id" in held:
+            await release_pdf(db, fs, str(held["file_id"]))
+        raise
+    await progress("saved", report_id=str(result.inserted_id))
+    
+    return ReportResponse(
+        id=str(result.inserted_id),
+        filename=filename,
+        uploaded_at=report_doc["uploaded_at"],
+        user_id=user_id,
+        analysis=analysis
+    )
+
+
+def build_report_doc(filename: str, file_id, content_hash: str, user_id: Optional[str], analysis: AnalysisResult) -> dict:
+    return {
+        "filename": filename,
+        "file_id": str(file_id),
+        "content_hash": content_hash,
+        "uploaded_at": datetime.utcnow(),
+        "user_id": user_id,
+        "analysis": analysis.model_dump()
+    }
+
+
+async def _replay_sections(analysis: AnalysisResult, on_section: Optional[SectionCallback]):
+    if on_section:
+        for key, value in analysis.model_dump(mode="json").items():
+            await on_section(key, value)
+
+
+def _extraction_error(error: Exception) -> PipelineError:
+    if isinstance(error, ExtractionLimitError):
+        return PipelineError(413, str(error))
+    if isinstance(error, ExtractionTimeoutError):
+        return PipelineError(504, str(error))
+    return PipelineError(400, f"Failed to extract text from PDF: {error}")
+
+
+async def extract_stage(source: PdfSource) -> List[str]:
+    """Extract page texts, mapping extraction failures to pipeline errors."""
+    try:
+        with span("pipeline.extract"):
+            pages = await extraction_engine.extract_pages(source)
+    except Exception as e:
+        raise _extraction_error(e)
+    
+    if not any(text.strip() for text in pages):
+        raise PipelineError(400, "PDF appears to be empty or contains no extractable text")
+    return pages
+
+
+async def news_stage(company_name: str, settings, mode: str = "standard") -> str:
+    """External news for the company; a failed lookup is passed on to the model as text."""
+    if mode == "fast":
+        return ""
+    try:
+        with span("pipeline.news"):
+            return await asyncio.wait_for(
+                search_news(company_name, settings.serper_api_key), settings.stage_news_timeout_seconds
+            )
+    except asyncio.TimeoutError:
+        return f"News search timed out after {settings.stage_news_timeout_seconds:g} seconds"
+    except Exception as e:
+        return f"News search failed: {e}"
+
+
+async def ai_stage(
+    db,
+    pages: List[str],
+    news_data: str,
+    settings,
+    on_section: Optional[SectionCallback] = None,
+    mode: str = "standard"
+) -> AnalysisResult:
+    """
+    Run the AI audit over extracted pages, mapping model failures to pipeline errors.
+    
+    Hard-metric, vague-language and certification counts are computed locally first
+    and handed to the model; in fast mode they are the whole analysis.
+    """
+    with span("pipeline.prescore"):
+        prescored = await asyncio.to_thread(scoring_service.prescore, pages)
+    if mode == "fast":
+        analysis = scoring_service.fast_analysis(pages, resolve_company_name("\n".join(pages)), prescored)
+        await _replay_sections(analysis, on_section)
+        return analysis
+    
+    if not settings.openai_api_key:
+        raise PipelineError(500, "OpenAI API key not configured")
+    
+    pdf_text = "\n".join(pages)
+    try:
+        with span("pipeline.ai"):
+            if mode == "mapreduce":
+                analysis = await analyze_with_map_reduce(db, pages, news_data, settings.openai_api_key, prescored)
+                await _replay_sections(analysis, on_section)
+            elif on_section:
+                analysis = await stream_analysis_with_ai(pdf_text, news_data, settings.openai_api_key, on_section, prescored)
+            else:
+                analysis = await analyze_with_ai(pdf_text, news_data, settings.openai_api_key, prescored)
+    except LLMUnavailableError as e:
+        raise PipelineError(503, str(e))
+    except ValueError as e:
+        raise PipelineError(500, str(e))
+    except Exception as e:
+        raise PipelineError(500, f"AI analysis failed: {e}")
+    return analysis
+
+
+async def company_stage(source: PdfSource) -> str:
+    """
+    Company name from the head of the document, without waiting for full extraction.
+    A GSTIN found in the GST registry gives the registered name; otherwise this matches
+    extract_company_name over the full text: more pages are read only when the first
+    one has fewer than the 20 lines it inspects and no usable name.
+    """
+    try:
+        head = await extraction_engine.extract_head(source, pages=1)
+        company_name = resolve_company_name("\n".join(head))
+        if company_name == "Unknown Company" and "\n".join(head).strip().count("\n") < 20:
+            head = await extraction_engine.extract_head(source, pages=HEAD_MAX_PAGES)
+            company_name = resolve_company_name("\n".join(head))
+    except Exception as e:
+        raise _extraction_error(e)
+    return company_name
+
+
+def _add_analysis_stages(
+    graph: StageGraph,
+    db,
+    source: PdfSource,
+    settings,
+    progress: ProgressCallback,
+    on_section: Optional[SectionCallback] = None,
+    mode: str = "standard",
+    pages: Optional[List[str]] = None
+):
+    """
+    Extraction, company name, news and AI stages for an uploaded PDF:
+    
+        extract ───────────────┐
+        company ── news ───────┴── ai
+    
+    Pages already extracted by /preview (or read from the text store) replace the
+    extract stage's work.
+    """
+    reused = pages is not None
+    
+    async def extract(results):
+        if not reused:
+            extracted = await extract_stage(source)
+        elif not any(text.strip() for text in pages):
+            raise PipelineError(400, "PDF appears to be empty or contains no extractable text")
+        else:
+            extracted = pages
+        await progress("extracted", characters=sum(len(text) + 1 for text in extracted), reused=reused)
+        return extracted
+    
+    async def company(results):
+        if reused:
+            return resolve_company_name("\n".join(pages))
+        return await company_stage(source)
+    
+    async def news(results):
+        news_data = await news_stage(results["company"], settings, mode)
+        await progress("news", company_name=results["company"])
+        return news_data
+    
+    async def no_news(results):
+        await progress("news", skipped=True)
+        return ""
+    
+    async def ai(results):
+        analysis = await ai_stage(db, results["extract"], results["news"], settings, on_section, mode)
+        await progress("ai", trust_score=analysis.scores.final_trust_score)
+        return analysis
+    
+    graph.add("extract", extract)
+    if mode == "fast":
+        graph.add("news", no_news)
+    else:
+        graph.add("company", company)
+        graph.add("news", news, after=("company",))
+    graph.add("ai", ai, after=("extract", "news"), timeout=settings.stage_ai_timeout_seconds)
@@ -0,0 +1,133 @@
+import os
+import secrets
+import tempfile
+from datetime import datetime, timedelta
+from typing import List, Optional
+
+from bson import ObjectId
+
+from ..config import get_settings
+from .file_service import PREVIEW_COLLECTION, store_pdf, release_pdf
+from .upload_service import SpooledUpload, spool_directory
+
+# Page texts above this size are not persisted (Mongo documents are capped at 16 MB);
+# /analyze then re-extracts from the stored PDF instead
+MAX_STORED_TEXT_BYTES = 12 * 1024 * 1024
+
+
+async def save_preview(db, fs, upload: SpooledUpload, page_texts: List[str]) -> dict:
+    """
+    Persist a previewed upload (GridFS blob plus extracted page texts) under a
+    short-lived token so /analyze can reuse it. Returns the token and its expiry.
+    """
+    settings = get_settings()
+    file_id = await store_pdf(db, fs, upload.filename, upload.path, upload.content_hash)
+
+    now = datetime.utcnow()
+    token = secrets.token_urlsafe(24)
+    stores_pages = sum(len(text.encode("utf-8")) for text in page_texts) <= MAX_STORED_TEXT_BYTES
+    artifact = {
+        "_id": token,
+        "filename": upload.filename,
+        "file_id": str(file_id),
+        "content_hash": upload.content_hash,
+        "size": upload.size,
+        "pages": page_texts if stores_pages else None,
+        "created_at": now,
+        "last_used_at": now,
+        "expires_at": now + timedelta(seconds=settings.preview_ttl_seconds),
+    }
+    try:
+        await db[PREVIEW_COLLECTION].insert_one(artifact)
+    except BaseException:
+        await release_pdf(db, fs, str(file_id))
+        raise
+    await purge_previews(db, fs)
+    return {"token": token, "expires_at": artifact["expires_at"]}
+
+
+def _live(now: datetime) -> dict:
+    # Claimed previews belong to a queued analysis and outlive their expiry until it runs
+    return {"$or": [{"expires_at": {"$gt": now}}, {"claimed_at": {"$ne": None}}]}
+
+
+def _evictable(now: datetime) -> dict:
+    # Unclaimed, or claimed by a job that can no longer be running
+    stale_claim = now - timedelta(seconds=get_settings().job_ttl_seconds)
+    return {"$or": [{"claimed_at": None}, {"claimed_at": {"$lte": stale_claim}}]}
+
+
+async def get_preview(db, token: str) -> Optional[dict]:
+    """
+    The stored artifact for `token`, or None if it never existed or has expired.
+    Each lookup marks the artifact as recently used so capacity eviction skips it.
+    """
+    now = datetime.utcnow()
+    return await db[PREVIEW_COLLECTION].find_one_and_update(
+        {"_id": token, **_live(now)},
+        {"$set": {"last_used_at": now}}
+    )
+
+
+async def claim_preview(db, token: str) -> Optional[dict]:
+    """
+    Like get_preview, and keep the artifact from expiry and eviction until the
+    analysis it was queued for discards or unclaims it.
+    """
+    now = datetime.utcnow()
+    return await db[PREVIEW_COLLECTION].find_one_and_update(
+        {"_id": token, **_live(now)},
+        {"$set": {"last_used_at": now, "claimed_at": now}}
+    )
+
+
+async def unclaim_preview(db, token: str):
+    """A failed analysis hands its preview back to normal expiry, so the token can be retried."""
+    await db[PREVIEW_COLLECTION].update_one({"_id": token}, {"$set": {"claimed_at": None}})
+
+
+async def _remove(db, fs, artifacts: List[dict]):
+    if not artifacts:
+        return
+    # Each artifact deleted here gives back its own reference; one deleted concurrently elsewhere already did
+    for artifact in artifacts:
+        deleted = await db[PREVIEW_COLLECTION].delete_one({"_id": artifact["_id"]})
+        if deleted.deleted_count:
+            await release_pdf(db, fs, artifact["file_id"])
+
+
+async def discard_preview(db, fs, token: str):
+    """Drop a preview once it has been analyzed."""
+    artifact = await db[PREVIEW_COLLECTION].find_one({"_id": token}, {"file_id": 1})
+    if artifact:
+        await _remove(db, fs, [artifact])
+
+
+async def purge_previews(db, fs) -> int:
+    """
+    Evict expired previews, then the least recently used beyond PREVIEW_MAX_ARTIFACTS,
+    releasing their stored PDFs. Returns how many were removed.
+    """
+    settings = get_settings()
+    now = datetime.utcnow()
+    expired = await db[PREVIEW_COLLECTION].find(
+        {"expires_at": {"$lte": now}, **_evictable(now)}, {"file_id": 1}
+    ).to_list(length=None)
+    await _remove(db, fs, expired)
+
+    overflow = await db[PREVIEW_COLLECTION].count_documents({}) - settings.preview_max_artifacts
+    evicted = []
+    if overflow > 0:
+        evicted = await db[PREVIEW_COLLECTION].find(_evictable(now), {"file_id": 1}).sort(
+            "last_used_at", 1
+        ).limit(overflow).to_list(length=None)
+        await _remove(db, fs, evicted)
+    return len(expired) + len(evicted)
+
+
+async def restore_to_spool(fs, artifact: dict) -> SpooledUpload:
+    """Download a preview's stored PDF to a spool file, for artifacts saved without page texts."""
+    fd, path = tempfile.mkstemp(suffix=".pdf", dir=spool_directory())
+    with os.fdopen(fd, "wb") as out:
+        await fs.download_to_stream(ObjectId(artifact["file_id"]), out)
+    return SpooledUpload(path, artifact["filename"], artifact["size"], artifact["content_hash"])
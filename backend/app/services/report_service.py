@@ -0,0 +1,96 @@
+from typing import AsyncIterator, List, Optional, Tuple
+
+from .pagination import encode_cursor, keyset_filter
+
+# Only the fields list views need; the full analysis is fetched per report
+REPORT_SUMMARY_PROJECTION = {
+    "filename": 1,
+    "uploaded_at": 1,
+    "user_id": 1,
+    "analysis.company_info.name": 1,
+    "analysis.company_info.industry_type": 1,
+    "analysis.scores.final_trust_score": 1,
+    "analysis.scores.traffic_light": 1,
+}
+
+
+def to_summary(doc: dict) -> dict:
+    analysis = doc.get("analysis") or {}
+    company_info = analysis.get("company_info") or {}
+    scores = analysis.get("scores") or {}
+    return {
+        "id": str(doc["_id"]),
+        "filename": doc["filename"],
+        "uploaded_at": doc["uploaded_at"],
+        "user_id": doc.get("user_id"),
+        "company_name": company_info.get("name"),
+        "industry_type": company_info.get("industry_type"),
+        "final_trust_score": scores.get("final_trust_score"),
+        "traffic_light": scores.get("traffic_light"),
+    }
+
+
+def to_full(doc: dict) -> dict:
+    return {
+        "id": str(doc["_id"]),
+        "filename": doc["filename"],
+        "uploaded_at": doc["uploaded_at"],
+        "user_id": doc.get("user_id"),
+        "analysis": doc.get("analysis"),
+    }
+
+
+def _query(user_id: Optional[str], cursor: Optional[str] = None) -> dict:
+    query = {"user_id": user_id} if user_id else {}
+    query.update(keyset_filter("uploaded_at", True, cursor))
+    return query
+
+
+async def fetch_report_page(
+    db,
+    user_id: Optional[str] = None,
+    cursor: Optional[str] = None,
+    limit: int = 50,
+) -> Tuple[List[dict], Optional[str]]:
+    """
+    One page of report summaries, newest first, in (uploaded_at, _id) keyset order.
+    Returns the summaries and the cursor for the next page (None on the last page).
+    """
+    docs = await db.reports.find(_query(user_id, cursor), REPORT_SUMMARY_PROJECTION).sort(
+        [("uploaded_at", -1), ("_id", -1)]
+    ).limit(limit + 1).to_list(length=None)
+
+    next_cursor = None
+    if len(docs) > limit:
+        docs = docs[:limit]
+        next_cursor = encode_cursor(docs[-1]["uploaded_at"], docs[-1]["_id"])
+    return [to_summary(doc) for doc in docs], next_cursor
+
+
+async def summarize_reports(db, user_id: Optional[str] = None) -> dict:
+    """Report count and average trust score over every matching report, not just one page."""
+    rows = await db.reports.aggregate([
+        {"$match": _query(user_id)},
+        {"$group": {
+            "_id": None,
+            "total_reports": {"$sum": 1},
+            "avg_trust_score": {"$avg": "$analysis.scores.final_trust_score"},
+        }},
+    ]).to_list(length=None)
+    if not rows:
+        return {"total_reports": 0, "avg_trust_score": None}
+    average = rows[0]["avg_trust_score"]
+    return {
+        "total_reports": rows[0]["total_reports"],
+        "avg_trust_score": round(average, 1) if average is not None else None,
+    }
+
+
+async def iter_reports(db, user_id: Optional[str] = None, full: bool = False, batch_size: int = 500) -> AsyncIterator[dict]:
+    """Yield every matching report newest first, without holding the result set in memory."""
+    projection = None if full else REPORT_SUMMARY_PROJECTION
+    convert = to_full if full else to_summary
+    async for doc in db.reports.find(_query(user_id), projection).sort(
+        [("uploaded_at", -1), ("_id", -1)]
+    ).batch_size(batch_size):
+        yield convert(doc)
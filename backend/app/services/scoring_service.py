@@ -0,0 +1,225 @@
+import re
+from collections import Counter
+from typing import List, Optional
+
+from ..models import AnalysisResult
+
+# Hard metrics: numbers with units, as the prompt defines them for the Specificity score
+HARD_METRIC_PATTERN = (
+    r"\d[\d,]*(?:\.\d+)?\s*"
+    r"(?:%|percent\b|tons?\b|tonnes?\b|kg\b|mt\b|tco2e?\b|kwh\b|mwh\b|gwh\b|gj\b|"
+    r"liters?\b|litres?\b|kl\b|m3\b|gallons?\b|million\b|billion\b|crore\b|lakh\b)"
+)
+
+# Marketing language without measurable content
+VAGUE_TERMS = [
+    "eco-friendly", "eco friendly", "environmentally friendly", "green initiatives", "going green",
+    "sustainable practices", "committed to", "working towards", "strive to", "striving to",
+    "aim to", "aspire to", "planet-friendly", "nature-positive", "responsible business",
+    "clean and green", "carbon friendly", "earth-friendly", "low impact", "conscious",
+]
+
+# Targets with a date ("net zero by 2040", "target for 2030")
+DEADLINE_PATTERN = r"\b(?:by|until|before|target(?:ed)? for|in)\s+20[2-9]\d\b"
+
+ASSURANCE_PATTERN = r"\b(?:third[- ]party|independent(?:ly)?|external(?:ly)?|limited|reasonable)\s+(?:assur|verif|audit)\w*"
+
+# Every counted feature is one named alternative, so the whole text is scanned in a single pass
+SIGNAL_RE = re.compile(
+    "|".join([
+        f"(?P<metric>{HARD_METRIC_PATTERN})",
+        f"(?P<deadline>{DEADLINE_PATTERN})",
+        f"(?P<assurance>{ASSURANCE_PATTERN})",
+        "(?P<vague>\\b(?:" + "|".join(re.escape(term) for term in VAGUE_TERMS) + ")\\b)",
+    ]),
+    re.IGNORECASE
+)
+
+# Certification names are acronyms; matched case-sensitively so "gri" inside words does not count
+CERTIFICATIONS = ["ISO 14001", "ISO 50001", "ISO 45001", "ISO 9001", "B-Corp", "SBTi", "LEED", "CDP", "GRI", "FSC", "OHSAS", "TCFD", "BRSR"]
+CERT_RE = re.compile(r"\b(" + "|".join(re.escape(cert) for cert in CERTIFICATIONS) + r")\b")
+
+FOCUS_AREAS = {
+    "Carbon Reduction": ["emission", "emissions", "carbon", "co2", "ghg", "greenhouse", "net zero"],
+    "Renewable Energy": ["renewable", "solar", "wind", "clean energy"],
+    "Water Conservation": ["water", "wastewater", "rainwater"],
+    "Waste Management": ["waste", "recycled", "recycling", "landfill", "circular"],
+}
+FOCUS_RE = re.compile(
+    "|".join(
+        f"(?P<f{index}>\\b(?:" + "|".join(re.escape(term) for term in terms) + ")\\b)"
+        for index, terms in enumerate(FOCUS_AREAS.values())
+    ),
+    re.IGNORECASE
+)
+
+COMMITMENT_RE = re.compile(r"\b(?:target|commit\w*|pledge\w*|goal|aim\w*|net[- ]zero|carbon[- ]neutral)\b", re.IGNORECASE)
+MAX_COMMITMENTS = 10
+MAX_EXAMPLES = 5
+
+# Consistency needs external news; without the model it is reported as neutral
+NEUTRAL_CONSISTENCY = 50
+
+
+def compute_signals(pages: List[str]) -> dict:
+    """
+    Count the deterministic inputs of the Specificity and Verification scores:
+    hard metrics, vague language, dated targets, assurance statements and certifications.
+    """
+    text = "\n".join(pages)
+    counts = Counter()
+    vague_terms = Counter()
+    metric_examples = []
+    for match in SIGNAL_RE.finditer(text):
+        kind = match.lastgroup
+        counts[kind] += 1
+        if kind == "vague":
+            vague_terms[match.group().lower()] += 1
+        elif kind == "metric" and len(metric_examples) < MAX_EXAMPLES:
+            metric_examples.append(match.group().strip())
+
+    certifications = sorted(set(CERT_RE.findall(text)), key=CERTIFICATIONS.index)
+    focus_counts = Counter(match.lastgroup for match in FOCUS_RE.finditer(text))
+    focus_names = list(FOCUS_AREAS)
+    primary_focus = focus_names[int(focus_counts.most_common(1)[0][0][1:])] if focus_counts else "Not identified"
+
+    return {
+        "hard_metrics_found": counts["metric"],
+        "vague_language_count": counts["vague"],
+        "dated_targets": counts["deadline"],
+        "assurance_mentions": counts["assurance"],
+        "certifications": certifications,
+        "word_count": len(text.split()),
+        "primary_focus": primary_focus,
+        "top_vague_terms": [term for term, _ in vague_terms.most_common(MAX_EXAMPLES)],
+        "metric_examples": metric_examples,
+    }
+
+
+def provisional_scores(signals: dict) -> dict:
+    """
+    Rule-based Specificity (S) and Verification (V) on the prompt's 0-100 bands.
+
+    S blends the share of specific versus vague claims with metric density
+    (5 metrics per 1,000 words scores full marks), plus a bonus for dated targets.
+    V follows the certification count, with a bonus for external assurance.
+    """
+    hard = signals["hard_metrics_found"]
+    vague = signals["vague_language_count"]
+    if hard + vague == 0:
+        specificity = 15
+    else:
+        share = hard / (hard + vague)
+        density = min(1.0, hard * 1000 / max(signals["word_count"], 1) / 5)
+        specificity = 100 * (0.6 * share + 0.4 * density) + min(10, 2 * signals["dated_targets"])
+
+    certs = len(signals["certifications"])
+    if certs >= 3:
+        verification = 80 + 5 * (certs - 3)
+    elif certs:
+        verification = 60 + 10 * (certs - 1)
+    else:
+        verification = 35 if signals["assurance_mentions"] else 20
+    if certs and signals["assurance_mentions"]:
+        verification += 5
+
+    return {
+        "specificity": int(round(min(100, max(0, specificity)))),
+        "verification": int(round(min(100, verification))),
+    }
+
+
+def finalize_scores(scores: dict) -> dict:
+    """Recalculate the trust score and traffic light from S, C and V."""
+    s = scores.get("specificity", 0)
+    c = scores.get("consistency", 0)
+    v = scores.get("verification", 0)
+
+    # T_score = (0.40 × S) + (0.35 × C) + (0.25 × V)
+    calculated_score = round((0.40 * s) + (0.35 * c) + (0.25 * v), 1)
+    scores["final_trust_score"] = calculated_score
+
+    # Traffic light based on score thresholds
+    if calculated_score < 40:
+        scores["traffic_light"] = "RED"
+    elif calculated_score < 75:
+        scores["traffic_light"] = "YELLOW"
+    else:
+        scores["traffic_light"] = "GREEN"
+
+    return scores
+
+
+def prescore(pages: List[str]) -> dict:
+    """Signals plus provisional S, V and trust score, for previews and the prompt."""
+    signals = compute_signals(pages)
+    scores = provisional_scores(signals)
+    scores["consistency"] = NEUTRAL_CONSISTENCY
+    return {"signals": signals, "scores": finalize_scores(scores)}
+
+
+def _commitments(pages: List[str]) -> List[str]:
+    found = []
+    for page in pages:
+        for line in page.split("\n"):
+            line = line.strip()
+            if 20 <= len(line) <= 300 and COMMITMENT_RE.search(line) and line not in found:
+                found.append(line)
+                if len(found) >= MAX_COMMITMENTS:
+                    return found
+    return found
+
+
+def fast_analysis(pages: List[str], company_name: str, prescored: Optional[dict] = None) -> AnalysisResult:
+    """
+    Provisional analysis without news search or model calls, returned in milliseconds.
+    Consistency is neutral and no contradictions are reported, as both need external evidence.
+    """
+    result = prescored or prescore(pages)
+    signals, scores = result["signals"], result["scores"]
+    certs = ", ".join(signals["certifications"]) or "none"
+    return AnalysisResult(
+        company_info={
+            "name": company_name,
+            "industry_type": "Unclassified",
+            "primary_focus": signals["primary_focus"],
+        },
+        scores=scores,
+        audit_details={
+            "major_commitments": _commitments(pages),
+            "detected_contradictions": [],
+            "vague_language_count": signals["vague_language_count"],
+            "hard_metrics_found": signals["hard_metrics_found"],
+        },
+        co2_analysis=None,
+        admin_brief=(
+            f"Provisional rule-based screening: {signals['hard_metrics_found']} hard metrics, "
+            f"{signals['vague_language_count']} vague claims, certifications: {certs}. "
+            "Claims have not been checked against external news; run a standard analysis before acting."
+        ),
+        client_feedback=(
+            "Replace general statements with measured figures, units and dated targets, "
+            "and obtain third-party certification or assurance for the key claims."
+            if scores["specificity"] < 60 or scores["verification"] < 60 else
+            "The report contains measurable, verifiable disclosures; keep reporting against dated targets."
+        ),
+    )
+
+
+def format_signals(result: dict) -> str:
+    """Render prescore() output as the precomputed-signals block of the analysis prompt."""
+    signals, scores = result["signals"], result["scores"]
+    lines = [
+        f"hard_metrics_found: {signals['hard_metrics_found']}",
+        f"vague_language_count: {signals['vague_language_count']}",
+        f"dated_targets: {signals['dated_targets']}",
+        f"external_assurance_mentions: {signals['assurance_mentions']}",
+        f"certifications: {', '.join(signals['certifications']) or 'none found'}",
+        f"provisional_specificity: {scores['specificity']}",
+        f"provisional_verification: {scores['verification']}",
+    ]
+    if signals["metric_examples"]:
+        lines.append(f"metric_examples: {'; '.join(signals['metric_examples'])}")
+    if signals["top_vague_terms"]:
+        lines.append(f"most_frequent_vague_terms: {', '.join(signals['top_vague_terms'])}")
+    return "\n".join(lines)
@@ -0,0 +1,115 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional
+
+StageFn = Callable[[Dict[str, Any]], Awaitable[Any]]
+
+
+class StageTimeoutError(asyncio.TimeoutError):
+    """A stage did not finish within its time budget."""
+
+    def __init__(self, stage: str, seconds: float):
+        super().__init__(f"Stage '{stage}' exceeded {seconds:g} seconds")
+        self.stage = stage
+        self.seconds = seconds
+
+
+class StageGraph:
+    """
+    A small dependency graph of async stages.
+
+    Each stage starts as soon as every stage it runs `after` has succeeded and is
+    called with the results so far. A failed stage's dependents never start, and a
+    running stage is cancelled once every stage consuming its result has been dropped.
+    Stages nothing depends on still run to completion (so e.g. a GridFS write is never
+    cut off half-way), then the first failure is raised. Cancelling `run` cancels
+    everything still in flight.
+    """
+
+    def __init__(self):
+        self._stages: Dict[str, dict] = {}
+
+    def add(self, name: str, run: StageFn, after: Iterable[str] = (), timeout: Optional[float] = None):
+        """Add a stage. Dependencies must be added first, which keeps the graph acyclic."""
+        after = tuple(after)
+        unknown = [dep for dep in after if dep not in self._stages]
+        if unknown:
+            raise ValueError(f"Stage '{name}' depends on unknown stages: {', '.join(unknown)}")
+        if name in self._stages:
+            raise ValueError(f"Duplicate stage '{name}'")
+        self._stages[name] = {"run": run, "after": after, "timeout": timeout}
+
+    async def _run_stage(self, name: str, results: Dict[str, Any]):
+        stage = self._stages[name]
+        if stage["timeout"] is None:
+            return await stage["run"](results)
+        try:
+            return await asyncio.wait_for(stage["run"](results), stage["timeout"])
+        except asyncio.TimeoutError as e:
+            if isinstance(e, StageTimeoutError):
+                raise
+            raise StageTimeoutError(name, stage["timeout"]) from None
+
+    def _dependents(self) -> Dict[str, List[str]]:
+        dependents = {name: [] for name in self._stages}
+        for name, stage in self._stages.items():
+            for dep in stage["after"]:
+                dependents[dep].append(name)
+        return dependents
+
+    async def run(self) -> Dict[str, Any]:
+        """Run every stage; returns results by stage name or raises the first failure."""
+        dependents = self._dependents()
+        results: Dict[str, Any] = {}
+        waiting = dict(self._stages)
+        running: Dict[asyncio.Task, str] = {}
+        dropped = set()
+        error: Optional[BaseException] = None
+
+        try:
+            while True:
+                # Drop dependents of failed stages, transitively, before starting anything
+                changed = True
+                while changed:
+                    changed = False
+                    for name, stage in list(waiting.items()):
+                        if any(dep in dropped for dep in stage["after"]):
+                            dropped.add(name)
+                            del waiting[name]
+                            changed = True
+
+                # A running stage whose every consumer has been dropped is no longer needed
+                for task, name in running.items():
+                    if dependents[name] and all(dep in dropped for dep in dependents[name]):
+                        dropped.add(name)
+                        task.cancel()
+
+                for name, stage in list(waiting.items()):
+                    if all(dep in results for dep in stage["after"]):
+                        running[asyncio.create_task(self._run_stage(name, results))] = name
+                        del waiting[name]
+                if not running:
+                    break
+
+                done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    name = running.pop(task)
+                    if task.cancelled():
+                        if name not in dropped:
+                            dropped.add(name)
+                            error = error or RuntimeError(f"Stage '{name}' was cancelled")
+                        continue
+                    if task.exception() is None:
+                        results[name] = task.result()
+                        continue
+                    dropped.add(name)
+                    if error is None:
+                        error = task.exception()
+        finally:
+            for task in running:
+                task.cancel()
+            if running:
+                await asyncio.gather(*running, return_exceptions=True)
+
+        if error is not None:
+            raise error
+        return results
@@ -0,0 +1,347 @@
+import time
+from typing import Dict, List, Optional, Tuple
+
+from bson import ObjectId
+from pymongo import ReplaceOne
+
+from ..config import get_settings
+from .credit_service import BALANCES_COLLECTION, signed_amount
+
+STATS_COLLECTION = "stats"
+PLATFORM_ID = "platform"
+
+# Short-lived response cache: endpoint name -> (expires_at, payload)
+_response_cache = {}
+
+
+def invalidate_stats_cache():
+    _response_cache.clear()
+
+
+def _score_increments(report_doc: dict, sign: int) -> dict:
+    """Rollup counters a single report contributes to."""
+    analysis = report_doc.get("analysis") or {}
+    scores = analysis.get("scores")
+    if not scores:
+        return {"total_reports": sign}
+
+    inc = {"total_reports": sign}
+    light = (scores.get("traffic_light") or "").upper()
+    if light in ("RED", "YELLOW", "GREEN"):
+        inc[f"traffic_light.{light.lower()}"] = sign
+
+    final_score = scores.get("final_trust_score")
+    if final_score:
+        inc["score_count"] = sign
+        inc["score_total"] = sign * final_score
+        inc["specificity_total"] = sign * scores.get("specificity", 0)
+        inc["consistency_total"] = sign * scores.get("consistency", 0)
+        inc["verification_total"] = sign * scores.get("verification", 0)
+    return inc
+
+
+async def _industry_for_user(db, user_id: Optional[str]) -> Optional[str]:
+    if not user_id:
+        return None
+    try:
+        user = await db.users.find_one({"_id": ObjectId(user_id)}, {"industry_type": 1})
+    except Exception:
+        return None
+    return user.get("industry_type", "Other") if user else None
+
+
+async def record_report(db, report_doc: dict, sign: int = 1):
+    """Apply an inserted (sign=1) or deleted (sign=-1) report to the rollup."""
+    inc = _score_increments(report_doc, sign)
+    await db[STATS_COLLECTION].update_one({"_id": PLATFORM_ID}, {"$inc": inc}, upsert=True)
+
+    final_score = ((report_doc.get("analysis") or {}).get("scores") or {}).get("final_trust_score")
+    industry = await _industry_for_user(db, report_doc.get("user_id"))
+    if industry is not None and final_score:
+        await db[STATS_COLLECTION].update_one(
+            {"_id": f"industry:{industry}"},
+            {
+                "$set": {"kind": "industry", "name": industry},
+                "$inc": {"score_total": sign * final_score, "score_count": sign}
+            },
+            upsert=True
+        )
+    invalidate_stats_cache()
+
+
+async def record_reports(db, report_docs: List[dict]):
+    """Apply many inserted reports with one platform update and one update per industry."""
+    if not report_docs:
+        return
+    platform_inc = {}
+    for doc in report_docs:
+        for field, value in _score_increments(doc, 1).items():
+            platform_inc[field] = platform_inc.get(field, 0) + value
+    await db[STATS_COLLECTION].update_one({"_id": PLATFORM_ID}, {"$inc": platform_inc}, upsert=True)
+
+    user_ids = set()
+    for doc in report_docs:
+        if doc.get("user_id") and ObjectId.is_valid(doc["user_id"]):
+            user_ids.add(ObjectId(doc["user_id"]))
+    industries = {}
+    if user_ids:
+        async for user in db.users.find({"_id": {"$in": list(user_ids)}}, {"industry_type": 1}):
+            industries[str(user["_id"])] = user.get("industry_type", "Other")
+
+    industry_inc = {}
+    for doc in report_docs:
+        industry = industries.get(doc.get("user_id"))
+        final_score = ((doc.get("analysis") or {}).get("scores") or {}).get("final_trust_score")
+        if industry is None or not final_score:
+            continue
+        entry = industry_inc.setdefault(industry, {"score_total": 0, "score_count": 0})
+        entry["score_total"] += final_score
+        entry["score_count"] += 1
+    for industry, inc in industry_inc.items():
+        await db[STATS_COLLECTION].update_one(
+            {"_id": f"industry:{industry}"},
+            {"$set": {"kind": "industry", "name": industry}, "$inc": inc},
+            upsert=True
+        )
+    invalidate_stats_cache()
+
+
+async def record_company(db, user_doc: dict, sign: int = 1):
+    """Apply a registered (or removed) company to the rollup."""
+    industry = user_doc.get("industry_type", "Other")
+    await db[STATS_COLLECTION].update_one(
+        {"_id": PLATFORM_ID}, {"$inc": {"total_companies": sign}}, upsert=True
+    )
+    await db[STATS_COLLECTION].update_one(
+        {"_id": f"industry:{industry}"},
+        {"$set": {"kind": "industry", "name": industry}, "$inc": {"companies": sign}},
+        upsert=True
+    )
+    invalidate_stats_cache()
+
+
+async def record_companies(db, industry_counts: Dict[str, int]):
+    """Apply many registered companies (negative counts for ones moved away) with one update per industry."""
+    total = sum(industry_counts.values())
+    if total:
+        await db[STATS_COLLECTION].update_one(
+            {"_id": PLATFORM_ID}, {"$inc": {"total_companies": total}}, upsert=True
+        )
+    for industry, count in industry_counts.items():
+        if not count:
+            continue
+        await db[STATS_COLLECTION].update_one(
+            {"_id": f"industry:{industry}"},
+            {"$set": {"kind": "industry", "name": industry}, "$inc": {"companies": count}},
+            upsert=True
+        )
+    if any(industry_counts.values()):
+        invalidate_stats_cache()
+
+
+async def move_company_scores(db, moves: Dict[str, Tuple[str, str]]):
+    """
+    Move the report scores of companies whose industry changed (user id -> (old, new))
+    between industry rollups, as rebuild_stats would attribute them.
+    """
+    if not moves:
+        return
+    rows = await db.reports.aggregate([
+        {"$match": {"user_id": {"$in": list(moves)}, "analysis.scores.final_trust_score": {"$gt": 0}}},
+        {"$group": {
+            "_id": "$user_id",
+            "score_total": {"$sum": "$analysis.scores.final_trust_score"},
+            "score_count": {"$sum": 1}
+        }}
+    ]).to_list(length=None)
+
+    industry_inc = {}
+    for row in rows:
+        old, new = moves[row["_id"]]
+        for industry, sign in ((old, -1), (new, 1)):
+            entry = industry_inc.setdefault(industry, {"score_total": 0, "score_count": 0})
+            entry["score_total"] += sign * row["score_total"]
+            entry["score_count"] += sign * row["score_count"]
+    for industry, inc in industry_inc.items():
+        await db[STATS_COLLECTION].update_one(
+            {"_id": f"industry:{industry}"},
+            {"$set": {"kind": "industry", "name": industry}, "$inc": inc},
+            upsert=True
+        )
+    if industry_inc:
+        invalidate_stats_cache()
+
+
+async def record_credit(db, credit_doc: dict, sign: int = 1):
+    """Apply an inserted (sign=1) or revoked (sign=-1) credit transaction to the rollup."""
+    amount = sign * signed_amount(credit_doc)
+    await db[STATS_COLLECTION].update_one(
+        {"_id": PLATFORM_ID}, {"$inc": {"credits_net": amount}}, upsert=True
+    )
+    await db[STATS_COLLECTION].update_one(
+        {"_id": f"credit:{credit_doc['credit_type']}"},
+        {"$set": {"kind": "credit", "name": credit_doc["credit_type"]}, "$inc": {"total": amount}},
+        upsert=True
+    )
+    invalidate_stats_cache()
+
+
+async def rebuild_stats(db):
+    """Recompute the whole rollup from the source collections with aggregation pipelines."""
+    report_rows = await db.reports.aggregate([
+        {"$project": {"scores": "$analysis.scores"}},
+        {"$group": {
+            "_id": None,
+            "total_reports": {"$sum": 1},
+            "red": {"$sum": {"$cond": [{"$eq": [{"$toUpper": {"$ifNull": ["$scores.traffic_light", ""]}}, "RED"]}, 1, 0]}},
+            "yellow": {"$sum": {"$cond": [{"$eq": [{"$toUpper": {"$ifNull": ["$scores.traffic_light", ""]}}, "YELLOW"]}, 1, 0]}},
+            "green": {"$sum": {"$cond": [{"$eq": [{"$toUpper": {"$ifNull": ["$scores.traffic_light", ""]}}, "GREEN"]}, 1, 0]}},
+            "score_count": {"$sum": {"$cond": [{"$gt": ["$scores.final_trust_score", 0]}, 1, 0]}},
+            "score_total": {"$sum": {"$cond": [{"$gt": ["$scores.final_trust_score", 0]}, "$scores.final_trust_score", 0]}},
+            "specificity_total": {"$sum": {"$cond": [{"$gt": ["$scores.final_trust_score", 0]}, {"$ifNull": ["$scores.specificity", 0]}, 0]}},
+            "consistency_total": {"$sum": {"$cond": [{"$gt": ["$scores.final_trust_score", 0]}, {"$ifNull": ["$scores.consistency", 0]}, 0]}},
+            "verification_total": {"$sum": {"$cond": [{"$gt": ["$scores.final_trust_score", 0]}, {"$ifNull": ["$scores.verification", 0]}, 0]}},
+        }}
+    ]).to_list(length=1)
+
+    industry_scores = await db.reports.aggregate([
+        {"$match": {"analysis.scores.final_trust_score": {"$gt": 0}}},
+        {"$project": {
+            "score": "$analysis.scores.final_trust_score",
+            "uid": {"$convert": {"input": "$user_id", "to": "objectId", "onError": None, "onNull": None}}
+        }},
+        {"$lookup": {"from": "users", "localField": "uid", "foreignField": "_id", "as": "user"}},
+        {"$unwind": "$user"},
+        {"$group": {
+            "_id": {"$ifNull": ["$user.industry_type", "Other"]},
+            "score_total": {"$sum": "$score"},
+            "score_count": {"$sum": 1}
+        }}
+    ]).to_list(length=None)
+
+    industry_companies = await db.users.aggregate([
+        {"$group": {"_id": {"$ifNull": ["$industry_type", "Other"]}, "companies": {"$sum": 1}}}
+    ]).to_list(length=None)
+
+    # Summed from the per-user balances rather than the full ledger
+    credit_totals = await db[BALANCES_COLLECTION].aggregate([
+        {"$group": {"_id": "$credit_type", "total": {"$sum": "$balance"}}}
+    ]).to_list(length=None)
+
+    reports = report_rows[0] if report_rows else {}
+    platform = {
+        "_id": PLATFORM_ID,
+        "total_companies": sum(row["companies"] for row in industry_companies),
+        "total_reports": reports.get("total_reports", 0),
+        "traffic_light": {
+            "red": reports.get("red", 0),
+            "yellow": reports.get("yellow", 0),
+            "green": reports.get("green", 0),
+        },
+        "score_count": reports.get("score_count", 0),
+        "score_total": reports.get("score_total", 0),
+        "specificity_total": reports.get("specificity_total", 0),
+        "consistency_total": reports.get("consistency_total", 0),
+        "verification_total": reports.get("verification_total", 0),
+        "credits_net": sum(row["total"] for row in credit_totals),
+    }
+
+    industries = {}
+    for row in industry_companies:
+        industries.setdefault(row["_id"], {"companies": 0, "score_total": 0, "score_count": 0})["companies"] = row["companies"]
+    for row in industry_scores:
+        entry = industries.setdefault(row["_id"], {"companies": 0, "score_total": 0, "score_count": 0})
+        entry["score_total"] = row["score_total"]
+        entry["score_count"] = row["score_count"]
+
+    docs = [platform]
+    docs += [{"_id": f"industry:{name}", "kind": "industry", "name": name, **values} for name, values in industries.items()]
+    docs += [{"_id": f"credit:{row['_id']}", "kind": "credit", "name": row["_id"], "total": row["total"]} for row in credit_totals]
+
+    # Upsert in place rather than drop-and-insert so readers never see an empty rollup
+    await db[STATS_COLLECTION].bulk_write([ReplaceOne({"_id": doc["_id"]}, doc, upsert=True) for doc in docs])
+    await db[STATS_COLLECTION].delete_many({"_id": {"$nin": [doc["_id"] for doc in docs]}})
+    invalidate_stats_cache()
+
+
+async def ensure_stats(db):
+    """Build the rollup on first start so existing data is counted."""
+    if not await db[STATS_COLLECTION].find_one({"_id": PLATFORM_ID}, {"_id": 1}):
+        await rebuild_stats(db)
+
+
+async def _load_rollup(db):
+    platform = {}
+    industries = []
+    credits = []
+    async for doc in db[STATS_COLLECTION].find():
+        if doc["_id"] == PLATFORM_ID:
+            platform = doc
+        elif doc.get("kind") == "industry":
+            industries.append(doc)
+        elif doc.get("kind") == "credit":
+            credits.append(doc)
+    return platform, industries, credits
+
+
+def _average(total: float, count: int):
+    return round(total / count, 1) if count > 0 else None
+
+
+async def _cached(name: str, build):
+    settings = get_settings()
+    entry = _response_cache.get(name)
+    if entry and entry[0] > time.monotonic():
+        return entry[1]
+    payload = await build()
+    _response_cache[name] = (time.monotonic() + settings.stats_cache_ttl_seconds, payload)
+    return payload
+
+
+async def get_admin_stats(db) -> dict:
+    """Dashboard statistics for admins, served from the rollup."""
+    async def build():
+        platform, industries, credits = await _load_rollup(db)
+        lights = platform.get("traffic_light", {})
+        return {
+            "total_companies": platform.get("total_companies", 0),
+            "total_reports": platform.get("total_reports", 0),
+            "avg_trust_score": _average(platform.get("score_total", 0), platform.get("score_count", 0)),
+            "traffic_light_distribution": {
+                "red": lights.get("red", 0),
+                "yellow": lights.get("yellow", 0),
+                "green": lights.get("green", 0)
+            },
+            "credit_totals": {doc["name"]: doc.get("total", 0) for doc in credits},
+            "industry_distribution": {
+                doc["name"]: doc["companies"] for doc in industries if doc.get("companies", 0) > 0
+            }
+        }
+    return await _cached("admin", build)
+
+
+async def get_public_stats(db) -> dict:
+    """Public platform statistics, served from the rollup."""
+    async def build():
+        platform, industries, _ = await _load_rollup(db)
+        lights = platform.get("traffic_light", {})
+        score_count = platform.get("score_count", 0)
+        return {
+            "total_companies": platform.get("total_companies", 0),
+            "total_reports": platform.get("total_reports", 0),
+            "platform_avg_trust_score": _average(platform.get("score_total", 0), score_count),
+            "avg_specificity": _average(platform.get("specificity_total", 0), score_count),
+            "avg_consistency": _average(platform.get("consistency_total", 0), score_count),
+            "avg_verification": _average(platform.get("verification_total", 0), score_count),
+            "risk_distribution": {
+                "green": lights.get("green", 0),
+                "yellow": lights.get("yellow", 0),
+                "red": lights.get("red", 0)
+            },
+            "industry_averages": {
+                doc["name"]: _average(doc.get("score_total", 0), doc.get("score_count", 0))
+                for doc in industries if doc.get("score_count", 0) > 0
+            },
+            "total_credits_distributed": round(platform.get("credits_net", 0), 1)
+        }
+    return await _cached("public", build)
@@ -0,0 +1,93 @@
+import json
+from typing import Any, List, Tuple
+
+
+class IncrementalObjectParser:
+    """
+    Incrementally parses a streamed JSON object and reports each top-level
+    member as soon as its value is complete.
+
+    Text before the opening brace (e.g. a ``` fence) is ignored.
+    """
+
+    def __init__(self):
+        self.buffer = ""
+        self.pos = 0
+        self.depth = 0
+        self.in_string = False
+        self.escape = False
+        self.state = "start"  # start | key | colon | value | in_value | after_value | done
+        self.key = None
+        self.key_start = 0
+        self.value_start = 0
+        self.value_is_container = False
+
+    def feed(self, chunk: str) -> List[Tuple[str, Any]]:
+        """Consume more text; return the (key, value) members completed by it."""
+        self.buffer += chunk
+        completed = []
+
+        while self.pos < len(self.buffer) and self.state != "done":
+            ch = self.buffer[self.pos]
+
+            if self.in_string:
+                if self.escape:
+                    self.escape = False
+                elif ch == "\\":
+                    self.escape = True
+                elif ch == '"':
+                    self.in_string = False
+                    if self.depth == 1 and self.state == "key":
+                        self.key = json.loads(self.buffer[self.key_start:self.pos + 1])
+                        self.state = "colon"
+                self.pos += 1
+                continue
+
+            if ch == '"':
+                self.in_string = True
+                if self.depth == 1 and self.state == "key":
+                    self.key_start = self.pos
+                elif self.depth == 1 and self.state == "value":
+                    self._start_value(container=False)
+            elif ch in "{[":
+                if self.depth == 0:
+                    self.state = "key"
+                elif self.depth == 1 and self.state == "value":
+                    self._start_value(container=True)
+                self.depth += 1
+            elif ch in "}]":
+                self.depth -= 1
+                if self.depth == 1 and self.state == "in_value" and self.value_is_container:
+                    completed.append(self._finish_value(self.pos + 1))
+                    self.state = "after_value"
+                elif self.depth == 0:
+                    if self.state == "in_value":
+                        completed.append(self._finish_value(self.pos))
+                    self.state = "done"
+            elif self.depth == 1:
+                if ch == ":" and self.state == "colon":
+                    self.state = "value"
+                elif ch == ",":
+                    if self.state == "in_value":
+                        completed.append(self._finish_value(self.pos))
+                    self.state = "key"
+                elif not ch.isspace() and self.state == "value":
+                    # Bare scalar: number, true, false or null
+                    self._start_value(container=False)
+
+            self.pos += 1
+
+        return completed
+
+    def _start_value(self, container: bool):
+        self.value_start = self.pos
+        self.value_is_container = container
+        self.state = "in_value"
+
+    def _finish_value(self, end: int) -> Tuple[str, Any]:
+        raw = self.buffer[self.value_start:end].strip()
+        return self.key, json.loads(raw)
+
+    @property
+    def text(self) -> str:
+        return self.buffer
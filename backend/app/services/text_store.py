@@ -0,0 +1,240 @@
+import asyncio
+import os
+import tempfile
+import zlib
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from bson import Binary
+
+from ..config import get_settings
+from .extraction_service import extraction_engine
+from .metrics_service import CACHE_LOOKUPS, span
+from .upload_service import discard_spooled, spool_directory
+
+try:
+    import zstandard
+except ImportError:  # optional: better ratio and faster decompression; zlib is always available
+    zstandard = None
+
+TEXT_COLLECTION = "page_texts"
+
+# Bump when extraction or the stored layout changes, so older texts are re-extracted
+TEXT_FORMAT_VERSION = 1
+
+# Pages compressed together; reading one page decompresses only its frame
+PAGES_PER_FRAME = 16
+ZLIB_LEVEL = 6
+ZSTD_LEVEL = 10
+
+# MongoDB caps documents at 16 MB; larger texts are simply not stored
+MAX_COMPRESSED_BYTES = 15 * 1024 * 1024
+
+
+def resolve_codec(name: Optional[str] = None) -> str:
+    """The configured codec, "auto" meaning zstd when the zstandard package is installed."""
+    name = (name or get_settings().text_store_codec).lower()
+    if name in ("auto", "zstd"):
+        return "zstd" if zstandard is not None else "zlib"
+    return "zlib"
+
+
+def _compress(codec: str, data: bytes) -> bytes:
+    if codec == "zstd":
+        return zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(data)
+    return zlib.compress(data, ZLIB_LEVEL)
+
+
+def _decompress(codec: str, data: bytes) -> bytes:
+    if codec == "zstd":
+        return zstandard.ZstdDecompressor().decompress(data)
+    return zlib.decompress(data)
+
+
+def encode_pages(pages: List[str], codec: str) -> dict:
+    """
+    Compress page texts into frames of PAGES_PER_FRAME pages, concatenated in `data`.
+
+    `page_offsets[i]` is where page i starts in the uncompressed UTF-8 text and
+    `frame_offsets[f]` where frame f starts in `data`; both end with the total length.
+    """
+    encoded = [page.encode("utf-8") for page in pages]
+    page_offsets = [0]
+    for page in encoded:
+        page_offsets.append(page_offsets[-1] + len(page))
+
+    frames = []
+    frame_offsets = [0]
+    for start in range(0, len(encoded), PAGES_PER_FRAME):
+        frame = _compress(codec, b"".join(encoded[start:start + PAGES_PER_FRAME]))
+        frames.append(frame)
+        frame_offsets.append(frame_offsets[-1] + len(frame))
+
+    return {
+        "version": TEXT_FORMAT_VERSION,
+        "codec": codec,
+        "page_count": len(pages),
+        "pages_per_frame": PAGES_PER_FRAME,
+        "page_offsets": page_offsets,
+        "frame_offsets": frame_offsets,
+        "raw_bytes": page_offsets[-1],
+        "compressed_bytes": frame_offsets[-1],
+        "data": b"".join(frames),
+    }
+
+
+class StoredText:
+    """Page texts of one PDF, decompressed a frame at a time on first access."""
+
+    def __init__(self, doc: dict):
+        self._doc = doc
+        self._frames: Dict[int, bytes] = {}
+
+    def __len__(self) -> int:
+        return self._doc["page_count"]
+
+    def _frame(self, index: int) -> bytes:
+        frame = self._frames.get(index)
+        if frame is None:
+            offsets = self._doc["frame_offsets"]
+            frame = self._frames[index] = _decompress(
+                self._doc["codec"], bytes(self._doc["data"][offsets[index]:offsets[index + 1]])
+            )
+        return frame
+
+    def page(self, index: int) -> str:
+        if not 0 <= index < len(self):
+            raise IndexError(f"Page {index} out of range ({len(self)} pages)")
+        per_frame = self._doc["pages_per_frame"]
+        offsets = self._doc["page_offsets"]
+        frame_index = index // per_frame
+        base = offsets[frame_index * per_frame]
+        return self._frame(frame_index)[offsets[index] - base:offsets[index + 1] - base].decode("utf-8")
+
+    def pages(self, start: int = 0, end: Optional[int] = None) -> List[str]:
+        end = len(self) if end is None else min(end, len(self))
+        return [self.page(index) for index in range(max(start, 0), end)]
+
+
+async def load_text(db, content_hash: str) -> Optional[StoredText]:
+    """The stored texts of a PDF, or None if they were never stored or cannot be read here."""
+    if not get_settings().text_store_enabled:
+        return None
+    doc = await db[TEXT_COLLECTION].find_one({"_id": content_hash, "version": TEXT_FORMAT_VERSION})
+    # A zstd text written where zstandard was installed is re-extracted where it is not
+    if doc is None or (doc["codec"] == "zstd" and zstandard is None):
+        CACHE_LOOKUPS.inc("page_text", "miss")
+        return None
+    CACHE_LOOKUPS.inc("page_text", "hit")
+    return StoredText(doc)
+
+
+async def load_pages(db, content_hash: str) -> Optional[List[str]]:
+    """Every page's text, decompressed off the event loop; None when not stored."""
+    with span("text_store.load"):
+        stored = await load_text(db, content_hash)
+        if stored is None:
+            return None
+        return await asyncio.to_thread(stored.pages)
+
+
+async def save_pages(db, content_hash: str, pages: List[str]) -> bool:
+    """
+    Store a PDF's extracted page texts under its content hash. Failures are reported,
+    not raised: the store only saves re-parsing, so it must never fail an analysis.
+    """
+    if not get_settings().text_store_enabled:
+        return False
+    try:
+        with span("text_store.save"):
+            doc = await asyncio.to_thread(encode_pages, pages, resolve_codec())
+            if doc["compressed_bytes"] > MAX_COMPRESSED_BYTES:
+                print(f"Page texts of {content_hash[:12]} not stored: {doc['compressed_bytes']} bytes compressed")
+                return False
+            doc["data"] = Binary(doc["data"])
+            doc["created_at"] = datetime.utcnow()
+            # Content-addressed, so replacing an existing entry (e.g. an older version) is safe
+            await db[TEXT_COLLECTION].replace_one({"_id": content_hash}, doc, upsert=True)
+        return True
+    except Exception as e:
+        print(f"Failed to store page texts of {content_hash[:12]}: {e}")
+        return False
+
+
+async def delete_pages(db, content_hash: str):
+    await db[TEXT_COLLECTION].delete_one({"_id": content_hash})
+
+
+async def backfill(db, fs, limit: Optional[int] = None) -> dict:
+    """
+    Extract and store the texts of stored PDFs that have none yet (blocking work runs
+    in the extraction workers). Returns counts of stored, skipped and failed PDFs.
+    """
+    stored_hashes = set(await db[TEXT_COLLECTION].distinct("_id", {"version": TEXT_FORMAT_VERSION}))
+    counts = {"stored": 0, "skipped": 0, "failed": 0}
+    async for file_doc in db["fs.files"].find({"metadata.sha256": {"$exists": True}}, {"metadata.sha256": 1}):
+        content_hash = file_doc["metadata"]["sha256"]
+        if content_hash in stored_hashes:
+            continue
+        if limit is not None and sum(counts.values()) >= limit:
+            break
+        fd, path = tempfile.mkstemp(suffix=".pdf", dir=spool_directory())
+        try:
+            with os.fdopen(fd, "wb") as out:
+                await fs.download_to_stream(file_doc["_id"], out)
+            pages = await extraction_engine.extract_pages(path)
+            saved = await save_pages(db, content_hash, pages)
+            counts["stored" if saved else "skipped"] += 1
+        except Exception as e:
+            print(f"Could not extract {file_doc['_id']}: {e}")
+            counts["failed"] += 1
+        finally:
+            discard_spooled(path)
+        stored_hashes.add(content_hash)
+    return counts
+
+
+async def footprint(db) -> dict:
+    """Storage used by the corpus: PDFs in GridFS versus their raw and compressed texts."""
+    text_rows = await db[TEXT_COLLECTION].aggregate([
+        {"$group": {
+            "_id": "$codec",
+            "documents": {"$sum": 1},
+            "pages": {"$sum": "$page_count"},
+            "raw_bytes": {"$sum": "$raw_bytes"},
+            "compressed_bytes": {"$sum": "$compressed_bytes"},
+        }}
+    ]).to_list(length=None)
+    pdf_rows = await db["fs.files"].aggregate([
+        # Only the _id of each text comes back, not its compressed data
+        {"$lookup": {
+            "from": TEXT_COLLECTION, "localField": "metadata.sha256", "foreignField": "_id",
+            "pipeline": [{"$project": {"_id": 1}}], "as": "text"
+        }},
+        {"$group": {
+            "_id": {"$gt": [{"$size": "$text"}, 0]},
+            "count": {"$sum": 1},
+            "bytes": {"$sum": "$length"},
+        }}
+    ]).to_list(length=None)
+
+    pdfs = {row["_id"]: row for row in pdf_rows}
+    with_text = pdfs.get(True, {"count": 0, "bytes": 0})
+    without_text = pdfs.get(False, {"count": 0, "bytes": 0})
+    raw = sum(row["raw_bytes"] for row in text_rows)
+    compressed = sum(row["compressed_bytes"] for row in text_rows)
+    return {
+        "pdfs": {"count": with_text["count"] + without_text["count"], "bytes": with_text["bytes"] + without_text["bytes"]},
+        "pdfs_without_text": without_text["count"],
+        # Like-for-like: only PDFs whose text is stored
+        "pdf_bytes_with_text": with_text["bytes"],
+        "text": {
+            "documents": sum(row["documents"] for row in text_rows),
+            "pages": sum(row["pages"] for row in text_rows),
+            "raw_bytes": raw,
+            "compressed_bytes": compressed,
+            "compression_ratio": round(raw / compressed, 2) if compressed else None,
+            "share_of_pdf_bytes": round(compressed / with_text["bytes"], 4) if with_text["bytes"] else None,
+            "codecs": {row["_id"]: {k: row[k] for k in ("documents", "raw_bytes", "compressed_bytes")} for row in text_rows},
+        },
+    }
@@ -0,0 +1,153 @@
+import asyncio
+import hashlib
+import os
+import tempfile
+import time
+import zipfile
+from typing import List, Optional
+
+from fastapi import UploadFile
+
+from ..config import get_settings
+
+
+class UploadTooLargeError(ValueError):
+    """Raised when an upload exceeds the configured maximum size."""
+
+
+class SpooledUpload:
+    """An upload copied to a private temp file, with its size and SHA-256 computed on the way."""
+
+    def __init__(self, path: str, filename: str, size: int, content_hash: str):
+        self.path = path
+        self.filename = filename
+        self.size = size
+        self.content_hash = content_hash
+
+    def cleanup(self):
+        discard_spooled(self.path)
+
+
+def discard_spooled(path: str):
+    try:
+        os.unlink(path)
+    except FileNotFoundError:
+        pass
+
+
+def spool_directory() -> str:
+    settings = get_settings()
+    path = settings.upload_spool_dir or os.path.join(tempfile.gettempdir(), "greenwash_uploads")
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def _too_large_message(max_bytes: int) -> str:
+    return f"File exceeds the {max_bytes / (1024 * 1024):.0f} MB upload limit"
+
+
+async def spool_upload(upload: UploadFile, max_bytes: Optional[int] = None) -> SpooledUpload:
+    """
+    Copy an upload to disk in fixed-size chunks, hashing as it goes.
+
+    At most one chunk is held in memory, however large the file. Raises
+    UploadTooLargeError as soon as the limit is passed; the partial file is removed.
+    """
+    settings = get_settings()
+    max_bytes = max_bytes or settings.upload_max_bytes
+    if upload.size is not None and upload.size > max_bytes:
+        raise UploadTooLargeError(_too_large_message(max_bytes))
+
+    digest = hashlib.sha256()
+    size = 0
+    fd, path = tempfile.mkstemp(suffix=".pdf", dir=spool_directory())
+    try:
+        with os.fdopen(fd, "wb") as out:
+            while True:
+                chunk = await upload.read(settings.upload_chunk_bytes)
+                if not chunk:
+                    break
+                size += len(chunk)
+                if size > max_bytes:
+                    raise UploadTooLargeError(_too_large_message(max_bytes))
+                digest.update(chunk)
+                await asyncio.to_thread(out.write, chunk)
+    except BaseException:
+        discard_spooled(path)
+        raise
+
+    return SpooledUpload(path, upload.filename, size, digest.hexdigest())
+
+
+def _spool_zip_member(
+    archive: zipfile.ZipFile, info: zipfile.ZipInfo, filename: str, max_bytes: int, budget: float, chunk_bytes: int
+) -> SpooledUpload:
+    digest = hashlib.sha256()
+    size = 0
+    fd, path = tempfile.mkstemp(suffix=".pdf", dir=spool_directory())
+    try:
+        with os.fdopen(fd, "wb") as out, archive.open(info) as member:
+            # Count what is actually inflated; the sizes in the zip header can lie
+            while chunk := member.read(chunk_bytes):
+                size += len(chunk)
+                if size > max_bytes:
+                    raise UploadTooLargeError(f"{filename}: {_too_large_message(max_bytes)}")
+                if size > budget:
+                    raise UploadTooLargeError("Archive inflates past the batch size limit")
+                digest.update(chunk)
+                out.write(chunk)
+    except BaseException:
+        discard_spooled(path)
+        raise
+    return SpooledUpload(path, filename, size, digest.hexdigest())
+
+
+def spool_zip_members(
+    zip_path: str, max_files: int, max_bytes: Optional[int] = None, max_total_bytes: Optional[int] = None
+) -> List[SpooledUpload]:
+    """
+    Extract every PDF in a zip archive to its own spool file. Blocking; run it in a thread.
+    Raises UploadTooLargeError past `max_files` PDFs, when a member inflates past
+    `max_bytes`, or when all members together inflate past `max_total_bytes`.
+    """
+    settings = get_settings()
+    max_bytes = max_bytes or settings.upload_max_bytes
+    budget = max_total_bytes if max_total_bytes is not None else float("inf")
+    uploads = []
+    try:
+        with zipfile.ZipFile(zip_path) as archive:
+            for info in archive.infolist():
+                filename = os.path.basename(info.filename)
+                if info.is_dir() or info.filename.startswith("__MACOSX/") or not filename.lower().endswith(".pdf"):
+                    continue
+                if len(uploads) >= max_files:
+                    raise UploadTooLargeError(f"Archive contains more than {max_files} PDF files")
+                upload = _spool_zip_member(archive, info, filename, max_bytes, budget, settings.upload_chunk_bytes)
+                uploads.append(upload)
+                budget -= upload.size
+    except BaseException:
+        for upload in uploads:
+            upload.cleanup()
+        raise
+    return uploads
+
+
+def purge_spool_directory(max_age_seconds: Optional[float] = None) -> int:
+    """
+    Remove spooled files left behind by a crashed or restarted process. Only files
+    older than the age limit go, so other workers sharing the directory are unaffected.
+    """
+    if max_age_seconds is None:
+        max_age_seconds = get_settings().upload_spool_max_age_seconds
+    directory = spool_directory()
+    cutoff = time.time() - max_age_seconds
+    removed = 0
+    for name in os.listdir(directory):
+        path = os.path.join(directory, name)
+        try:
+            if os.path.isfile(path) and os.path.getmtime(path) <= cutoff:
+                os.unlink(path)
+                removed += 1
+        except OSError:
+            pass
+    return removed
@@ -0,0 +1,124 @@
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional
+
+from bson import ObjectId
+from bson.errors import InvalidId
+
+from ..config import get_settings
+
+USER_METADATA_FIELDS = {"company_name": 1, "industry_type": 1, "gst_number": 1, "email": 1}
+
+
+class UserLoader:
+    """
+    DataLoader-style resolver for user id -> company metadata.
+
+    Lookups requested in the same event-loop tick are coalesced into one `$in`
+    query, and results are kept in a small TTL cache.
+    """
+
+    def __init__(self, ttl_seconds: float = 60.0, max_entries: int = 10000):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._cache: "OrderedDict[str, tuple]" = OrderedDict()
+        self._pending: Dict[str, asyncio.Future] = {}
+        self._pending_db = None
+        self._dispatch_task = None
+
+    def _cache_get(self, user_id: str):
+        entry = self._cache.get(user_id)
+        if entry is None:
+            return False, None
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._cache[user_id]
+            return False, None
+        return True, value
+
+    def _cache_set(self, user_id: str, value: Optional[dict]):
+        self._cache[user_id] = (time.monotonic() + self.ttl_seconds, value)
+        self._cache.move_to_end(user_id)
+        while len(self._cache) > self.max_entries:
+            self._cache.popitem(last=False)
+
+    def prime(self, users: Iterable[dict]):
+        """Seed the cache with user documents that were already fetched."""
+        for user in users:
+            self._cache_set(str(user["_id"]), {field: user.get(field) for field in USER_METADATA_FIELDS})
+
+    def invalidate(self, user_id: str):
+        self._cache.pop(user_id, None)
+
+    def clear(self):
+        self._cache.clear()
+
+    async def _fetch(self, db, user_ids: List[str]) -> Dict[str, Optional[dict]]:
+        object_ids = []
+        for user_id in user_ids:
+            try:
+                object_ids.append(ObjectId(user_id))
+            except (InvalidId, TypeError):
+                pass
+
+        found = {}
+        if object_ids:
+            async for user in db.users.find({"_id": {"$in": object_ids}}, USER_METADATA_FIELDS):
+                found[str(user["_id"])] = {field: user.get(field) for field in USER_METADATA_FIELDS}
+
+        for user_id in user_ids:
+            self._cache_set(user_id, found.get(user_id))
+        return {user_id: found.get(user_id) for user_id in user_ids}
+
+    async def load_many(self, db, user_ids: Iterable[str]) -> Dict[str, Optional[dict]]:
+        """Resolve many ids with at most one query; unknown or invalid ids map to None."""
+        results = {}
+        missing = []
+        for user_id in dict.fromkeys(user_ids):
+            hit, value = self._cache_get(user_id)
+            if hit:
+                results[user_id] = value
+            else:
+                missing.append(user_id)
+
+        if missing:
+            results.update(await self._fetch(db, missing))
+        return results
+
+    async def load(self, db, user_id: str) -> Optional[dict]:
+        """Resolve a single id, batching with other `load` calls made in the same tick."""
+        hit, value = self._cache_get(user_id)
+        if hit:
+            return value
+
+        future = self._pending.get(user_id)
+        if future is None:
+            future = asyncio.get_running_loop().create_future()
+            self._pending[user_id] = future
+            self._pending_db = db
+            if self._dispatch_task is None:
+                # The task first runs on the next loop iteration, after every load() made this tick
+                self._dispatch_task = asyncio.get_running_loop().create_task(self._dispatch())
+        return await asyncio.shield(future)
+
+    async def _dispatch(self):
+        pending, self._pending = self._pending, {}
+        db, self._pending_db = self._pending_db, None
+        self._dispatch_task = None
+        try:
+            results = await self._fetch(db, list(pending))
+        except Exception as e:
+            for future in pending.values():
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for user_id, future in pending.items():
+            if not future.done():
+                future.set_result(results.get(user_id))
+
+
+user_loader = UserLoader(
+    ttl_seconds=get_settings().user_cache_ttl_seconds,
+    max_entries=get_settings().user_cache_max_entries
+)
@@ -0,0 +1,115 @@
+"""
+Benchmark the GST registry: loading the spreadsheet (pandas, openpyxl read-only,
+JSON cache) and GSTIN lookups (pandas mask, linear scan, hash index).
+
+The bundled spreadsheet is small, so `--rows` synthesizes a larger one with the
+same columns by repeating its rows under fresh GSTINs.
+
+Run from the backend directory:
+    python -m benchmarks.bench_gst_registry --rows 200000 --lookups 100000
+"""
+import argparse
+import os
+import random
+import string
+import tempfile
+import time
+
+import pandas as pd
+from openpyxl import Workbook, load_workbook
+
+from app.config import get_settings
+from app.services.gst_registry import GstRegistry, load_records, parse_spreadsheet
+
+
+def _random_gstin(rng: random.Random, state: str) -> str:
+    letters = "".join(rng.choices(string.ascii_uppercase, k=5))
+    return f"{state}{letters}{rng.randint(0, 9999):04d}{rng.choice(string.ascii_uppercase)}1Z{rng.choice(string.digits)}"
+
+
+def synthesize(source: str, target: str, rows: int, seed: int = 3):
+    """Write `rows` registry rows modelled on the bundled spreadsheet."""
+    rng = random.Random(seed)
+    template = load_workbook(source, read_only=True)
+    sample = list(template.active.iter_rows(values_only=True))
+    template.close()
+    header, body = sample[0], sample[1:]
+
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet()
+    sheet.append(header)
+    for index in range(rows):
+        row = list(body[index % len(body)])
+        row[0] = _random_gstin(rng, str(row[0])[:2])
+        sheet.append(row)
+    workbook.save(target)
+
+
+def timed(label: str, fn, repeat: int = 1):
+    started = time.perf_counter()
+    for _ in range(repeat):
+        result = fn()
+    elapsed = (time.perf_counter() - started) / repeat
+    print(f"  {label:<42} {elapsed * 1000:10.2f} ms")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=0, help="synthesize a spreadsheet this large (0 = use the bundled one)")
+    parser.add_argument("--lookups", type=int, default=100000)
+    args = parser.parse_args()
+
+    source = get_settings().gst_registry_path
+    with tempfile.TemporaryDirectory() as workdir:
+        if args.rows:
+            path = os.path.join(workdir, "registry.xlsx")
+            synthesize(source, path, args.rows)
+        else:
+            path = source
+        cache_path = os.path.join(workdir, "registry.json")
+        print(f"{path}: {os.path.getsize(path) / 1024:.0f} KB")
+
+        print("Load")
+        frame = timed("pandas.read_excel", lambda: pd.read_excel(path, dtype=str))
+        records = timed("openpyxl read-only parse", lambda: parse_spreadsheet(path))
+        timed("load_records, cold (parse + write cache)", lambda: load_records(path, cache_path))
+        timed("load_records, warm (JSON cache)", lambda: load_records(path, cache_path), repeat=5)
+        registry = GstRegistry()
+        timed("GstRegistry.load, warm (cache + index)", lambda: registry.load(path, cache_path), repeat=5)
+        print(f"  {len(registry)} records")
+
+        rng = random.Random(7)
+        known = [record.gstin for record in records]
+        queries = [rng.choice(known) if rng.random() < 0.8 else _random_gstin(rng, "27") for _ in range(args.lookups)]
+        scan_queries = queries[:max(1, min(len(queries), 200_000 // max(len(known), 1)))]
+        mask_queries = scan_queries[:50]
+
+        print("Lookups (per lookup; 80% hits)")
+        column = frame["GSTIN"]
+
+        def pandas_mask():
+            for gstin in mask_queries:
+                frame.loc[column == gstin]
+
+        def linear_scan():
+            for gstin in scan_queries:
+                next((record for record in records if record.gstin == gstin), None)
+
+        def hash_index():
+            for gstin in queries:
+                registry.lookup(gstin)
+
+        for label, fn, count in (
+            ("pandas boolean mask", pandas_mask, len(mask_queries)),
+            ("linear scan over records", linear_scan, len(scan_queries)),
+            ("hash index (GstRegistry.lookup)", hash_index, len(queries)),
+        ):
+            started = time.perf_counter()
+            fn()
+            elapsed = time.perf_counter() - started
+            print(f"  {label:<42} {elapsed / count * 1e6:10.2f} us")
+
+
+if __name__ == "__main__":
+    main()
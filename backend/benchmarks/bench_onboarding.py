@@ -0,0 +1,108 @@
+"""
+Benchmark bulk company onboarding: the per-company /auth/register flow (two find_one
+checks and an insert_one per row) versus onboarding_service.import_companies
+(one $in lookup and one unordered bulk_write per chunk).
+
+Needs a running MongoDB; uses a throwaway database which is dropped afterwards.
+About 2% of the synthesized rows repeat an earlier email, so the error report is exercised.
+Run from the backend directory:
+    python -m benchmarks.bench_onboarding --rows 50000 --legacy-rows 2000
+"""
+import argparse
+import asyncio
+import os
+import random
+import string
+import tempfile
+import time
+from datetime import datetime
+
+from motor.motor_asyncio import AsyncIOMotorClient
+from openpyxl import Workbook
+
+from app.services import onboarding_service
+from app.services.auth_service import hash_password
+
+INDUSTRIES = ["Manufacturing", "Energy", "Technology", "Retail", "Finance", "Healthcare", "Chemicals"]
+HEADER = ["GSTIN", "Email", "Legal Name", "Trade Name", "Business Nature", "Password"]
+
+
+def synthesize(path: str, rows: int, seed: int = 5):
+    """Write `rows` companies in the GST registry export layout, with unique GSTINs."""
+    rng = random.Random(seed)
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet()
+    sheet.append(HEADER)
+    for index in range(rows):
+        letters = "".join(rng.choices(string.ascii_uppercase, k=5))
+        gstin = f"27{letters}{index % 10000:04d}{string.ascii_uppercase[index // 10000 % 26]}1Z5"
+        email_index = rng.randrange(index) if index and rng.random() < 0.02 else index
+        sheet.append([
+            gstin, f"company{email_index}@example.com", f"Company {index} Private Limited",
+            f"Company {index}", rng.choice(INDUSTRIES), "changeme123",
+        ])
+    workbook.save(path)
+
+
+async def legacy_import(db, rows) -> int:
+    """What onboarding looked like through /auth/register, one company at a time (condensed)."""
+    inserted = 0
+    for _, fields in rows:
+        if await db.users.find_one({"email": fields["email"].lower()}):
+            continue
+        if await db.users.find_one({"gst_number": fields["gst_number"]}):
+            continue
+        await db.users.insert_one({
+            "gst_number": fields["gst_number"],
+            "email": fields["email"].lower(),
+            "company_name": fields["company_name"],
+            "industry_type": fields["industry_type"],
+            "password_hash": hash_password(fields["password"]),
+            "role": "client",
+            "created_at": datetime.utcnow(),
+        })
+        inserted += 1
+    return inserted
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mongo-url", default="mongodb://localhost:27017")
+    parser.add_argument("--db", default="greenwash_bench_onboarding")
+    parser.add_argument("--rows", type=int, default=50_000)
+    parser.add_argument("--legacy-rows", type=int, default=2_000, help="rows timed through the per-row flow (0 = skip)")
+    args = parser.parse_args()
+
+    client = AsyncIOMotorClient(args.mongo_url)
+    db = client[args.db]
+    with tempfile.TemporaryDirectory() as workdir:
+        path = os.path.join(workdir, "companies.xlsx")
+        started = time.perf_counter()
+        synthesize(path, args.rows)
+        print(f"Synthesized {args.rows} rows ({os.path.getsize(path) / 1024:.0f} KB) in {time.perf_counter() - started:.1f}s")
+
+        try:
+            for name in ("email", "gst_number"):
+                await db.users.create_index(name, unique=True)
+
+            if args.legacy_rows:
+                sample = list(onboarding_service.iter_rows(path))[:args.legacy_rows]
+                started = time.perf_counter()
+                inserted = await legacy_import(db, sample)
+                elapsed = time.perf_counter() - started
+                print(f"{'per-row register flow':<28} {inserted:>7} inserted {elapsed:8.2f}s  "
+                      f"(~{elapsed / len(sample) * args.rows:.0f}s extrapolated to {args.rows} rows)")
+                await db.users.delete_many({})
+
+            report = await onboarding_service.import_companies(db, path)
+            print(f"{'import_companies':<28} {report['inserted']:>7} inserted {report['elapsed_seconds']:8.2f}s  "
+                  f"({report['failed']} rejected, {report['total_rows'] / report['elapsed_seconds']:.0f} rows/s)")
+            for entry in report["errors"][:3]:
+                print(f"  row {entry['row']}: {entry['error']}")
+        finally:
+            await client.drop_database(args.db)
+            client.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
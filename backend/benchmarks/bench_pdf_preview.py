@@ -0,0 +1,136 @@
+"""
+Benchmark the single-pass PDF preview extractor against the previous implementation.
+
+Run from the backend directory:
+    python -m benchmarks.bench_pdf_preview --pages 500 --repeat 3
+"""
+import argparse
+import random
+import re
+import time
+
+import fitz  # PyMuPDF
+
+from app.services.pdf_service import extract_pdf_preview, extract_company_name
+
+SAMPLE_LINES = [
+    "Scope 1 emissions: 45,000 tonnes CO2e",
+    "Renewable share - 38% of total electricity",
+    "Water withdrawn: 2.3 million liters",
+    "We are committed to eco-friendly and sustainable practices across our value chain.",
+    "Certified to ISO 14001 and ISO 50001 since 2019.",
+    "Reporting follows GRI Standards and is disclosed to CDP.",
+    "Energy consumption reduced by 12,500 MWh compared to 2021.",
+    "Our green initiatives are working towards a cleaner future.",
+    "Waste diverted from landfill - 82%",
+    "Target: Net Zero by 2040",
+]
+
+
+def legacy_extract_pdf_preview(file_bytes: bytes) -> dict:
+    """The multi-pass implementation this benchmark compares against."""
+    pages_data = []
+    full_text = ""
+    total_pages = 0
+
+    with fitz.open(stream=file_bytes, filetype="pdf") as doc:
+        total_pages = len(doc)
+        for page_num, page in enumerate(doc, 1):
+            page_text = page.get_text()
+            full_text += page_text + "\n"
+            blocks = page.get_text("blocks")
+            pages_data.append({
+                "page_number": page_num,
+                "text": page_text.strip(),
+                "word_count": len(page_text.split())
+            })
+
+    extracted_data = []
+    lines = full_text.split('\n')
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+        if ':' in line:
+            parts = line.split(':', 1)
+            if len(parts) == 2 and len(parts[0]) < 50:
+                extracted_data.append({"field": parts[0].strip(), "value": parts[1].strip()})
+        elif ' - ' in line and len(line) < 200:
+            parts = line.split(' - ', 1)
+            if len(parts) == 2:
+                extracted_data.append({"field": parts[0].strip(), "value": parts[1].strip()})
+
+    numeric_data = []
+    for line in lines:
+        numbers = re.findall(r'(\d{1,3}(?:,\d{3})*(?:\.\d+)?)\s*(tons?|tonnes?|kg|MT|kWh|MWh|GWh|liters?|L|gallons?|%|million|billion|crore|lakh|Rs\.?|₹|\$|USD|INR)?', line, re.IGNORECASE)
+        if numbers and len(line) < 300:
+            for num, unit in numbers:
+                numeric_data.append({"value": num, "unit": unit or "", "context": line.strip()[:150]})
+
+    certifications = []
+    cert_patterns = ['ISO 14001', 'ISO 9001', 'ISO 45001', 'ISO 50001', 'B-Corp', 'SBTi', 'GRI', 'CDP', 'LEED', 'FSC', 'OHSAS']
+    for cert in cert_patterns:
+        if cert.lower() in full_text.lower():
+            certifications.append(cert)
+
+    years = list(set(re.findall(r'\b(20[1-2]\d)\b', full_text)))
+    years.sort(reverse=True)
+
+    return {
+        "company_name": extract_company_name(full_text),
+        "total_pages": total_pages,
+        "total_words": len(full_text.split()),
+        "full_text": full_text.strip(),
+        "pages": pages_data,
+        "extracted_fields": extracted_data[:50],
+        "numeric_data": numeric_data[:30],
+        "certifications": certifications,
+        "years_mentioned": years[:10],
+    }
+
+
+def build_sample_pdf(pages: int, lines_per_page: int = 40, seed: int = 7) -> bytes:
+    """Generate a synthetic sustainability report with the given number of pages."""
+    rng = random.Random(seed)
+    doc = fitz.open()
+    for page_num in range(pages):
+        page = doc.new_page()
+        lines = ["Acme Industries Ltd"] if page_num == 0 else []
+        lines += [rng.choice(SAMPLE_LINES) for _ in range(lines_per_page)]
+        page.insert_text((36, 36), "\n".join(lines), fontsize=8)
+    data = doc.tobytes()
+    doc.close()
+    return data
+
+
+def best_of(fn, file_bytes: bytes, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn(file_bytes)
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    file_bytes = build_sample_pdf(args.pages)
+
+    if legacy_extract_pdf_preview(file_bytes) != extract_pdf_preview(file_bytes):
+        raise SystemExit("Output mismatch between legacy and single-pass extractor")
+
+    legacy = best_of(legacy_extract_pdf_preview, file_bytes, args.repeat)
+    current = best_of(extract_pdf_preview, file_bytes, args.repeat)
+
+    print(f"pages:        {args.pages}")
+    print(f"legacy:       {legacy * 1000:.1f} ms")
+    print(f"single-pass:  {current * 1000:.1f} ms")
+    print(f"speedup:      {legacy / current:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+"""
+Benchmark /admin/stats and /public/stats: the old per-document Python loops
+versus the aggregation rebuild and the incrementally maintained rollup.
+
+Needs a running MongoDB; seeds a throwaway database which is dropped afterwards.
+Run from the backend directory:
+    python -m benchmarks.bench_stats --reports 100000 --companies 2000
+"""
+import argparse
+import asyncio
+import random
+import time
+from datetime import datetime
+
+from motor.motor_asyncio import AsyncIOMotorClient
+
+from app.services import credit_service, stats_service
+
+INDUSTRIES = ["Manufacturing", "Energy", "Technology", "Retail", "Finance", "Healthcare", "Chemicals"]
+CREDIT_TYPES = ["CO2", "renewable", "waste", "water"]
+
+
+async def seed(db, reports: int, companies: int, credits: int, seed_value: int = 11):
+    rng = random.Random(seed_value)
+    now = datetime.utcnow()
+
+    users = [{
+        "gst_number": f"27AAAAA{index:04d}A1Z5",
+        "email": f"company{index}@example.com",
+        "company_name": f"Company {index}",
+        "industry_type": rng.choice(INDUSTRIES),
+        "role": "client",
+        "created_at": now,
+    } for index in range(companies)]
+    result = await db.users.insert_many(users)
+    user_ids = [str(user_id) for user_id in result.inserted_ids]
+
+    batch = []
+    for _ in range(reports):
+        s, c, v = rng.randint(0, 100), rng.randint(0, 100), rng.randint(0, 100)
+        score = round(0.40 * s + 0.35 * c + 0.25 * v, 1)
+        light = "RED" if score < 40 else "YELLOW" if score < 75 else "GREEN"
+        batch.append({
+            "filename": "report.pdf",
+            "file_id": "000000000000000000000000",
+            "uploaded_at": now,
+            "user_id": rng.choice(user_ids),
+            "analysis": {"scores": {
+                "final_trust_score": score, "specificity": s, "consistency": c,
+                "verification": v, "traffic_light": light
+            }},
+        })
+        if len(batch) == 5000:
+            await db.reports.insert_many(batch)
+            batch = []
+    if batch:
+        await db.reports.insert_many(batch)
+
+    await db.credits.insert_many([{
+        "user_id": rng.choice(user_ids),
+        "credit_type": rng.choice(CREDIT_TYPES),
+        "amount": rng.randint(1, 100),
+        "reason": "benchmark",
+        "transaction_type": "credit" if rng.random() < 0.8 else "debit",
+        "assigned_by": "bench@gov.in",
+        "assigned_at": now,
+    } for _ in range(credits)])
+
+
+async def legacy_public_stats(db) -> dict:
+    """The per-document implementation this benchmark compares against (condensed)."""
+    total_score = total_s = total_c = total_v = 0
+    score_count = 0
+    lights = {"RED": 0, "YELLOW": 0, "GREEN": 0}
+    async for report in db.reports.find():
+        scores = (report.get("analysis") or {}).get("scores")
+        if scores:
+            if scores.get("final_trust_score"):
+                total_score += scores["final_trust_score"]
+                total_s += scores.get("specificity", 0)
+                total_c += scores.get("consistency", 0)
+                total_v += scores.get("verification", 0)
+                score_count += 1
+            light = scores.get("traffic_light", "").upper()
+            if light in lights:
+                lights[light] += 1
+
+    industry_scores = {}
+    async for user in db.users.find():
+        entry = industry_scores.setdefault(user.get("industry_type", "Other"), {"total": 0, "count": 0})
+        async for report in db.reports.find({"user_id": str(user["_id"])}):
+            score = ((report.get("analysis") or {}).get("scores") or {}).get("final_trust_score", 0)
+            if score:
+                entry["total"] += score
+                entry["count"] += 1
+
+    total_credits = 0
+    async for credit in db.credits.find():
+        sign = 1 if credit.get("transaction_type", "credit") == "credit" else -1
+        total_credits += sign * credit["amount"]
+
+    return {
+        "platform_avg_trust_score": round(total_score / score_count, 1) if score_count else None,
+        "industry_averages": {
+            name: round(data["total"] / data["count"], 1) for name, data in industry_scores.items() if data["count"]
+        },
+        "total_credits_distributed": round(total_credits, 1),
+    }
+
+
+async def timed(label: str, coro_factory, results: dict):
+    started = time.perf_counter()
+    value = await coro_factory()
+    elapsed = time.perf_counter() - started
+    results[label] = elapsed
+    print(f"{label:<32} {elapsed * 1000:10.1f} ms")
+    return value
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mongo-url", default="mongodb://localhost:27017")
+    parser.add_argument("--db", default="greenwash_bench_stats")
+    parser.add_argument("--reports", type=int, default=100_000)
+    parser.add_argument("--companies", type=int, default=2_000)
+    parser.add_argument("--credits", type=int, default=20_000)
+    parser.add_argument("--keep", action="store_true", help="Keep the seeded database")
+    args = parser.parse_args()
+
+    client = AsyncIOMotorClient(args.mongo_url)
+    db = client[args.db]
+    await client.drop_database(args.db)
+    try:
+        print(f"Seeding {args.reports} reports, {args.companies} companies, {args.credits} credits...")
+        await seed(db, args.reports, args.companies, args.credits)
+        await db.reports.create_index("user_id")
+        await credit_service.reconcile_balances(db)
+
+        results = {}
+        legacy = await timed("legacy public stats", lambda: legacy_public_stats(db), results)
+        await timed("rollup rebuild (aggregation)", lambda: stats_service.rebuild_stats(db), results)
+        stats_service.invalidate_stats_cache()
+        current = await timed("public stats (rollup)", lambda: stats_service.get_public_stats(db), results)
+        await timed("public stats (cached)", lambda: stats_service.get_public_stats(db), results)
+        stats_service.invalidate_stats_cache()
+        await timed("admin stats (rollup)", lambda: stats_service.get_admin_stats(db), results)
+
+        for key in ("platform_avg_trust_score", "industry_averages", "total_credits_distributed"):
+            if legacy[key] != current[key]:
+                raise SystemExit(f"Mismatch in {key}: {legacy[key]} != {current[key]}")
+        print(f"speedup (legacy vs rollup):      {results['legacy public stats'] / results['public stats (rollup)']:.0f}x")
+    finally:
+        if not args.keep:
+            await client.drop_database(args.db)
+        client.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,123 @@
+"""
+Benchmark peak resident memory of the upload ingest path: the old whole-file
+`await file.read()` flow versus chunked spooling to disk and opening by path.
+
+Each scenario runs in a fresh process and reports its peak RSS above the
+post-import baseline, so the numbers are not polluted by earlier runs.
+GridFS storage is left out (it needs a server); the old flow also handed the
+bytes to GridFS, so its real footprint was higher than shown here.
+
+Run from the backend directory:
+    python -m benchmarks.bench_upload_memory --size-mb 50 --concurrency 4
+"""
+import argparse
+import asyncio
+import hashlib
+import multiprocessing
+import os
+import pickle
+import random
+import resource
+import tempfile
+import time
+
+import fitz  # PyMuPDF
+from fastapi import UploadFile
+
+from app.services.pdf_service import extract_page_texts
+from app.services.upload_service import spool_upload
+
+
+def make_pdf(path: str, size_mb: int, seed: int = 5):
+    """Write a PDF of roughly `size_mb` megabytes: text pages padded with incompressible images."""
+    rng = random.Random(seed)
+    doc = fitz.open()
+    side = 600
+    image_bytes = side * side * 3
+    for index in range(max(1, size_mb * 1024 * 1024 // image_bytes)):
+        page = doc.new_page()
+        page.insert_text((72, 72), f"Sustainability Report page {index + 1}\nScope 1 emissions: {rng.randint(1000, 90000)} tCO2e")
+        samples = rng.randbytes(image_bytes)
+        pixmap = fitz.Pixmap(fitz.csRGB, side, side, samples, 0)
+        page.insert_image(fitz.Rect(72, 120, 500, 548), pixmap=pixmap)
+    doc.save(path)
+    doc.close()
+
+
+def _peak_rss_mb() -> float:
+    # ru_maxrss is reported in kilobytes on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _open_upload(pdf_path: str) -> UploadFile:
+    """An UploadFile backed by a disk file, as Starlette hands over large multipart bodies."""
+    stream = tempfile.SpooledTemporaryFile(max_size=1024 * 1024)
+    with open(pdf_path, "rb") as source:
+        while chunk := source.read(1024 * 1024):
+            stream.write(chunk)
+    stream.seek(0)
+    return UploadFile(file=stream, filename="bench.pdf", size=os.path.getsize(pdf_path))
+
+
+async def _legacy_request(pdf_path: str):
+    upload = _open_upload(pdf_path)
+    file_bytes = await upload.read()
+    hashlib.sha256(file_bytes).hexdigest()
+    # Submitting to the extraction process pool pickled the whole file
+    payload = pickle.dumps((file_bytes, 0, None))
+    pages = await asyncio.to_thread(extract_page_texts, file_bytes)
+    del payload
+    return len(pages)
+
+
+async def _spooled_request(pdf_path: str):
+    upload = _open_upload(pdf_path)
+    spooled = await spool_upload(upload, max_bytes=1 << 40)
+    try:
+        # Only the path crosses into the extraction workers
+        payload = pickle.dumps((spooled.path, 0, None))
+        pages = await asyncio.to_thread(extract_page_texts, spooled.path)
+        del payload
+        return len(pages)
+    finally:
+        spooled.cleanup()
+
+
+SCENARIOS = {"legacy (read whole file)": _legacy_request, "spooled (chunked, by path)": _spooled_request}
+
+
+def _run_scenario(name: str, pdf_path: str, concurrency: int, results):
+    baseline = _peak_rss_mb()
+
+    async def run():
+        await asyncio.gather(*(SCENARIOS[name](pdf_path) for _ in range(concurrency)))
+
+    started = time.perf_counter()
+    asyncio.run(run())
+    results.put((name, _peak_rss_mb() - baseline, time.perf_counter() - started))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size-mb", type=int, default=50)
+    parser.add_argument("--concurrency", type=int, default=4)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        pdf_path = os.path.join(workdir, "bench.pdf")
+        make_pdf(pdf_path, args.size_mb)
+        actual_mb = os.path.getsize(pdf_path) / (1024 * 1024)
+        print(f"{args.concurrency} concurrent uploads of a {actual_mb:.1f} MB PDF")
+
+        context = multiprocessing.get_context("spawn")
+        results = context.Queue()
+        for name in SCENARIOS:
+            process = context.Process(target=_run_scenario, args=(name, pdf_path, args.concurrency, results))
+            process.start()
+            scenario, peak_mb, elapsed = results.get()
+            process.join()
+            print(f"{scenario:<30} peak RSS +{peak_mb:8.1f} MB   {elapsed:6.2f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,184 @@
+"""
+Local stand-ins for the OpenAI chat-completions and Serper search APIs, so the
+backend can be load-tested without network access, keys or per-token costs.
+
+Both APIs are served by one app: point OPENAI_BASE_URL at http://HOST:PORT/v1 and
+SERPER_URL at http://HOST:PORT/search. Every response waits for the configured
+latency (plus uniform jitter), and a configurable share of requests fails with
+429 or 500 to exercise the retry and circuit-breaker paths. Chat completions
+support streaming; analysis and map-reduce prompts get schema-valid JSON replies.
+
+Run from the backend directory:
+    python -m benchmarks.fakes --port 9100 --llm-latency-ms 2000 --error-rate 0.02
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+import uuid
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+from app.prompts import MAP_SYSTEM_PROMPT
+
+ANALYSIS_REPLY = {
+    "company_info": {"name": "Benchmark Company", "industry_type": "Manufacturing", "primary_focus": "Carbon Reduction"},
+    "scores": {"specificity": 62, "consistency": 55, "verification": 70},
+    "audit_details": {
+        "major_commitments": ["Net zero operations by 2040", "100% renewable electricity by 2030"],
+        "detected_contradictions": [
+            {"claim": "Committed to eco-friendly practices", "reality": "Fined for effluent discharge", "source": "https://example.com/news"}
+        ],
+        "vague_language_count": 12,
+        "hard_metrics_found": 30,
+    },
+    "co2_analysis": {
+        "current_emissions": "45,300 tCO2e (Scope 1 and 2)",
+        "reduction_potential": "20-30% by 2030",
+        "recommendations": [{
+            "action": "Switch boilers to biomass", "impact": "-8,000 tCO2e/yr", "priority": "HIGH",
+            "timeline": "18 months", "cost_benefit": "Payback in 4 years",
+        }],
+        "industry_benchmarks": "Below sector median intensity",
+        "certifications_to_pursue": ["ISO 50001"],
+    },
+    "admin_brief": "Synthetic analysis returned by the benchmark fake.",
+    "client_feedback": "Synthetic feedback returned by the benchmark fake.",
+}
+
+MAP_REPLY = {
+    "company_name": "Benchmark Company",
+    "industry_hints": ["manufacturing"],
+    "commitments": ["Net zero operations by 2040"],
+    "metrics": [{"metric": "Scope 1 emissions", "value": "45300", "unit": "tCO2e", "year": "2024"}],
+    "certifications": ["ISO 14001"],
+    "vague_language_count": 3,
+    "hard_metrics_found": 5,
+    "emission_sources": ["boilers"],
+}
+
+SEARCH_REPLY = {
+    "organic": [
+        {"title": f"Result {index}", "snippet": "Synthetic news snippet from the benchmark fake.", "link": f"https://example.com/{index}"}
+        for index in range(5)
+    ]
+}
+
+
+def create_app(
+    llm_latency: float = 1.0,
+    serper_latency: float = 0.2,
+    jitter: float = 0.1,
+    error_rate: float = 0.0,
+    stream_chunks: int = 20,
+    seed: int = 0,
+) -> FastAPI:
+    """Fake API app; latencies in seconds, error_rate as a fraction of requests."""
+    app = FastAPI()
+    rng = random.Random(seed)
+    calls = {"chat": 0, "chat_stream": 0, "search": 0, "errors": 0}
+
+    def injected_error():
+        if error_rate and rng.random() < error_rate:
+            calls["errors"] += 1
+            status = rng.choice((429, 500))
+            return JSONResponse({"error": {"message": "injected failure", "type": "fake"}}, status_code=status)
+        return None
+
+    def delay(base: float) -> float:
+        return max(0.0, base + rng.uniform(-jitter, jitter))
+
+    @app.get("/health")
+    async def health():
+        return {"status": "ok"}
+
+    @app.get("/stats")
+    async def stats():
+        return calls
+
+    @app.post("/search")
+    async def search(request: Request):
+        calls["search"] += 1
+        await asyncio.sleep(delay(serper_latency))
+        return injected_error() or SEARCH_REPLY
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        system = next((m.get("content", "") for m in body.get("messages", []) if m.get("role") == "system"), "")
+        content = json.dumps(MAP_REPLY if system == MAP_SYSTEM_PROMPT else ANALYSIS_REPLY)
+        prompt_tokens = sum(len(str(m.get("content", ""))) for m in body.get("messages", [])) // 4
+        usage = {"prompt_tokens": prompt_tokens, "completion_tokens": len(content) // 4,
+                 "total_tokens": prompt_tokens + len(content) // 4}
+        model = body.get("model", "gpt-fake")
+        completion_id = f"chatcmpl-{uuid.uuid4().hex}"
+        created = int(time.time())
+
+        if not body.get("stream"):
+            calls["chat"] += 1
+            await asyncio.sleep(delay(llm_latency))
+            return injected_error() or {
+                "id": completion_id, "object": "chat.completion", "created": created, "model": model,
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+                "usage": usage,
+            }
+
+        calls["chat_stream"] += 1
+        error = injected_error()
+        if error:
+            await asyncio.sleep(delay(llm_latency) / stream_chunks)
+            return error
+
+        # The latency is spread over the chunks, so time-to-first-token is a fraction of it
+        total = delay(llm_latency)
+        size = max(1, len(content) // stream_chunks + 1)
+
+        def chunk(delta: dict, finish_reason=None, **extra) -> str:
+            payload = {
+                "id": completion_id, "object": "chat.completion.chunk", "created": created, "model": model,
+                "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}] if delta is not None else [],
+                **extra,
+            }
+            return f"data: {json.dumps(payload)}\n\n"
+
+        async def events():
+            for start in range(0, len(content), size):
+                await asyncio.sleep(total / stream_chunks)
+                yield chunk({"content": content[start:start + size]})
+            yield chunk({}, "stop")
+            yield chunk(None, usage=usage)
+            yield "data: [DONE]\n\n"
+
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9100)
+    parser.add_argument("--llm-latency-ms", type=float, default=1000)
+    parser.add_argument("--serper-latency-ms", type=float, default=200)
+    parser.add_argument("--jitter-ms", type=float, default=100)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of requests failing with 429/500")
+    parser.add_argument("--stream-chunks", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    app = create_app(
+        llm_latency=args.llm_latency_ms / 1000,
+        serper_latency=args.serper_latency_ms / 1000,
+        jitter=args.jitter_ms / 1000,
+        error_rate=args.error_rate,
+        stream_chunks=args.stream_chunks,
+        seed=args.seed,
+    )
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
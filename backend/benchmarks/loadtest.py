@@ -0,0 +1,455 @@
+"""
+End-to-end load test of the HTTP API against local fakes, for comparing commits.
+
+Starts benchmarks.fakes (OpenAI + Serper), the backend under uvicorn pointed at the
+fakes, and optionally a throwaway mongod; seeds companies through
+/admin/companies/import, then drives each scenario with N requests at concurrency C:
+
+    preview          POST /preview with a synthetic report
+    analyze          POST /analyze, timed until the job's completed event
+    reports          GET /reports
+    admin_companies  GET /admin/companies?limit=50
+    public_stats     GET /public/stats
+
+Every request uses a distinct generated PDF and company name, so analysis and news
+caches are cold. Results (throughput, latency percentiles, errors and peak RSS of the
+server process tree, sampled from /proc, so Linux only) are printed and written as
+JSON tagged with the git commit; `--compare` prints the change against an earlier run.
+
+Needs MongoDB: a running server (--mongo-url, the database is dropped afterwards) or
+`--spawn-mongod` to start a private one with its data directory in /dev/shm.
+Run from the backend directory:
+    python -m benchmarks.loadtest --requests 50 --concurrency 8 --pages 30 --llm-latency-ms 1500
+    python -m benchmarks.loadtest --scenarios reports,public_stats --compare loadtest-1a2b3c4.json
+"""
+import argparse
+import asyncio
+import csv
+import io
+import json
+import os
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+import httpx
+from motor.motor_asyncio import AsyncIOMotorClient
+
+from app.config import BACKEND_DIR
+from benchmarks.pdfgen import make_report
+
+SCENARIOS = ("preview", "analyze", "reports", "admin_companies", "public_stats")
+INDUSTRIES = ["Manufacturing", "Energy", "Technology", "Retail", "Chemicals", "Textiles"]
+PAGE_SIZE = os.sysconf("SC_PAGE_SIZE")
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _git(*args) -> str:
+    try:
+        return subprocess.run(["git", *args], cwd=BACKEND_DIR, capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+def _tree_rss_bytes(root: int) -> int:
+    """Resident memory of a process and all its descendants (uvicorn plus extraction workers)."""
+    parents = {}
+    for entry in os.listdir("/proc"):
+        if entry.isdigit():
+            try:
+                with open(f"/proc/{entry}/stat") as stat:
+                    # The command name may contain spaces; fields after it are fixed
+                    parents[int(entry)] = int(stat.read().rsplit(")", 1)[1].split()[1])
+            except (OSError, IndexError, ValueError):
+                continue
+    tree = {root}
+    changed = True
+    while changed:
+        changed = False
+        for pid, parent in parents.items():
+            if parent in tree and pid not in tree:
+                tree.add(pid)
+                changed = True
+    total = 0
+    for pid in tree:
+        try:
+            with open(f"/proc/{pid}/statm") as statm:
+                total += int(statm.read().split()[1]) * PAGE_SIZE
+        except (OSError, IndexError, ValueError):
+            continue
+    return total
+
+
+class RssSampler:
+    """Samples the server's process-tree RSS in the background and keeps the peak."""
+
+    def __init__(self, pid: int, interval: float = 0.05):
+        self.pid = pid
+        self.interval = interval
+        self.peak = 0
+        self._task = None
+
+    async def _sample(self):
+        while True:
+            self.peak = max(self.peak, await asyncio.to_thread(_tree_rss_bytes, self.pid))
+            await asyncio.sleep(self.interval)
+
+    def start(self):
+        self.peak = _tree_rss_bytes(self.pid)
+        self._task = asyncio.create_task(self._sample())
+
+    async def stop(self) -> float:
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        return round(self.peak / (1024 * 1024), 1)
+
+
+def _percentile(sorted_values, q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, int(round(q * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+
+def _ms(seconds: float) -> float:
+    return round(seconds * 1000, 1)
+
+
+def summarize(latencies, errors: int, elapsed: float) -> dict:
+    values = sorted(latencies)
+    return {
+        "requests": len(values) + errors,
+        "ok": len(values),
+        "errors": errors,
+        "elapsed_seconds": round(elapsed, 3),
+        "throughput_rps": round(len(values) / elapsed, 2) if elapsed else 0.0,
+        "latency_ms": {
+            "mean": _ms(sum(values) / len(values)) if values else 0.0,
+            "p50": _ms(_percentile(values, 0.50)),
+            "p95": _ms(_percentile(values, 0.95)),
+            "p99": _ms(_percentile(values, 0.99)),
+            "max": _ms(values[-1]) if values else 0.0,
+        },
+    }
+
+
+async def run_scenario(count: int, concurrency: int, request) -> dict:
+    """Call `request(index)` `count` times, at most `concurrency` at once; it returns True on success."""
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+    failures = []
+
+    async def one(index: int):
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                ok = await request(index)
+            except Exception as e:
+                ok, reason = False, f"{type(e).__name__}: {e}"
+            else:
+                reason = "unsuccessful response"
+            if ok:
+                latencies.append(time.perf_counter() - started)
+            else:
+                failures.append(reason)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(index) for index in range(count)))
+    result = summarize(latencies, len(failures), time.perf_counter() - started)
+    if failures:
+        result["first_error"] = failures[0][:300]
+    return result
+
+
+async def wait_for_job(client: httpx.AsyncClient, events_url: str) -> bool:
+    """Follow a job's event stream until it completes (True) or fails (False)."""
+    event = None
+    async with client.stream("GET", events_url, timeout=None) as response:
+        async for line in response.aiter_lines():
+            if line.startswith("event: "):
+                event = line[len("event: "):]
+            elif line.startswith("data: "):
+                if event in ("completed", "failed"):
+                    return event == "completed"
+                if event == "state":
+                    status = json.loads(line[len("data: "):]).get("status")
+                    if status in ("completed", "failed"):
+                        return status == "completed"
+    return False
+
+
+def companies_csv(count: int) -> bytes:
+    out = io.StringIO()
+    writer = csv.writer(out)
+    writer.writerow(["GSTIN", "Email", "Company Name", "Industry Type", "Password"])
+    for index in range(count):
+        letters = "".join(chr(65 + (index // 26 ** power) % 26) for power in range(5))
+        writer.writerow([
+            f"27{letters}{index % 10000:04d}A1Z5", f"loadtest{index}@example.com",
+            f"Loadtest Company {index} Limited", INDUSTRIES[index % len(INDUSTRIES)], "loadtest123",
+        ])
+    return out.getvalue().encode()
+
+
+async def wait_ready(url: str, process: subprocess.Popen, timeout: float = 60.0):
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient() as client:
+        while time.monotonic() < deadline:
+            if process.poll() is not None:
+                raise SystemExit(f"{' '.join(process.args)} exited with code {process.returncode}")
+            try:
+                if (await client.get(url, timeout=2)).status_code == 200:
+                    return
+            except httpx.HTTPError:
+                pass
+            await asyncio.sleep(0.2)
+    raise SystemExit(f"{url} not ready after {timeout:.0f}s")
+
+
+def spawn_mongod(workdir: str):
+    binary = shutil.which("mongod")
+    if not binary:
+        raise SystemExit("--spawn-mongod: mongod not found on PATH")
+    port = _free_port()
+    dbpath = tempfile.mkdtemp(prefix="loadtest-mongo-", dir="/dev/shm" if os.path.isdir("/dev/shm") else workdir)
+    process = subprocess.Popen(
+        [binary, "--dbpath", dbpath, "--port", str(port), "--bind_ip", "127.0.0.1", "--quiet"],
+        stdout=subprocess.DEVNULL
+    )
+    return process, f"mongodb://127.0.0.1:{port}", dbpath
+
+
+async def wait_for_mongo(url: str, process: subprocess.Popen, timeout: float = 30.0):
+    client = AsyncIOMotorClient(url, serverSelectionTimeoutMS=500)
+    deadline = time.monotonic() + timeout
+    try:
+        while time.monotonic() < deadline:
+            if process.poll() is not None:
+                raise SystemExit(f"mongod exited with code {process.returncode}")
+            try:
+                await client.admin.command("ping")
+                return
+            except Exception:
+                await asyncio.sleep(0.2)
+        raise SystemExit(f"mongod not ready after {timeout:.0f}s")
+    finally:
+        client.close()
+
+
+def print_results(results: dict):
+    print(f"\n{'scenario':<16} {'ok/total':>10} {'rps':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'peak RSS':>9}")
+    for name, entry in results["scenarios"].items():
+        latency = entry["latency_ms"]
+        print(
+            f"{name:<16} {entry['ok']:>4}/{entry['requests']:<5} {entry['throughput_rps']:>8.2f} "
+            f"{latency['p50']:>9.1f} {latency['p95']:>9.1f} {latency['p99']:>9.1f} {entry['peak_rss_mb']:>7.1f}MB"
+        )
+        if entry.get("first_error"):
+            print(f"  first error: {entry['first_error']}")
+
+
+def print_comparison(results: dict, baseline: dict):
+    def change(new: float, old: float) -> str:
+        return f"{(new - old) / old * 100:+.1f}%" if old else "n/a"
+
+    print(f"\nAgainst {baseline.get('commit') or 'baseline'} ({baseline.get('timestamp', '?')}):")
+    print(f"{'scenario':<16} {'rps':>10} {'p95':>10} {'peak RSS':>10}")
+    for name, entry in results["scenarios"].items():
+        old = baseline.get("scenarios", {}).get(name)
+        if not old:
+            continue
+        print(
+            f"{name:<16} {change(entry['throughput_rps'], old['throughput_rps']):>10} "
+            f"{change(entry['latency_ms']['p95'], old['latency_ms']['p95']):>10} "
+            f"{change(entry['peak_rss_mb'], old['peak_rss_mb']):>10}"
+        )
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS), help="comma-separated subset of: " + ", ".join(SCENARIOS))
+    parser.add_argument("--requests", type=int, default=50, help="requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--pages", type=int, default=20, help="pages per generated report")
+    parser.add_argument("--mode", default="standard", help="analysis mode for the analyze scenario")
+    parser.add_argument("--companies", type=int, default=200, help="companies seeded through the bulk import")
+    parser.add_argument("--mongo-url", default="mongodb://localhost:27017")
+    parser.add_argument("--db", default="greenwash_loadtest")
+    parser.add_argument("--spawn-mongod", action="store_true", help="start a private mongod instead of using --mongo-url")
+    parser.add_argument("--llm-latency-ms", type=float, default=1000)
+    parser.add_argument("--serper-latency-ms", type=float, default=200)
+    parser.add_argument("--jitter-ms", type=float, default=100)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of fake API calls failing with 429/500")
+    parser.add_argument("--env", action="append", default=[], metavar="KEY=VALUE", help="extra backend setting (repeatable)")
+    parser.add_argument("--output", help="results file (default loadtest-<commit>.json)")
+    parser.add_argument("--compare", metavar="JSON", help="earlier results file to compare against")
+    parser.add_argument("--keep-db", action="store_true")
+    args = parser.parse_args()
+
+    scenarios = [name.strip() for name in args.scenarios.split(",") if name.strip()]
+    unknown = [name for name in scenarios if name not in SCENARIOS]
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(unknown)}")
+
+    commit = _git("rev-parse", "--short", "HEAD")
+    results = {
+        "commit": commit,
+        "dirty": bool(_git("status", "--porcelain", "--untracked-files=no")),
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "config": {key: value for key, value in vars(args).items() if key not in ("output", "compare")},
+        "scenarios": {},
+    }
+
+    processes = []
+    workdir = tempfile.mkdtemp(prefix="loadtest-")
+    mongo_dbpath = None
+    try:
+        mongo_url = args.mongo_url
+        if args.spawn_mongod:
+            mongod, mongo_url, mongo_dbpath = spawn_mongod(workdir)
+            processes.append(mongod)
+            await wait_for_mongo(mongo_url, mongod)
+
+        fake_port, api_port = _free_port(), _free_port()
+        fake_url = f"http://127.0.0.1:{fake_port}"
+        fakes = subprocess.Popen([
+            sys.executable, "-m", "benchmarks.fakes", "--port", str(fake_port),
+            "--llm-latency-ms", str(args.llm_latency_ms), "--serper-latency-ms", str(args.serper_latency_ms),
+            "--jitter-ms", str(args.jitter_ms), "--error-rate", str(args.error_rate),
+        ], cwd=BACKEND_DIR)
+        processes.append(fakes)
+
+        env = {
+            **os.environ,
+            "MONGODB_URL": mongo_url,
+            "MONGODB_DB_NAME": args.db,
+            "OPENAI_API_KEY": "loadtest",
+            "SERPER_API_KEY": "loadtest",
+            "OPENAI_BASE_URL": f"{fake_url}/v1",
+            "SERPER_URL": f"{fake_url}/search",
+            "GST_REGISTRY_ENFORCE": "false",
+            "UPLOAD_SPOOL_DIR": os.path.join(workdir, "spool"),
+            # The fake has no quota; the limiter would otherwise dominate the numbers
+            "LLM_REQUESTS_PER_MINUTE": "100000",
+            "LLM_BURST": "1000",
+        }
+        for item in args.env:
+            key, _, value = item.partition("=")
+            env[key.upper()] = value
+        server = subprocess.Popen([
+            sys.executable, "-m", "uvicorn", "app.main:app", "--host", "127.0.0.1", "--port", str(api_port),
+            "--log-level", "warning",
+        ], cwd=BACKEND_DIR, env=env)
+        processes.append(server)
+
+        await wait_ready(f"{fake_url}/health", fakes)
+        base_url = f"http://127.0.0.1:{api_port}"
+        await wait_ready(f"{base_url}/health", server)
+        print(f"Backend {base_url} (pid {server.pid}), fakes {fake_url}, MongoDB {mongo_url}/{args.db}")
+
+        limits = httpx.Limits(max_connections=args.concurrency * 2 + 4)
+        async with httpx.AsyncClient(base_url=base_url, timeout=600, limits=limits) as client:
+            started = time.perf_counter()
+            response = await client.post(
+                "/admin/companies/import",
+                files={"file": ("companies.csv", companies_csv(args.companies), "text/csv")}
+            )
+            response.raise_for_status()
+            results["seed"] = {**{k: v for k, v in response.json().items() if k != "errors"},
+                               "request_seconds": round(time.perf_counter() - started, 3)}
+            user_ids = [user["id"] for user in (await client.get("/admin/users")).json()]
+            print(f"Seeded {results['seed']['inserted']} companies in {results['seed']['request_seconds']:.2f}s")
+
+            needs_pdfs = [name for name in scenarios if name in ("preview", "analyze")]
+            pdfs = {}
+            if needs_pdfs:
+                started = time.perf_counter()
+                for offset, name in enumerate(needs_pdfs):
+                    # Distinct content and company per request keeps every cache cold
+                    pdfs[name] = [
+                        make_report(args.pages, f"Loadtest {name.title()} {index} Limited", seed=offset * 100_000 + index)
+                        for index in range(args.requests)
+                    ]
+                print(f"Generated {args.requests * len(needs_pdfs)} reports of {args.pages} pages "
+                      f"in {time.perf_counter() - started:.1f}s")
+
+            async def preview(index):
+                files = {"file": (f"preview_{index}.pdf", pdfs["preview"][index], "application/pdf")}
+                return (await client.post("/preview", files=files)).status_code == 200
+
+            async def analyze(index):
+                files = {"file": (f"report_{index}.pdf", pdfs["analyze"][index], "application/pdf")}
+                params = {"mode": args.mode}
+                if user_ids:
+                    params["user_id"] = user_ids[index % len(user_ids)]
+                response = await client.post("/analyze", files=files, params=params)
+                if response.status_code != 202:
+                    return False
+                return await wait_for_job(client, response.json()["events_url"])
+
+            async def reports(index):
+                return (await client.get("/reports", params={"limit": 50})).status_code == 200
+
+            async def admin_companies(index):
+                return (await client.get("/admin/companies", params={"limit": 50})).status_code == 200
+
+            async def public_stats(index):
+                return (await client.get("/public/stats")).status_code == 200
+
+            requests = {
+                "preview": preview, "analyze": analyze, "reports": reports,
+                "admin_companies": admin_companies, "public_stats": public_stats,
+            }
+            sampler = RssSampler(server.pid)
+            for name in scenarios:
+                print(f"Running {name}: {args.requests} requests, concurrency {args.concurrency}...")
+                sampler.start()
+                entry = await run_scenario(args.requests, args.concurrency, requests[name])
+                entry["peak_rss_mb"] = await sampler.stop()
+                results["scenarios"][name] = entry
+
+            try:
+                results["fake_api_calls"] = (await client.get(f"{fake_url}/stats")).json()
+            except httpx.HTTPError:
+                pass
+    finally:
+        for process in reversed(processes):
+            process.terminate()
+        for process in reversed(processes):
+            try:
+                process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                process.kill()
+        if not args.keep_db and not args.spawn_mongod:
+            client = AsyncIOMotorClient(args.mongo_url, serverSelectionTimeoutMS=2000)
+            try:
+                await client.drop_database(args.db)
+            except Exception as e:
+                print(f"Could not drop {args.db}: {e}")
+            client.close()
+        shutil.rmtree(workdir, ignore_errors=True)
+        if mongo_dbpath:
+            shutil.rmtree(mongo_dbpath, ignore_errors=True)
+
+    print_results(results)
+    output = args.output or f"loadtest-{commit or 'unknown'}.json"
+    with open(output, "w") as out:
+        json.dump(results, out, indent=2)
+    print(f"\nResults written to {output}")
+
+    if args.compare:
+        with open(args.compare) as source:
+            print_comparison(results, json.load(source))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,101 @@
+"""
+Synthetic sustainability reports for benchmarks: text-only PDFs with a controllable
+page count, mixing hard metrics, dated targets, vague claims and certifications so
+extraction, pre-scoring and the prompts see realistic input.
+
+Run from the backend directory to write sample files:
+    python -m benchmarks.pdfgen --pages 40 --count 3 --out /tmp/reports
+"""
+import argparse
+import os
+import random
+
+import fitz  # PyMuPDF
+
+SECTIONS = [
+    "Climate and Emissions", "Energy", "Water Stewardship", "Waste and Circularity",
+    "Supply Chain", "Biodiversity", "Governance", "Community",
+]
+METRICS = [
+    "Scope 1 emissions were {n:,} tCO2e, down {p}% from the previous year.",
+    "Scope 2 emissions fell to {n:,} tCO2e after {p}% of purchased power moved to renewable contracts.",
+    "Total energy use was {n:,} MWh, of which {p}% came from on-site solar.",
+    "Freshwater withdrawal was {n:,} kl; {p}% of wastewater was recycled on site.",
+    "We diverted {p}% of {n:,} tonnes of waste from landfill.",
+    "Fleet fuel consumption dropped to {n:,} litres.",
+]
+TARGETS = [
+    "We target net zero operations by {y}.",
+    "Our goal is a {p}% cut in water intensity by {y}.",
+    "We have committed to 100% renewable electricity by {y}.",
+]
+VAGUE = [
+    "We are committed to eco-friendly practices across all our sites.",
+    "Our green initiatives reflect our conscious approach to the planet.",
+    "We strive to be environmentally friendly in everything we do.",
+    "Sustainable practices are at the heart of our responsible business.",
+    "We aim to be a low impact, planet-friendly organisation.",
+]
+CERTIFICATIONS = [
+    "Our main plants are certified to ISO 14001 and ISO 50001.",
+    "Emissions data received limited assurance from an independent third party.",
+    "We report in line with GRI and respond annually to CDP.",
+    "Our targets have been validated by SBTi.",
+]
+FILLER = (
+    "The year saw continued investment in process efficiency, employee training and "
+    "stakeholder engagement across our operating regions. "
+)
+
+
+def _paragraphs(rng: random.Random, count: int):
+    for _ in range(count):
+        kind = rng.random()
+        if kind < 0.35:
+            template = rng.choice(METRICS)
+        elif kind < 0.5:
+            template = rng.choice(TARGETS)
+        elif kind < 0.75:
+            template = rng.choice(VAGUE)
+        elif kind < 0.85:
+            template = rng.choice(CERTIFICATIONS)
+        else:
+            template = FILLER * 3
+        yield template.format(n=rng.randint(1_000, 900_000), p=rng.randint(3, 60), y=rng.randint(2027, 2050))
+
+
+def make_report(pages: int, company: str = "Acme Industries Limited", seed: int = 1) -> bytes:
+    """A report of exactly `pages` pages; the first line carries the company name."""
+    rng = random.Random(seed)
+    doc = fitz.open()
+    rect = fitz.Rect(56, 56, 540, 786)
+    for index in range(pages):
+        page = doc.new_page()
+        if index == 0:
+            text = f"{company}\nSustainability Report {rng.randint(2022, 2025)}\n\n"
+        else:
+            text = f"{rng.choice(SECTIONS)}\n\n"
+        text += "\n\n".join(_paragraphs(rng, 9))
+        page.insert_textbox(rect, text, fontsize=10, fontname="helv")
+    data = doc.tobytes(garbage=3, deflate=True)
+    doc.close()
+    return data
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, default=20)
+    parser.add_argument("--count", type=int, default=1)
+    parser.add_argument("--out", default=".")
+    args = parser.parse_args()
+
+    os.makedirs(args.out, exist_ok=True)
+    for index in range(args.count):
+        path = os.path.join(args.out, f"report_{index + 1:03d}.pdf")
+        with open(path, "wb") as out:
+            out.write(make_report(args.pages, f"Company {index + 1} Limited", seed=index))
+        print(f"{path}: {args.pages} pages, {os.path.getsize(path) / 1024:.0f} KB")
+
+
+if __name__ == "__main__":
+    main()
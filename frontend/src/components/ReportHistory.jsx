@@ -4,12 +4,15 @@ import { FileText, Trash2, Eye, Clock } from 'lucide-react';
 
 export default function ReportHistory({ onSelect, isAdmin, userId }) {
   const [reports, setReports] = useState([]);
+  const [nextCursor, setNextCursor] = useState(null);
   const [loading, setLoading] = useState(true);
+  const [loadingMore, setLoadingMore] = useState(false);
 
   const fetchReports = async () => {
     try {
       const data = await getReports(isAdmin ? null : userId);
-      setReports(data);
+      setReports(data.reports);
+      setNextCursor(data.nextCursor);
     } catch (err) {
       console.error('Failed to fetch reports:', err);
     } finally {
@@ -17,6 +20,19 @@ export default function ReportHistory({ onSelect, isAdmin, userId }) {
     }
   };
 
+  const loadMore = async () => {
+    setLoadingMore(true);
+    try {
+      const data = await getReports(isAdmin ? null : userId, { cursor: nextCursor });
+      setReports(prev => [...prev, ...data.reports]);
+      setNextCursor(data.nextCursor);
+    } catch (err) {
+      console.error('Failed to fetch reports:', err);
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   useEffect(() => {
     fetchReports();
   }, [userId]);
@@ -70,12 +86,12 @@ export default function ReportHistory({ onSelect, isAdmin, userId }) {
                 <FileText className="w-5 h-5 text-gray-400 mt-0.5" />
                 <div className="flex-1 min-w-0">
                   <p className="font-medium text-gray-900 truncate text-sm">
-                    {report.analysis.company_info.name}
+                    {report.company_name}
                   </p>
                   <p className="text-xs text-gray-500 truncate">{report.filename}</p>
                   <div className="flex items-center gap-2 mt-1">
-                    <span className={`text-xs font-bold px-2 py-0.5 rounded-full ${getScoreColor(report.analysis.scores.final_trust_score)}`}>
-                      {Math.round(report.analysis.scores.final_trust_score)}
+                    <span className={`text-xs font-bold px-2 py-0.5 rounded-full ${getScoreColor(report.final_trust_score)}`}>
+                      {Math.round(report.final_trust_score)}
                     </span>
                     <span className="text-xs text-gray-400 flex items-center gap-1">
                       <Clock className="w-3 h-3" />
@@ -99,6 +115,15 @@ export default function ReportHistory({ onSelect, isAdmin, userId }) {
               </div>
             </div>
           ))}
+          {nextCursor && (
+            <button
+              onClick={loadMore}
+              disabled={loadingMore}
+              className="w-full py-2 text-sm text-emerald-600 hover:bg-emerald-50 rounded-xl transition disabled:opacity-50"
+            >
+              {loadingMore ? 'Loading...' : 'Load more'}
+            </button>
+          )}
         </div>
       )}
     </div>
@@ -4,7 +4,9 @@ import { getReports } from '../services/api';
 
 export default function UploadHistory({ onSelectReport }) {
   const [reports, setReports] = useState([]);
+  const [nextCursor, setNextCursor] = useState(null);
   const [loading, setLoading] = useState(true);
+  const [loadingMore, setLoadingMore] = useState(false);
   const [filter, setFilter] = useState('all');
 
   useEffect(() => {
@@ -13,8 +15,9 @@ export default function UploadHistory({ onSelectReport }) {
 
   const loadReports = async () => {
     try {
-      const data = await getReports(); // Get all reports (admin)
-      setReports(data);
+      const data = await getReports(); // Most recent reports across all users (admin)
+      setReports(data.reports);
+      setNextCursor(data.nextCursor);
     } catch (err) {
       console.error('Failed to load reports:', err);
     } finally {
@@ -22,9 +25,22 @@ export default function UploadHistory({ onSelectReport }) {
     }
   };
 
+  const loadMore = async () => {
+    setLoadingMore(true);
+    try {
+      const data = await getReports(null, { cursor: nextCursor });
+      setReports(prev => [...prev, ...data.reports]);
+      setNextCursor(data.nextCursor);
+    } catch (err) {
+      console.error('Failed to load reports:', err);
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   const filtered = reports.filter(r => {
     if (filter === 'all') return true;
-    return r.analysis?.scores?.traffic_light?.toUpperCase() === filter;
+    return r.traffic_light?.toUpperCase() === filter;
   });
 
   const getTrafficIcon = (light) => {
@@ -92,22 +108,22 @@ export default function UploadHistory({ onSelectReport }) {
                     <Calendar className="w-3 h-3" />
                     {new Date(report.uploaded_at).toLocaleDateString()}
                   </span>
-                  {report.analysis?.company_info?.name && (
+                  {report.company_name && (
                     <span className="flex items-center gap-1">
                       <Building2 className="w-3 h-3" />
-                      {report.analysis.company_info.name}
+                      {report.company_name}
                     </span>
                   )}
                 </div>
               </div>
               <div className="flex items-center gap-2 ml-2">
-                {getTrafficIcon(report.analysis?.scores?.traffic_light)}
+                {getTrafficIcon(report.traffic_light)}
                 <span className={`text-sm font-bold ${
-                  report.analysis?.scores?.final_trust_score >= 70 ? 'text-emerald-600'
-                  : report.analysis?.scores?.final_trust_score >= 40 ? 'text-amber-600'
+                  report.final_trust_score >= 70 ? 'text-emerald-600'
+                  : report.final_trust_score >= 40 ? 'text-amber-600'
                   : 'text-red-600'
                 }`}>
-                  {report.analysis?.scores?.final_trust_score}%
+                  {report.final_trust_score}%
                 </span>
               </div>
             </div>
@@ -120,6 +136,16 @@ export default function UploadHistory({ onSelectReport }) {
             <p className="text-sm">No reports found</p>
           </div>
         )}
+
+        {nextCursor && (
+          <button
+            onClick={loadMore}
+            disabled={loadingMore}
+            className="w-full py-2 text-sm text-blue-600 hover:bg-blue-50 rounded-xl transition-colors disabled:opacity-50"
+          >
+            {loadingMore ? 'Loading...' : 'Load more'}
+          </button>
+        )}
       </div>
     </div>
   );
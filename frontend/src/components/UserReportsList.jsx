@@ -1,10 +1,13 @@
 import { useState, useEffect } from 'react';
 import { FileText, Eye, Calendar, TrendingUp, AlertCircle, CheckCircle, AlertTriangle, BarChart2 } from 'lucide-react';
-import { getReports } from '../services/api';
+import { getReports, getReportsSummary } from '../services/api';
 
 export default function UserReportsList({ userId, onSelectReport }) {
   const [reports, setReports] = useState([]);
+  const [nextCursor, setNextCursor] = useState(null);
+  const [summary, setSummary] = useState(null);
   const [loading, setLoading] = useState(true);
+  const [loadingMore, setLoadingMore] = useState(false);
 
   useEffect(() => {
     if (userId) loadReports();
@@ -12,8 +15,10 @@ export default function UserReportsList({ userId, onSelectReport }) {
 
   const loadReports = async () => {
     try {
-      const data = await getReports(userId);
-      setReports(data);
+      const [data, totals] = await Promise.all([getReports(userId), getReportsSummary(userId)]);
+      setReports(data.reports);
+      setNextCursor(data.nextCursor);
+      setSummary(totals);
     } catch (err) {
       console.error('Failed to load reports:', err);
     } finally {
@@ -21,6 +26,19 @@ export default function UserReportsList({ userId, onSelectReport }) {
     }
   };
 
+  const loadMore = async () => {
+    setLoadingMore(true);
+    try {
+      const data = await getReports(userId, { cursor: nextCursor });
+      setReports(prev => [...prev, ...data.reports]);
+      setNextCursor(data.nextCursor);
+    } catch (err) {
+      console.error('Failed to load reports:', err);
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   const getScoreColor = (score) => {
     if (score >= 70) return { bg: 'bg-emerald-100', text: 'text-emerald-600', bar: 'bg-emerald-500' };
     if (score >= 40) return { bg: 'bg-amber-100', text: 'text-amber-600', bar: 'bg-amber-500' };
@@ -36,10 +54,9 @@ export default function UserReportsList({ userId, onSelectReport }) {
     }
   };
 
-  // Calculate stats
-  const avgScore = reports.length > 0 
-    ? reports.reduce((sum, r) => sum + (r.analysis?.scores?.final_trust_score || 0), 0) / reports.length 
-    : 0;
+  // Stats cover every report, not just the pages loaded so far
+  const totalReports = summary?.total_reports ?? reports.length;
+  const avgScore = summary?.avg_trust_score ?? 0;
 
   if (loading) {
     return (
@@ -65,7 +82,7 @@ export default function UserReportsList({ userId, onSelectReport }) {
           </div>
           <div className="flex gap-6">
             <div className="text-center">
-              <p className="text-2xl font-bold">{reports.length}</p>
+              <p className="text-2xl font-bold">{totalReports}</p>
               <p className="text-xs text-slate-400">Total Reports</p>
             </div>
             <div className="text-center">
@@ -81,7 +98,7 @@ export default function UserReportsList({ userId, onSelectReport }) {
         {reports.length > 0 ? (
           <div className="space-y-3">
             {reports.map(report => {
-              const score = report.analysis?.scores?.final_trust_score || 0;
+              const score = report.final_trust_score || 0;
               const colors = getScoreColor(score);
               return (
                 <div
@@ -106,7 +123,7 @@ export default function UserReportsList({ userId, onSelectReport }) {
                           <Calendar className="w-3 h-3" />
                           {new Date(report.uploaded_at).toLocaleDateString()}
                         </span>
-                        <span>{report.analysis?.company_info?.industry_type}</span>
+                        <span>{report.industry_type}</span>
                       </div>
                       {/* Score Bar */}
                       <div className="mt-2 h-1.5 bg-gray-100 rounded-full overflow-hidden">
@@ -116,7 +133,7 @@ export default function UserReportsList({ userId, onSelectReport }) {
 
                     {/* Traffic Light & View */}
                     <div className="flex items-center gap-3">
-                      {getTrafficIcon(report.analysis?.scores?.traffic_light)}
+                      {getTrafficIcon(report.traffic_light)}
                       <button className="p-2 bg-gray-100 rounded-lg group-hover:bg-emerald-100 group-hover:text-emerald-600 transition-colors">
                         <Eye className="w-4 h-4" />
                       </button>
@@ -125,6 +142,15 @@ export default function UserReportsList({ userId, onSelectReport }) {
                 </div>
               );
             })}
+            {nextCursor && (
+              <button
+                onClick={loadMore}
+                disabled={loadingMore}
+                className="w-full py-2 text-sm text-emerald-600 hover:bg-emerald-50 rounded-xl transition-colors disabled:opacity-50"
+              >
+                {loadingMore ? 'Loading...' : 'Load more'}
+              </button>
+            )}
           </div>
         ) : (
           <div className="text-center py-12">
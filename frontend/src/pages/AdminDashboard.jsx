@@ -15,7 +15,7 @@ import CO2Recommendations from '../components/CO2Recommendations';
 import { useAuth } from '../contexts/AuthContext';
 import { 
   analyzeReport, previewPdf, getAllCompanies, getAdminStats, 
-  assignCredit, getReports 
+  assignCredit, getReports, getReport 
 } from '../services/api';
 import { 
   Shield, AlertTriangle, Factory, FileText, Building2, 
@@ -45,6 +45,8 @@ export default function AdminDashboard() {
   const [creditLoading, setCreditLoading] = useState(false);
   const [selectedCompany, setSelectedCompany] = useState(null);
   const [companyReports, setCompanyReports] = useState([]);
+  const [companyCursor, setCompanyCursor] = useState(null);
+  const [companyLoadingMore, setCompanyLoadingMore] = useState(false);
 
   useEffect(() => { loadAdminData(); }, []);
 
@@ -82,7 +84,7 @@ export default function AdminDashboard() {
     setLoading(true);
     setError(null);
     try {
-      const data = await analyzeReport(file);
+      const data = await analyzeReport(file, undefined, preview?.preview_token);
       setResult(data.analysis);
       setPreview(null);
       loadAdminData();
@@ -93,11 +95,17 @@ export default function AdminDashboard() {
     }
   };
 
-  const handleSelectReport = (report) => {
-    setResult(report.analysis);
-    setFile(null);
-    setPreview(null);
-    setActiveTab('audit');
+  const handleSelectReport = async (report) => {
+    // List views carry summaries only; load the full analysis on demand
+    try {
+      const full = await getReport(report.id);
+      setResult(full.analysis);
+      setFile(null);
+      setPreview(null);
+      setActiveTab('audit');
+    } catch (err) {
+      setError(err.response?.data?.detail || 'Failed to load report.');
+    }
   };
 
   const handleFileChange = (newFile) => {
@@ -125,14 +133,30 @@ export default function AdminDashboard() {
 
   const handleViewReports = async (company) => {
     setSelectedCompany(company);
+    setCompanyReports([]);
+    setCompanyCursor(null);
     try {
-      const reports = await getReports(company.id);
+      const { reports, nextCursor } = await getReports(company.id);
       setCompanyReports(reports);
+      setCompanyCursor(nextCursor);
     } catch (err) {
       console.error('Failed to load company reports:', err);
     }
   };
 
+  const loadMoreCompanyReports = async () => {
+    setCompanyLoadingMore(true);
+    try {
+      const { reports, nextCursor } = await getReports(selectedCompany.id, { cursor: companyCursor });
+      setCompanyReports(prev => [...prev, ...reports]);
+      setCompanyCursor(nextCursor);
+    } catch (err) {
+      console.error('Failed to load company reports:', err);
+    } finally {
+      setCompanyLoadingMore(false);
+    }
+  };
+
   return (
     <div className="min-h-screen bg-slate-50">
       <Navbar />
@@ -241,13 +265,22 @@ export default function AdminDashboard() {
                           <div className="flex items-center justify-between mt-1">
                             <span className="text-xs text-gray-500">{new Date(report.uploaded_at).toLocaleDateString()}</span>
                             <span className={`text-xs px-2 py-0.5 rounded-full ${
-                              report.analysis?.scores?.traffic_light === 'RED' ? 'bg-red-100 text-red-600'
-                              : report.analysis?.scores?.traffic_light === 'YELLOW' ? 'bg-amber-100 text-amber-600'
+                              report.traffic_light === 'RED' ? 'bg-red-100 text-red-600'
+                              : report.traffic_light === 'YELLOW' ? 'bg-amber-100 text-amber-600'
                               : 'bg-emerald-100 text-emerald-600'
-                            }`}>{report.analysis?.scores?.final_trust_score}%</span>
+                            }`}>{report.final_trust_score}%</span>
                           </div>
                         </div>
                       ))}
+                      {companyCursor && (
+                        <button
+                          onClick={loadMoreCompanyReports}
+                          disabled={companyLoadingMore}
+                          className="w-full py-2 text-sm text-emerald-600 hover:bg-emerald-50 rounded-xl transition disabled:opacity-50"
+                        >
+                          {companyLoadingMore ? 'Loading...' : 'Load more'}
+                        </button>
+                      )}
                     </div>
                   ) : (
                     <p className="text-gray-500 text-sm text-center py-4">No reports found</p>
@@ -10,7 +10,7 @@ import UserReportsList from '../components/UserReportsList';
 import CO2Recommendations from '../components/CO2Recommendations';
 import PlatformStats from '../components/PlatformStats';
 import { useAuth } from '../contexts/AuthContext';
-import { analyzeReport, previewPdf } from '../services/api';
+import { analyzeReport, previewPdf, getReport } from '../services/api';
 import { Lightbulb, Factory, Upload, BarChart3, X } from 'lucide-react';
 
 export default function ClientDashboard() {
@@ -42,7 +42,7 @@ export default function ClientDashboard() {
     setLoading(true);
     setError(null);
     try {
-      const data = await analyzeReport(file, user?.id);
+      const data = await analyzeReport(file, user?.id, preview?.preview_token);
       setResult(data.analysis);
       setPreview(null);
       setShowUpload(false);
@@ -53,11 +53,17 @@ export default function ClientDashboard() {
     }
   };
 
-  const handleSelectReport = (report) => {
-    setResult(report.analysis);
-    setFile(null);
-    setPreview(null);
-    setShowUpload(false);
+  const handleSelectReport = async (report) => {
+    // List views carry summaries only; load the full analysis on demand
+    try {
+      const full = await getReport(report.id);
+      setResult(full.analysis);
+      setFile(null);
+      setPreview(null);
+      setShowUpload(false);
+    } catch (err) {
+      setError(err.response?.data?.detail || 'Failed to load report.');
+    }
   };
 
   const handleFileChange = (newFile) => {
@@ -39,21 +39,74 @@ export async function previewPdf(file) {
   return response.data;
 }
 
-export async function analyzeReport(file, userId) {
-  const formData = new FormData();
-  formData.append('file', file);
-  
-  const url = userId ? `/analyze?user_id=${userId}` : '/analyze';
-  const response = await api.post(url, formData, {
-    headers: { 'Content-Type': 'multipart/form-data' },
-  });
-
-  return response.data;
-}
-
-export async function getReports(userId) {
-  const url = userId ? `/reports?user_id=${userId}` : '/reports';
-  const response = await api.get(url);
+// Pass the preview token from previewPdf to reuse that upload; falls back to
+// sending the file again if the preview has expired.
+export async function analyzeReport(file, userId, previewToken) {
+  const params = {};
+  if (userId) params.user_id = userId;
+
+  let response;
+  if (previewToken) {
+    try {
+      response = await api.post('/analyze', null, { params: { ...params, preview_token: previewToken } });
+    } catch (err) {
+      if (err.response?.status !== 410 || !file) throw err;
+    }
+  }
+
+  if (!response) {
+    const formData = new FormData();
+    formData.append('file', file);
+    response = await api.post('/analyze', formData, {
+      params,
+      headers: { 'Content-Type': 'multipart/form-data' },
+    });
+  }
+
+  const job = await waitForJob(response.data.job_id);
+  return getReport(job.result.report_id);
+}
+
+// Job APIs
+const JOB_POLL_INTERVAL_MS = 1500;
+
+export async function getJob(jobId) {
+  const response = await api.get(`/jobs/${jobId}`);
+  return response.data;
+}
+
+export async function waitForJob(jobId, onProgress) {
+  for (;;) {
+    const job = await getJob(jobId);
+    if (onProgress) onProgress(job);
+
+    if (job.status === 'completed') return job;
+    if (job.status === 'failed') {
+      const error = new Error(job.error || 'Analysis failed');
+      error.response = { data: { detail: job.error } };
+      throw error;
+    }
+
+    await new Promise((resolve) => setTimeout(resolve, JOB_POLL_INTERVAL_MS));
+  }
+}
+
+// Report summaries, newest first. Pass the returned nextCursor to fetch the following page.
+export async function getReports(userId, { cursor, limit } = {}) {
+  const params = {};
+  if (userId) params.user_id = userId;
+  if (cursor) params.cursor = cursor;
+  if (limit) params.limit = limit;
+  const response = await api.get('/reports', { params });
+  return {
+    reports: response.data,
+    nextCursor: response.headers['x-next-cursor'] || null,
+  };
+}
+
+export async function getReportsSummary(userId) {
+  const params = userId ? { user_id: userId } : {};
+  const response = await api.get('/reports/summary', { params });
   return response.data;
 }
 